@@ -1,5 +1,6 @@
 from .users import users_api
 from .groups import groups_api
 from .messages import messages_api
+from .stats import stats_api
 
-__all__ = ['users_api', 'groups_api', 'messages_api']
\ No newline at end of file
+__all__ = ['users_api', 'groups_api', 'messages_api', 'stats_api']
\ No newline at end of file
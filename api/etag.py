@@ -0,0 +1,61 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from auth.decorators import get_current_user
+from database.versions import resource_versions
+
+
+def make_etag(keys):
+    """
+    Kullanıcı, istek yolu ve kaynak sürümlerinden ETag üretir
+
+    Args:
+        keys (list): Yanıtın bağlı olduğu sürüm anahtarları
+
+    Returns:
+        str: ETag değeri (tırnaksız)
+    """
+    user = get_current_user()
+    raw = '|'.join((
+        str(user['id']) if user else '',
+        request.full_path,
+        resource_versions.token(*keys)
+    ))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+
+def conditional(*resources):
+    """
+    Görünümü ETag / If-None-Match desteğiyle sarar
+
+    Sürümler görünüm çalışmadan önce okunur; istemcinin ETag'i güncelse
+    görünüm hiç çağrılmaz (SQLite ve jsonify atlanır) ve 304 döner.
+    login_required'ın altına yazılmalıdır.
+
+    Args:
+        resources: Sürüm anahtarları veya görünümün URL argümanlarıyla
+                   çağrılıp anahtar döndüren fonksiyonlar
+
+    Örnek:
+        @conditional(GROUPS)
+        @conditional(lambda group_id: room_key('group', group_id))
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = [r(**kwargs) if callable(r) else r for r in resources]
+            tag = make_etag(keys)
+
+            if request.if_none_match.contains(tag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(tag)
+            # Tarayıcı yanıtı saklasın ama her seferinde doğrulasın
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -10,6 +10,8 @@ from database import (
     remove_user_from_group,
     is_user_in_group
 )
+from database.versions import GROUPS
+from .etag import conditional
 
 # Blueprint oluştur
 groups_api = Blueprint('groups_api', __name__)
@@ -17,6 +19,7 @@ groups_api = Blueprint('groups_api', __name__)
 
 @groups_api.route('/all', methods=['GET'])
 @login_required
+@conditional(GROUPS)
 def get_groups():
     """
     Tüm grupları getir
@@ -275,7 +278,7 @@ def leave_group(group_id):
             }), 400
         
         # Gruptan çıkar
-        remove_user_from_group(current_user['id'], group_id)
+        remove_user_from_group(group_id, current_user['id'])
         
         return jsonify({
             'success': True,
@@ -1,44 +1,121 @@
-from flask import Blueprint, request, jsonify
+from functools import partial
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from auth.decorators import login_required, get_current_user
 from database import (
     save_message,
     get_broadcast_messages,
     get_group_messages,
     get_private_messages,
-    get_offline_messages,
-    mark_message_delivered,
+    deliver_offline_messages,
+    search_messages,
     mark_message_read,
     is_user_in_group
 )
+from database.queries import get_conversation_key
+from database.export import export_user_messages
+from database.versions import room_key, members_key, MESSAGE_STATUS
+from config import Config
+from .etag import conditional
+from .serialization import buffer_small, stream_list
 
 # Blueprint oluştur
 messages_api = Blueprint('messages_api', __name__)
 
 
+def _cursor_args():
+    """
+    limit, before_id ve after_id sorgu parametrelerini okur
+
+    limit Config.MAX_PAGE'e kırpılır; pozitif değilse None döner.
+    """
+    limit = request.args.get('limit', 50, type=int)
+    limit = min(limit, Config.MAX_PAGE) if limit > 0 else None
+    before_id = request.args.get('before_id', type=int)
+    after_id = request.args.get('after_id', type=int)
+    return limit, before_id, after_id
+
+
+def _history_response(messages, limit, after_id=None):
+    """
+    Geçmiş sayfası yanıtını next_cursor ile oluşturur
+
+    next_cursor:
+    - before_id ile (veya cursor'suz) istekte: daha eski sayfa için
+      before_id değeri, eski mesaj kalmadıysa null
+    - after_id ile istekte: yeni mesajları sorgulamak için after_id değeri
+    """
+    if after_id is not None:
+        next_cursor = messages[-1]['id'] if messages else after_id
+    else:
+        next_cursor = messages[0]['id'] if messages and len(messages) >= limit else None
+
+    return jsonify({
+        'success': True,
+        'messages': messages,
+        'count': len(messages),
+        'next_cursor': next_cursor
+    })
+
+
+def _history_stream(rows, limit, after_id=None):
+    """
+    Büyük geçmiş sayfasını satır satır akıtır
+
+    Gövde ve next_cursor _history_response ile aynıdır; next_cursor
+    son satır gönderildikten sonra hesaplanır.
+    """
+    def trailer(count, first, last):
+        if after_id is not None:
+            return {'next_cursor': last['id'] if last else after_id}
+        return {'next_cursor': first['id'] if first and count >= limit else None}
+
+    return stream_list('messages', rows, trailer=trailer)
+
+
+def _history_page(fetch, limit, before_id=None, after_id=None):
+    """
+    Geçmiş sayfasını getirir; en az Config.STREAM_MIN_ROWS satırlık
+    sayfaları akıtır
+
+    Args:
+        fetch (callable): (limit, before_id, after_id, lazy=...) ile
+                          çağrılan get_*_messages fonksiyonu
+    """
+    if limit < Config.STREAM_MIN_ROWS:
+        return _history_response(fetch(limit, before_id, after_id), limit, after_id)
+
+    messages, rest = buffer_small(fetch(limit, before_id, after_id, lazy=True))
+    if rest is not None:
+        return _history_stream(rest, limit, after_id)
+    return _history_response(messages, limit, after_id)
+
+
 @messages_api.route('/broadcast', methods=['GET'])
 @login_required
+@conditional(room_key('broadcast'), MESSAGE_STATUS)
 def get_broadcast_history():
     """
     Broadcast mesaj geçmişini getir
     
-    GET /api/messages/broadcast?limit=50
+    GET /api/messages/broadcast?limit=50&before_id=120
     
     Response:
         {
             "success": true,
             "messages": [...],
-            "count": 50
+            "count": 50,
+            "next_cursor": 71
         }
     """
     try:
-        limit = request.args.get('limit', 50, type=int)
-        messages = get_broadcast_messages(limit)
-        
-        return jsonify({
-            'success': True,
-            'messages': messages,
-            'count': len(messages)
-        })
+        limit, before_id, after_id = _cursor_args()
+        if limit is None:
+            return jsonify({
+                'success': False,
+                'error': 'limit pozitif bir sayı olmalı'
+            }), 400
+        return _history_page(get_broadcast_messages, limit, before_id, after_id)
     
     except Exception as e:
         return jsonify({
@@ -49,17 +126,23 @@ def get_broadcast_history():
 
 @messages_api.route('/group/<int:group_id>', methods=['GET'])
 @login_required
+@conditional(
+    lambda group_id: room_key('group', group_id),
+    lambda group_id: members_key(group_id),
+    MESSAGE_STATUS
+)
 def get_group_history(group_id):
     """
     Grup mesaj geçmişini getir
     
-    GET /api/messages/group/1?limit=50
+    GET /api/messages/group/1?limit=50&before_id=120
     
     Response:
         {
             "success": true,
             "messages": [...],
-            "count": 50
+            "count": 50,
+            "next_cursor": 71
         }
     """
     try:
@@ -72,14 +155,14 @@ def get_group_history(group_id):
                 'error': 'Bu grubun üyesi değilsiniz'
             }), 403
         
-        limit = request.args.get('limit', 50, type=int)
-        messages = get_group_messages(group_id, limit)
-        
-        return jsonify({
-            'success': True,
-            'messages': messages,
-            'count': len(messages)
-        })
+        limit, before_id, after_id = _cursor_args()
+        if limit is None:
+            return jsonify({
+                'success': False,
+                'error': 'limit pozitif bir sayı olmalı'
+            }), 400
+        return _history_page(partial(get_group_messages, group_id),
+                             limit, before_id, after_id)
     
     except Exception as e:
         return jsonify({
@@ -90,31 +173,126 @@ def get_group_history(group_id):
 
 @messages_api.route('/private/<int:user_id>', methods=['GET'])
 @login_required
+@conditional(
+    lambda user_id: room_key('private', get_conversation_key(get_current_user()['id'], user_id)),
+    MESSAGE_STATUS
+)
 def get_private_history(user_id):
     """
     Özel mesaj geçmişini getir
     
-    GET /api/messages/private/2?limit=50
+    GET /api/messages/private/2?limit=50&before_id=120
     
     Response:
         {
             "success": true,
             "messages": [...],
-            "count": 50
+            "count": 50,
+            "next_cursor": 71
         }
     """
     try:
         current_user = get_current_user()
-        limit = request.args.get('limit', 50, type=int)
-        
-        messages = get_private_messages(current_user['id'], user_id, limit)
-        
+        limit, before_id, after_id = _cursor_args()
+        if limit is None:
+            return jsonify({
+                'success': False,
+                'error': 'limit pozitif bir sayı olmalı'
+            }), 400
+        return _history_page(partial(get_private_messages, current_user['id'], user_id),
+                             limit, before_id, after_id)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@messages_api.route('/search', methods=['GET'])
+@login_required
+def search_history():
+    """
+    Mesajlarda tam metin arama
+
+    Sadece kullanıcının erişebildiği mesajlarda (broadcast, kendi özel
+    mesajları, üyesi olduğu gruplar) arama yapılır.
+
+    GET /api/messages/search?q=toplantı&limit=20&offset=0
+
+    Response:
+        {
+            "success": true,
+            "messages": [...],
+            "count": 20,
+            "next_offset": 20
+        }
+    """
+    try:
+        text = request.args.get('q', '').strip()
+        if not text:
+            return jsonify({
+                'success': False,
+                'error': 'Arama sorgusu gerekli'
+            }), 400
+
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1:
+            return jsonify({
+                'success': False,
+                'error': 'limit pozitif bir sayı olmalı'
+            }), 400
+        limit = min(limit, 100)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+
+        current_user = get_current_user()
+        messages = search_messages(current_user['id'], text, limit, offset)
+
         return jsonify({
             'success': True,
             'messages': messages,
-            'count': len(messages)
+            'count': len(messages),
+            'next_offset': offset + len(messages) if len(messages) >= limit else None
         })
-    
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@messages_api.route('/export', methods=['GET'])
+@login_required
+def export_history():
+    """
+    Kullanıcının tüm mesaj geçmişini NDJSON olarak indir
+
+    Gönderilen/alınan özel mesajlar, gönderilen broadcast'ler ve üyesi
+    olunan grupların mesajları eskiden yeniye, satır başına bir mesaj
+    olarak akıtılır. Yarıda kalan indirme, dosyadaki son satırın id'si
+    after_id olarak verilerek devam ettirilebilir.
+
+    GET /api/messages/export?after_id=1200&gzip=1
+
+    Response:
+        application/x-ndjson (gzip=1 ise application/gzip) dosyası
+    """
+    try:
+        current_user = get_current_user()
+        after_id = request.args.get('after_id', type=int)
+        compress = request.args.get('gzip', '0') == '1'
+
+        chunks = export_user_messages(current_user['id'], after_id, compress)
+        filename = f"messages_{current_user['id']}.ndjson" + ('.gz' if compress else '')
+        response = Response(
+            stream_with_context(chunks),
+            mimetype='application/gzip' if compress else 'application/x-ndjson'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -139,11 +317,9 @@ def get_offline():
     """
     try:
         current_user = get_current_user()
-        messages = get_offline_messages(current_user['id'])
         
-        # Mesajları teslim edildi olarak işaretle
-        for msg in messages:
-            mark_message_delivered(msg['id'])
+        # Mesajları getir ve tek transaction'da teslim edildi olarak işaretle
+        messages = deliver_offline_messages(current_user['id'])
         
         return jsonify({
             'success': True,
@@ -268,9 +444,15 @@ def mark_read(message_id):
             "success": true,
             "message": "Mesaj okundu olarak işaretlendi"
         }
+    
+    Mesaj yoksa (veya okunup arşive taşındıysa) 404 döner.
     """
     try:
-        mark_message_read(message_id)
+        if not mark_message_read(message_id):
+            return jsonify({
+                'success': False,
+                'error': 'Mesaj bulunamadı'
+            }), 404
         
         return jsonify({
             'success': True,
@@ -0,0 +1,130 @@
+from itertools import chain, islice
+
+from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+import json
+
+
+# Akış yanıtlarında istemciye gönderilen parça boyutu (bayt)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def use_orjson():
+    """orjson kurulu ve Config.FAST_JSON açık mı?"""
+    return orjson is not None and Config.FAST_JSON
+
+
+def dumps(obj):
+    """
+    Nesneyi JSON baytlarına çevirir
+
+    orjson varsa onu, yoksa standart json modülünü kullanır.
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    if use_orjson():
+        return orjson.dumps(obj, default=DefaultJSONProvider.default)
+    return json.dumps(obj, default=DefaultJSONProvider.default,
+                      ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify / request.get_json için orjson tabanlı JSON sağlayıcı
+
+    orjson kurulu değilse veya özel argüman verilirse Flask'ın
+    varsayılan sağlayıcısına düşer.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or not use_orjson():
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs or not use_orjson():
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def buffer_small(rows):
+    """
+    Satırların ilk Config.STREAM_MIN_ROWS tanesini okur
+
+    Eşiğin altında kalan listeler normal jsonify yanıtıyla gönderilir;
+    ilk batch akış başlamadan okunduğu için havuz/sorgu hataları da
+    normal hata yanıtına dönüşür.
+
+    Args:
+        rows (iterable): Satırlar
+
+    Returns:
+        tuple: (liste, None) satırlar eşiğin altındaysa, aksi halde
+               (None, okunan satırlarla başlayan iterator)
+    """
+    rows = iter(rows)
+    head = list(islice(rows, Config.STREAM_MIN_ROWS))
+    if len(head) < Config.STREAM_MIN_ROWS:
+        return head, None
+    return None, chain(head, rows)
+
+
+def stream_list(key, rows, transform=None, trailer=None):
+    """
+    Büyük liste yanıtını satır satır akıtır
+
+    Yanıt gövdesi jsonify ile aynı biçimdedir:
+        {"success": true, "<key>": [...], "count": n, ...trailer}
+    Satırlar üretildikçe serileştirilir; bellekte aynı anda bir satır ve
+    en fazla STREAM_CHUNK_SIZE baytlık parça tutulur.
+
+    Args:
+        key (str): Liste alanının adı ('messages', 'users', ...)
+        rows (iterable): Satırlar (örn. iter_history_page iterator'ı)
+        transform (callable, optional): Her satıra uygulanır
+        trailer (callable, optional): (count, first, last) ile çağrılır,
+            listeden sonra eklenecek alanları döndürür
+
+    Returns:
+        Response: application/json akış yanıtı
+
+    Not:
+    - Akış başladıktan sonra oluşan hata durum kodunu değiştiremez;
+      bağlantı yarıda kesilir
+    """
+    def generate():
+        buffer = bytearray(b'{"success":true,' + dumps(key) + b':[')
+        count, first, last = 0, None, None
+        for row in rows:
+            if transform is not None:
+                row = transform(row)
+            if count:
+                buffer += b','
+            else:
+                first = row
+            buffer += dumps(row)
+            last = row
+            count += 1
+            if len(buffer) >= STREAM_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+
+        fields = {'count': count}
+        if trailer is not None:
+            fields.update(trailer(count, first, last))
+        buffer += b'],' + dumps(fields)[1:]
+        yield bytes(buffer)
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
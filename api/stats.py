@@ -0,0 +1,129 @@
+from flask import Blueprint, jsonify
+from auth.decorators import login_required
+from database.cache import (
+    user_cache, membership_index, group_directory_cache, recent_messages
+)
+from database.metrics import query_metrics
+from database.passwords import get_password_hasher
+
+# Blueprint oluştur
+stats_api = Blueprint('stats_api', __name__)
+
+
+@stats_api.route('/queries', methods=['GET'])
+@login_required
+def get_query_stats():
+    """
+    Sorgu metriklerini getir (toplam süreye göre sıralı)
+
+    GET /api/stats/queries
+
+    Response:
+        {
+            "success": true,
+            "queries": [
+                {
+                    "name": "get_group_messages",
+                    "calls": 120,
+                    "errors": 0,
+                    "rows": 6000,
+                    "total_ms": 84.2,
+                    "latency": {"p50_ms": 0.6, "p95_ms": 1.2, "p99_ms": 2.4, ...},
+                    "lock_wait": {...}
+                },
+                ...
+            ]
+        }
+    """
+    return jsonify({
+        'success': True,
+        'queries': query_metrics.snapshot()
+    })
+
+
+@stats_api.route('/slow-queries', methods=['GET'])
+@login_required
+def get_slow_queries():
+    """
+    Yavaş sorgu kaydını getir
+
+    GET /api/stats/slow-queries
+
+    Response:
+        {
+            "success": true,
+            "threshold_ms": 100,
+            "queries": [
+                {
+                    "name": "get_messages_by_user",
+                    "elapsed_ms": 240.1,
+                    "sql": "SELECT ...",
+                    "params_shape": ["int", "int", "int"],
+                    "plan": ["SEARCH m USING INDEX ..."],
+                    "at": "2024-01-01 12:00:00"
+                }
+            ]
+        }
+    """
+    return jsonify({
+        'success': True,
+        'threshold_ms': query_metrics.slow_query_ms,
+        'queries': query_metrics.slow_queries()
+    })
+
+
+@stats_api.route('/caches', methods=['GET'])
+@login_required
+def get_cache_stats():
+    """
+    Bellek içi önbellek istatistiklerini getir
+
+    GET /api/stats/caches
+
+    Response:
+        {
+            "success": true,
+            "caches": {
+                "users": {"size": 120, "hits": 950, "misses": 50, "hit_rate": 0.95, ...},
+                "group_membership": {"groups": 12, "memberships": 340, "saved_queries": 5000, ...}
+            }
+        }
+    """
+    return jsonify({
+        'success': True,
+        'caches': {
+            'users': user_cache.stats(),
+            'group_membership': membership_index.stats(),
+            'group_directory': group_directory_cache.stats(),
+            'recent_messages': recent_messages.stats() if recent_messages else None
+        }
+    })
+
+
+@stats_api.route('/passwords', methods=['GET'])
+@login_required
+def get_password_stats():
+    """
+    Şifre havuzu istatistiklerini getir
+
+    GET /api/stats/passwords
+
+    Response:
+        {
+            "success": true,
+            "passwords": {
+                "iterations": 600000,
+                "workers": 4,
+                "queue_depth": 0,
+                "rejected": 0,
+                "rehashed": 12,
+                "queue_wait": {"p50_ms": 0.1, "p99_ms": 40.2, ...},
+                "verify_latency": {"p50_ms": 310.0, "p99_ms": 650.4, ...},
+                ...
+            }
+        }
+    """
+    return jsonify({
+        'success': True,
+        'passwords': get_password_hasher().stats()
+    })
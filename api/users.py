@@ -2,18 +2,33 @@ from flask import Blueprint, request, jsonify
 from auth.decorators import login_required, get_current_user
 from database import (
     get_all_users,
+    search_usernames,
     get_user_by_id,
     get_user_by_username,
     get_online_users,
     set_user_online
 )
+from database.versions import USERS
+from .etag import conditional
+from .serialization import buffer_small, stream_list
 
 # Blueprint oluştur
 users_api = Blueprint('users_api', __name__)
 
 
+def _safe_user(user):
+    """Şifre hash'i gibi alanları çıkarır (güvenlik)"""
+    return {
+        'id': user['id'],
+        'username': user['username'],
+        'is_online': user.get('is_online', 0),
+        'last_seen': user.get('last_seen')
+    }
+
+
 @users_api.route('/all', methods=['GET'])
 @login_required
+@conditional(USERS)
 def get_users():
     """
     Tüm kullanıcıları getir
@@ -36,18 +51,13 @@ def get_users():
         }
     """
     try:
-        users = get_all_users()
-        
-        # Şifre hash'lerini çıkar (güvenlik)
-        safe_users = []
-        for user in users:
-            safe_users.append({
-                'id': user['id'],
-                'username': user['username'],
-                'is_online': user.get('is_online', 0),
-                'last_seen': user.get('last_seen')
-            })
-        
+        users, rest = buffer_small(get_all_users(lazy=True))
+
+        # Büyük liste bellekte toplanmadan batch'ler halinde akıtılır
+        if rest is not None:
+            return stream_list('users', rest, transform=_safe_user)
+
+        safe_users = [_safe_user(user) for user in users]
         return jsonify({
             'success': True,
             'users': safe_users,
@@ -63,6 +73,7 @@ def get_users():
 
 @users_api.route('/online', methods=['GET'])
 @login_required
+@conditional(USERS)
 def get_users_online():
     """
     Çevrimiçi kullanıcıları getir
@@ -149,19 +160,28 @@ def search_users():
     """
     Kullanıcı ara
     
+    Varsayılan olarak kullanıcı adı öneki ile arar (indeksli);
+    "mode": "substring" ile alt metin araması yapılır (en az 3 karakter).
+    
     POST /api/users/search
-    Body: {"query": "ahmet"}
+    Body: {
+        "query": "ahm",
+        "mode": "prefix",  // "prefix" veya "substring"
+        "limit": 20,
+        "cursor": {"username": "ahmet", "id": 4}  // önceki yanıttaki next_cursor
+    }
     
     Response:
         {
             "success": true,
             "users": [...],
-            "count": 3
+            "count": 3,
+            "next_cursor": null
         }
     """
     try:
         data = request.get_json()
-        query = data.get('query', '').strip().lower()
+        query = data.get('query', '').strip()
         
         if not query:
             return jsonify({
@@ -169,18 +189,42 @@ def search_users():
                 'error': 'Arama sorgusu gerekli'
             }), 400
         
-        # Tüm kullanıcıları al ve filtrele
-        all_users = get_all_users()
+        try:
+            limit = max(1, min(int(data.get('limit', 20)), 100))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Geçersiz limit'
+            }), 400
         
-        filtered_users = [
-            user for user in all_users
-            if query in user['username'].lower()
-        ]
+        cursor = data.get('cursor')
+        after = None
+        if cursor:
+            if (not isinstance(cursor, dict)
+                    or not isinstance(cursor.get('username'), str)
+                    or not isinstance(cursor.get('id'), int)):
+                return jsonify({
+                    'success': False,
+                    'error': 'Geçersiz cursor'
+                }), 400
+            after = (cursor['username'], cursor['id'])
+        
+        users = search_usernames(
+            query,
+            limit=limit,
+            after=after,
+            substring=data.get('mode') == 'substring'
+        )
+        
+        next_cursor = None
+        if len(users) >= limit:
+            next_cursor = {'username': users[-1]['username'], 'id': users[-1]['id']}
         
         return jsonify({
             'success': True,
-            'users': filtered_users,
-            'count': len(filtered_users)
+            'users': users,
+            'count': len(users),
+            'next_cursor': next_cursor
         })
     
     except Exception as e:
@@ -1,23 +1,31 @@
 # app.py
 from flask import Flask, render_template, redirect, url_for, request
 from flask_socketio import SocketIO
+from config import Config
 from extensions import socketio
 from auth.routers import auth_bp
-from api import users_api, groups_api, messages_api
+from api import users_api, groups_api, messages_api, stats_api
+from api.serialization import FastJSONProvider
 import messaging.socket_handler  # Socket olayları burada
 
 # Flask uygulaması
 app = Flask(__name__, template_folder="templates", static_folder="static")
 app.config['SECRET_KEY'] = 'supersecretkey'
+app.json = FastJSONProvider(app)  # orjson varsa jsonify onunla serileştirir
 
 # Blueprint kayıtları
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(users_api, url_prefix='/api/users')
 app.register_blueprint(groups_api, url_prefix='/api/groups')
 app.register_blueprint(messages_api, url_prefix='/api/messages')
+app.register_blueprint(stats_api, url_prefix='/api/stats')
 
-# SocketIO başlatma
-socketio.init_app(app, cors_allowed_origins="*")
+# SocketIO başlatma (SOCKETIO_MESSAGE_QUEUE ayarlıysa çoklu worker modu)
+socketio_options = {}
+if Config.SOCKETIO_MESSAGE_QUEUE:
+    from core.cluster import init_cluster
+    socketio_options = init_cluster(Config.SOCKETIO_MESSAGE_QUEUE)
+socketio.init_app(app, cors_allowed_origins="*", **socketio_options)
 
 # ---- Web arayüzü yönlendirmeleri ---- #
 
@@ -63,6 +71,8 @@ def chat():
 
 # ---- Ana çalıştırma ---- #
 if __name__ == '__main__':
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    # Küme modunda reloader ikinci bir süreç başlatmasın
+    socketio.run(app, host=Config.WEB_HOST, port=Config.WEB_PORT, debug=True,
+                 use_reloader=not Config.SOCKETIO_MESSAGE_QUEUE)
 
 
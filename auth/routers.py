@@ -1,6 +1,7 @@
 # auth/routes.py
 from flask import Blueprint, request, jsonify, session, render_template
 from database.queries import register_user, authenticate_user, set_user_online
+from database.passwords import PasswordPoolBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -13,7 +14,16 @@ def login():
     username = data.get('username')
     password = data.get('password')
     
-    success, user = authenticate_user(username, password)
+    try:
+        success, user = authenticate_user(username, password)
+    except PasswordPoolBusy:
+        # Giriş fırtınası: istemci biraz sonra tekrar denesin
+        response = jsonify({
+            'success': False,
+            'message': 'Sunucu şu anda yoğun, lütfen tekrar deneyin'
+        })
+        response.headers['Retry-After'] = '2'
+        return response, 503
     
     if success:
         session['user_id'] = user['id']
@@ -11,18 +11,120 @@ class Config:
     DEBUG = True
     
     # Database
-    DB_FILE = BASE_DIR / 'messaging.db'
+    DB_FILE = Path(os.environ.get('DB_FILE', BASE_DIR / 'messaging.db'))
+
+    # Bağlantı havuzu: tek yazıcı + salt-okunur okuyucular
+    DB_READER_COUNT = int(os.environ.get('DB_READER_COUNT', 4))
+    DB_JOURNAL_MODE = os.environ.get('DB_JOURNAL_MODE', 'WAL')
+    DB_SYNCHRONOUS = os.environ.get('DB_SYNCHRONOUS', 'NORMAL')
+    DB_CACHE_SIZE = int(os.environ.get('DB_CACHE_SIZE', -16000))  # negatif = KiB
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', 256 * 1024 * 1024))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 10000))
+    DB_CACHED_STATEMENTS = int(os.environ.get('DB_CACHED_STATEMENTS', 256))
+
+    # Mesaj partition'ları: geçmiş aylar ayrı dosyalarda, sadece bu ay sıcak
+    PARTITION_DIR = BASE_DIR / 'partitions'
+    MAX_ATTACHED_PARTITIONS = int(os.environ.get('MAX_ATTACHED_PARTITIONS', 8))
+    PARTITION_CACHE_TTL = float(os.environ.get('PARTITION_CACHE_TTL', 5))
+
+    # Kullanıcı önbelleği (LRU + TTL)
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', '1') == '1'
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+
+    # Grup üyelik indeksi: diğer süreçlerin değişiklikleri için yeniden yükleme aralığı (sn, 0 = hiç)
+    # TCP sunucusu web tarafındaki katılma / ayrılmaları sadece bu yeniden yüklemeyle görür
+    MEMBERSHIP_INDEX_TTL = float(os.environ.get('MEMBERSHIP_INDEX_TTL', 30))
+
+    # Grup listesi önbelleği: değişikliklerde temizlenir; TTL diğer süreçlerin değişiklikleri için (sn)
+    GROUP_DIRECTORY_TTL = float(os.environ.get('GROUP_DIRECTORY_TTL', 60))
+
+    # ETag sürümleri bu aralıkla (sn) kendiliğinden ilerler; başka süreçlerin yazdıkları için üst sınır (0 = kapalı)
+    ETAG_VERSION_TTL = float(os.environ.get('ETAG_VERSION_TTL', 10))
+
+    # Oda başına son mesaj tamponu: derinlik (mesaj), toplam bellek bütçesi (MB), yeniden ısıtma (sn, 0 = hiç)
+    RECENT_MESSAGES_ENABLED = os.environ.get('RECENT_MESSAGES_ENABLED', '1') == '1'
+    RECENT_MESSAGES_DEPTH = int(os.environ.get('RECENT_MESSAGES_DEPTH', 200))
+    RECENT_MESSAGES_BUDGET_MB = float(os.environ.get('RECENT_MESSAGES_BUDGET_MB', 32))
+    RECENT_MESSAGES_TTL = float(os.environ.get('RECENT_MESSAGES_TTL', 10))
+
+    # Sorgu metrikleri: bu süreyi (ms) aşan sorgular yavaş sorgu kaydına yazılır (0 = kapalı)
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 100))
+
+    # Mesaj yazıcı (write-behind): mesajlar kuyruğa alınıp toplu yazılır
+    # Varsayılan kapalı: açıkken save_message batch commit edilene kadar
+    # (en fazla MESSAGE_FLUSH_INTERVAL_MS) bekler; yüksek yazma yükünde açın
+    MESSAGE_WRITE_BEHIND = os.environ.get('MESSAGE_WRITE_BEHIND', '0') == '1'
+    MESSAGE_BATCH_SIZE = int(os.environ.get('MESSAGE_BATCH_SIZE', 128))
+    MESSAGE_FLUSH_INTERVAL_MS = int(os.environ.get('MESSAGE_FLUSH_INTERVAL_MS', 20))
+
+    # Çevrimiçi durum yazıcı: is_online / last_seen güncellemeleri periyodik batch'lerle yazılır
+    PRESENCE_WRITE_BEHIND = os.environ.get('PRESENCE_WRITE_BEHIND', '1') == '1'
+    PRESENCE_FLUSH_INTERVAL_MS = int(os.environ.get('PRESENCE_FLUSH_INTERVAL_MS', 1000))
     
+    # Şifre hash'leme (PBKDF2-SHA256): iterasyon sayısı, worker sayısı,
+    # bekleyebilecek iş sayısı ve kuyruk doluyken bekleme süresi (sn)
+    PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 600000))
+    PASSWORD_WORKERS = int(os.environ.get('PASSWORD_WORKERS', min(4, os.cpu_count() or 1)))
+    PASSWORD_QUEUE_SIZE = int(os.environ.get('PASSWORD_QUEUE_SIZE', 64))
+    PASSWORD_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_QUEUE_TIMEOUT', 5))
+
     # TCP Server
     TCP_HOST = '0.0.0.0'
     TCP_PORT = 9999
+    # 'asyncio' (tek olay döngüsü) veya 'threaded' (bağlantı başına thread)
+    TCP_SERVER_MODE = os.environ.get('TCP_SERVER_MODE', 'asyncio')
+    # listen() kuyruğu: yeniden bağlanma fırtınalarında bağlantılar düşmesin
+    TCP_BACKLOG = int(os.environ.get('TCP_BACKLOG', 1024))
+    # asyncio modunda mesaj işleyicilerini (DB, şifre) çalıştıran thread sayısı
+    TCP_HANDLER_WORKERS = int(os.environ.get('TCP_HANDLER_WORKERS', 8))
+    # Tek bir protokol çerçevesinin (mesajın) en büyük boyutu (bayt)
+    TCP_MAX_FRAME_SIZE = int(os.environ.get('TCP_MAX_FRAME_SIZE', 1024 * 1024))
+    # asyncio modunda bağlantı başına işlenmeyi bekleyen en fazla mesaj; aşılınca okuma durur
+    TCP_MAX_PENDING_MESSAGES = int(os.environ.get('TCP_MAX_PENDING_MESSAGES', 64))
+    # Login'de istemciyle anlaşılabilecek mesaj kodlamaları (tercih sırasıyla, bkz. core/codec.py)
+    TCP_ENCODINGS = os.environ.get('TCP_ENCODINGS', 'binary,json')
+    # Bağlantı başına giden kuyruk (bayt): high aşılınca istemciden okuma durur, low'a inince sürer
+    TCP_SEND_HIGH_WATERMARK = int(os.environ.get('TCP_SEND_HIGH_WATERMARK', 1024 * 1024))
+    TCP_SEND_LOW_WATERMARK = int(os.environ.get('TCP_SEND_LOW_WATERMARK', 256 * 1024))
+    # Giden kuyruğun mutlak sınırı (bayt)
+    TCP_SEND_QUEUE_LIMIT = int(os.environ.get('TCP_SEND_QUEUE_LIMIT', 4 * 1024 * 1024))
+    # Yavaş istemci: 'disconnect' (limit aşılınca veya high üstünde TIMEOUT sn kalınca kapat)
+    # ya da 'drop' (limiti aşan mesajları at, bağlantıyı koru)
+    TCP_SLOW_CONSUMER_POLICY = os.environ.get('TCP_SLOW_CONSUMER_POLICY', 'disconnect')
+    TCP_SLOW_CONSUMER_TIMEOUT = float(os.environ.get('TCP_SLOW_CONSUMER_TIMEOUT', 10))
     
     # Web Server
     WEB_HOST = '0.0.0.0'
-    WEB_PORT = 5000
+    WEB_PORT = int(os.environ.get('WEB_PORT', 5000))
     
+    # JSON yanıtları: orjson kuruluysa onunla serileştirilir (0 = standart json)
+    FAST_JSON = os.environ.get('FAST_JSON', '1') == '1'
+    # Geçmiş sayfalarında istenebilecek en büyük limit
+    MAX_PAGE = int(os.environ.get('MAX_PAGE', 10000))
+    # En az bu kadar satır dönen liste yanıtları bellekte toplanmadan akıtılır
+    STREAM_MIN_ROWS = int(os.environ.get('STREAM_MIN_ROWS', 1000))
+    # Akıtılan listeler bu boyutta keyset batch'leriyle okunur; okuyucu
+    # bağlantısı batch'ler arasında havuza döner
+    STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 500))
+    # Mesaj geçmişi dışa aktarma (NDJSON): keyset sayfa boyutu
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
     # SocketIO
     SOCKETIO_CORS_ALLOWED_ORIGINS = "*"
+
+    # Çoklu worker modu: ayarlıysa emit'ler bu kuyruk üzerinden tüm worker'lara gider
+    # 'broker://127.0.0.1:6390' yerel broker (python -m core.broker), 'redis://...' da olur
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    BROKER_HOST = os.environ.get('BROKER_HOST', '127.0.0.1')
+    BROKER_PORT = int(os.environ.get('BROKER_PORT', 6390))
+    PRESENCE_SNAPSHOT_INTERVAL = float(os.environ.get('PRESENCE_SNAPSHOT_INTERVAL', 5))
+    BROKER_MAX_FRAME_SIZE = int(os.environ.get('BROKER_MAX_FRAME_SIZE', 16 * 1024 * 1024))
+    # Abone başına giden kuyruk sınırı (bayt); aşan (yavaş) abone düşürülür
+    BROKER_SEND_QUEUE_LIMIT = int(os.environ.get('BROKER_SEND_QUEUE_LIMIT', 32 * 1024 * 1024))
+    # Paylaşılan gizli anahtar: ayarlıysa istemciler önce bununla doğrulanır.
+    # Socket.IO yükleri pickle'dır; loopback dışı adreste dinlemek için zorunlu
+    BROKER_SECRET = os.environ.get('BROKER_SECRET', '')
     
     # Session
     SESSION_TYPE = 'filesystem'
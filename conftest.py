@@ -0,0 +1,45 @@
+# conftest.py
+"""
+pytest ortak ayarları
+
+db fixture'ı her test için geçici bir veritabanı ve partition dizini
+kurar; süreç geneli önbellekler (kullanıcı, üyelik indeksi, grup listesi,
+son mesajlar, partition listesi) test başında boşaltılır.
+"""
+
+import os
+
+# Şifre hash'leri testlerde ucuz olsun (config import edilmeden önce)
+os.environ.setdefault('PASSWORD_HASH_ITERATIONS', '1000')
+
+import pytest
+
+from config import Config
+from database import db_manager, partitions
+from database.cache import group_directory_cache, membership_index, recent_messages, user_cache
+from database.presence_writer import shutdown_presence_writer
+
+
+# Kök dizindeki eski elle çalıştırılan betik (gerçek veritabanına yazar)
+collect_ignore = ['test_database.py']
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Boş, başlatılmış geçici veritabanı"""
+    monkeypatch.setattr(db_manager, 'DB_FILE', tmp_path / 'test.db')
+    monkeypatch.setattr(Config, 'PARTITION_DIR', tmp_path / 'partitions')
+    db_manager.close_db()
+
+    user_cache.clear()
+    group_directory_cache.clear()
+    if recent_messages is not None:
+        recent_messages.clear()
+    membership_index.load(())
+    partitions.invalidate_partition_cache()
+
+    db_manager.init_db()
+    yield db_manager
+    shutdown_presence_writer()
+    db_manager.close_db()
+    partitions.invalidate_partition_cache()
@@ -0,0 +1,413 @@
+# core/broker.py
+"""
+Yerel Pub/Sub Broker
+Aynı makinedeki web worker'larını birbirine bağlayan küçük mesaj aracısı.
+Socket.IO mesaj kuyruğu (Redis yerine) ve küme olayları bunun üzerinden akar.
+
+Socket.IO yükleri pickle ile kodlandığından broker'a bağlanabilen her
+süreç worker'larda kod çalıştırabilir: broker varsayılan olarak sadece
+loopback'te dinler ve Config.BROKER_SECRET ayarlıysa istemciler ilk
+çerçevede bu anahtarla doğrulanır (loopback dışı adreste zorunludur).
+
+Kullanım (proje kökünden):
+    python -m core.broker
+"""
+
+import hmac
+import ipaddress
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from config import Config
+from . import protocol
+from .protocol import FrameDecoder, ProtocolError, recv_frames
+
+
+# Çerçeve: protocol.py uzunluk öneki + 1 bayt işlem + 1 bayt kanal uzunluğu + kanal + veri
+_OP = struct.Struct('!BB')
+
+OP_SUBSCRIBE = 1
+OP_PUBLISH = 2
+OP_MESSAGE = 3
+OP_AUTH = 4
+
+
+def encode_frame(op, channel, data=b''):
+    """Broker çerçevesi oluşturur"""
+    channel = channel.encode('utf-8')
+    return protocol.encode_frame(_OP.pack(op, len(channel)) + channel + data,
+                                 Config.BROKER_MAX_FRAME_SIZE)
+
+
+def read_frames(sock):
+    """
+    Soketten çerçeveleri okur
+
+    Yields:
+        tuple: (işlem, kanal, veri) - bağlantı kapanınca biter
+    """
+    decoder = FrameDecoder(max_frame_size=Config.BROKER_MAX_FRAME_SIZE)
+    for body in recv_frames(sock, decoder):
+        op, channel_length = _OP.unpack_from(body)
+        start = _OP.size
+        channel = body[start:start + channel_length].decode('utf-8')
+        yield op, channel, body[start + channel_length:]
+
+
+def parse_url(url):
+    """'broker://127.0.0.1:6390' -> ('127.0.0.1', 6390)"""
+    parsed = urlparse(url)
+    return parsed.hostname or Config.BROKER_HOST, parsed.port or Config.BROKER_PORT
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+# =====================================================
+# BROKER SUNUCUSU
+# =====================================================
+
+class _Subscriber:
+    """
+    Abone bağlantısı
+
+    Yayın soket yazmasını beklemez: çerçeve abonenin sınırlı giden
+    kuyruğuna eklenir ve abonenin yazıcı thread'i gönderir. Kuyruk
+    limit baytı aşacaksa push False döner ve abone düşürülür; yavaş
+    veya takılmış bir worker diğer abonelere teslimatı geciktirmez.
+    """
+
+    def __init__(self, sock, limit):
+        self.sock = sock
+        self.limit = limit
+        self.channels = set()
+        self.frames = deque()
+        self.nbytes = 0  # Kuyrukta + gönderilmekte olan baytlar
+        self.closed = False
+        self._ready = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        """Yazıcı thread'ini başlatır (ilk abonelikte)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop,
+                                            name='broker-subscriber', daemon=True)
+            self._thread.start()
+
+    def push(self, frame):
+        """
+        Çerçeveyi giden kuyruğa ekler
+
+        Returns:
+            bool: Eklendi mi? (False: abone kapalı veya kuyruk dolu)
+        """
+        with self._ready:
+            if self.closed or self.nbytes + len(frame) > self.limit:
+                return False
+            self.frames.append(frame)
+            self.nbytes += len(frame)
+            self._ready.notify()
+        return True
+
+    def _write_loop(self):
+        while True:
+            with self._ready:
+                while not self.frames and not self.closed:
+                    self._ready.wait()
+                if self.closed:
+                    return
+                frames = list(self.frames)
+                self.frames.clear()
+            try:
+                self.sock.sendall(b''.join(frames))
+            except OSError:
+                self.close()
+                return
+            with self._ready:
+                self.nbytes -= sum(len(frame) for frame in frames)
+
+    def close(self):
+        """Kuyruğu bırakır; soket kapatılarak okuma döngüsü de sonlanır"""
+        with self._ready:
+            if self.closed:
+                return
+            self.closed = True
+            self.frames.clear()
+            self._ready.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class Broker:
+    """
+    Kanal tabanlı pub/sub aracısı
+
+    Özellikler:
+    - İstemci SUBSCRIBE ile kanallara abone olur, PUBLISH ile yayın yapar
+    - Yayın, gönderen dahil kanalın tüm abonelerine iletilir (Redis gibi)
+    - Gönderilemeyen veya giden kuyruğu send_queue_limit'i aşan aboneler
+      düşürülür (yeniden bağlanınca önbelleklerini boşaltırlar)
+    - secret ayarlıysa bağlantının ilk çerçevesi OP_AUTH olmalıdır
+    """
+
+    def __init__(self, host=None, port=None, secret=None, send_queue_limit=None):
+        self.host = host or Config.BROKER_HOST
+        self.port = port or Config.BROKER_PORT
+        self.secret = (Config.BROKER_SECRET if secret is None else secret).encode('utf-8')
+        self.send_queue_limit = max(send_queue_limit or Config.BROKER_SEND_QUEUE_LIMIT,
+                                    Config.BROKER_MAX_FRAME_SIZE)
+        self.server_socket = None
+        self.running = False
+        self._channels = {}  # kanal -> {_Subscriber}
+        self._lock = threading.Lock()
+
+        # İstatistikler
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def start(self):
+        """Broker'ı başlatır (bloklar)"""
+        if not self.secret and not _is_loopback(self.host):
+            raise ValueError(f"Broker {self.host} adresinde BROKER_SECRET olmadan "
+                             "dinleyemez (sadece loopback)")
+
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(128)
+        self.running = True
+
+        print(f"📡 Broker başlatıldı: {self.host}:{self.port}")
+
+        while self.running:
+            try:
+                client_socket, _ = self.server_socket.accept()
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                threading.Thread(
+                    target=self.handle_client,
+                    args=(client_socket,),
+                    daemon=True
+                ).start()
+            except OSError as e:
+                if self.running:
+                    print(f"❌ Broker hatası: {e}")
+
+    def start_in_background(self):
+        """Broker'ı daemon thread'de başlatır (testler / benchmark için)"""
+        thread = threading.Thread(target=self.start, name='broker', daemon=True)
+        thread.start()
+        while not self.running:
+            time.sleep(0.01)
+        return thread
+
+    def handle_client(self, client_socket):
+        subscriber = _Subscriber(client_socket, self.send_queue_limit)
+        try:
+            frames = read_frames(client_socket)
+            if self.secret and not self._authenticate(next(frames, None)):
+                self.rejected += 1
+                return
+            for op, channel, data in frames:
+                if op == OP_SUBSCRIBE:
+                    subscriber.start()
+                    with self._lock:
+                        if subscriber.closed:
+                            break
+                        self._channels.setdefault(channel, set()).add(subscriber)
+                        subscriber.channels.add(channel)
+                elif op == OP_PUBLISH:
+                    self.publish(channel, data)
+        except (OSError, ProtocolError):
+            pass
+        finally:
+            subscriber.close()
+            self._unsubscribe(subscriber)
+            client_socket.close()
+
+    def _authenticate(self, frame):
+        """İlk çerçeve doğru anahtarı taşıyan OP_AUTH mı?"""
+        if frame is None:
+            return False
+        op, _, data = frame
+        return op == OP_AUTH and hmac.compare_digest(data, self.secret)
+
+    def publish(self, channel, data):
+        """Veriyi kanalın tüm abonelerinin giden kuyruğuna ekler (bloklamaz)"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        self.published += 1
+
+        frame = encode_frame(OP_MESSAGE, channel, data)
+        for subscriber in subscribers:
+            if subscriber.push(frame):
+                self.delivered += 1
+            else:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber):
+        """Kuyruğu dolan (veya kapanmış) aboneyi düşürür"""
+        if not subscriber.closed:
+            self.dropped += 1
+            print(f"🐢 Yavaş abone düşürüldü: {subscriber.nbytes} bayt kuyrukta")
+        subscriber.close()
+        self._unsubscribe(subscriber)
+
+    def _unsubscribe(self, subscriber):
+        with self._lock:
+            for channel in subscriber.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._channels[channel]
+            subscriber.channels.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'channels': {name: len(subs) for name, subs in self._channels.items()},
+                'published': self.published,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'rejected': self.rejected
+            }
+
+    def stop(self):
+        """Broker'ı durdurur"""
+        self.running = False
+        if self.server_socket:
+            self.server_socket.close()
+
+
+# =====================================================
+# İSTEMCİ
+# =====================================================
+
+class BrokerClient:
+    """
+    Broker istemcisi
+
+    Yayın için paylaşılan tek bir bağlantı kullanır; her subscribe()
+    çağrısı kendi bağlantısını açar ve koparsa yeniden bağlanır.
+    secret ayarlıysa her bağlantı önce OP_AUTH ile doğrulanır.
+    """
+
+    def __init__(self, host=None, port=None, reconnect_delay=1.0, secret=None):
+        self.host = host or Config.BROKER_HOST
+        self.port = port or Config.BROKER_PORT
+        self.reconnect_delay = reconnect_delay
+        self.secret = (Config.BROKER_SECRET if secret is None else secret).encode('utf-8')
+        self._publish_socket = None
+        self._publish_lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_url(cls, url):
+        host, port = parse_url(url)
+        return cls(host, port)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.secret:
+            sock.sendall(encode_frame(OP_AUTH, '', self.secret))
+        return sock
+
+    def publish(self, channel, data):
+        """
+        Kanala veri yayınlar
+
+        Args:
+            channel (str): Kanal adı
+            data (bytes): Yük
+        """
+        frame = encode_frame(OP_PUBLISH, channel, data)
+        with self._publish_lock:
+            # Kopmuş bağlantıyı bir kez yeniden kurmayı dene
+            for attempt in (1, 2):
+                try:
+                    if self._publish_socket is None:
+                        self._publish_socket = self._connect()
+                    self._publish_socket.sendall(frame)
+                    return
+                except OSError:
+                    if self._publish_socket is not None:
+                        self._publish_socket.close()
+                    self._publish_socket = None
+                    if attempt == 2:
+                        raise
+
+    def subscribe(self, *channels, on_reconnect=None):
+        """
+        Kanallara abone olur
+
+        Broker kopukken yayınlanan mesajlar sonradan iletilmez; bunlara
+        dayanan durum (ör. önbellekler) on_reconnect'te yenilenmelidir.
+
+        Args:
+            *channels (str): Kanal adları
+            on_reconnect (callable, optional): Kopan bağlantı yeniden
+                kurulup abonelikler yenilendikten sonra çağrılır
+
+        Yields:
+            tuple: (kanal, veri) - bağlantı koparsa yeniden bağlanılır
+        """
+        connected = False
+        while not self._closed:
+            try:
+                sock = self._connect()
+            except OSError as e:
+                print(f"⚠️ Broker'a bağlanılamadı ({self.host}:{self.port}): {e}")
+                time.sleep(self.reconnect_delay)
+                continue
+
+            try:
+                for channel in channels:
+                    sock.sendall(encode_frame(OP_SUBSCRIBE, channel))
+                if connected and on_reconnect is not None:
+                    on_reconnect()
+                connected = True
+                for op, channel, data in read_frames(sock):
+                    if self._closed:
+                        break
+                    if op == OP_MESSAGE:
+                        yield channel, data
+                if not self._closed:
+                    raise ConnectionError('Bağlantı kapandı')
+            except (OSError, ProtocolError):
+                if not self._closed:
+                    print("⚠️ Broker bağlantısı koptu, yeniden bağlanılıyor...")
+                    time.sleep(self.reconnect_delay)
+            finally:
+                sock.close()
+
+    def close(self):
+        self._closed = True
+        with self._publish_lock:
+            if self._publish_socket is not None:
+                self._publish_socket.close()
+                self._publish_socket = None
+
+
+# Standalone çalıştırma
+if __name__ == '__main__':
+    broker = Broker()
+    try:
+        broker.start()
+    except KeyboardInterrupt:
+        print("\n🛑 Broker durduruluyor...")
+        broker.stop()
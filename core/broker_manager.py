@@ -0,0 +1,32 @@
+# core/broker_manager.py
+import pickle
+
+from socketio import PubSubManager
+
+from .broker import BrokerClient
+
+
+class LocalBrokerManager(PubSubManager):
+    """
+    Yerel broker (core/broker.py) üzerinden çalışan Socket.IO istemci yöneticisi
+
+    RedisManager ile aynı şekilde çalışır: emit / oda emit'leri broker
+    kanalına yayınlanır ve her worker kendi bağlı istemcilerine iletir.
+    Yük, python-socketio'nun diğer yöneticileri gibi pickle ile kodlanır:
+    broker sadece loopback'te dinler, BROKER_SECRET ayarlıysa bağlantılar
+    bu anahtarla doğrulanır (bkz. core/broker.py).
+    """
+
+    name = 'broker'
+
+    def __init__(self, url='broker://127.0.0.1:6390', channel='socketio',
+                 write_only=False, logger=None):
+        self.client = BrokerClient.from_url(url)
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+    def _publish(self, data):
+        self.client.publish(self.channel, pickle.dumps(data))
+
+    def _listen(self):
+        for _, message in self.client.subscribe(self.channel):
+            yield message
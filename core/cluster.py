@@ -0,0 +1,76 @@
+# core/cluster.py
+"""
+Çoklu Worker Modu
+Aynı makinede birden fazla web worker'ını tek sunucu gibi çalıştırır:
+- Socket.IO emit'leri broker üzerinden tüm worker'lara dağıtılır
+- Çevrimiçi oturumlar (presence) worker'lar arasında paylaşılır
+- Bellek içi önbellekleri değiştiren yazmalar diğer worker'lara duyurulur
+"""
+
+import json
+import threading
+
+from config import Config
+from database import cluster
+from database.queries import apply_cluster_event, invalidate_caches
+from messaging.presence import presence
+from .broker import BrokerClient
+
+
+CLUSTER_CHANNEL = 'cluster'
+PRESENCE_CHANNEL = 'presence'
+
+
+def init_cluster(url):
+    """
+    Küme modunu başlatır
+
+    Args:
+        url (str): Mesaj kuyruğu adresi. 'broker://host:port' yerel broker'ı
+                   (core/broker.py) kullanır; diğer adresler (örn. redis://)
+                   doğrudan Flask-SocketIO'ya verilir ve sadece emit'ler paylaşılır.
+
+    Returns:
+        dict: socketio.init_app'e verilecek ek ayarlar
+    """
+    if not url.startswith('broker://'):
+        print("⚠️ Harici mesaj kuyruğu: çevrimiçi durum ve önbellekler worker başına kalır")
+        return {'message_queue': url}
+
+    from .broker_manager import LocalBrokerManager
+
+    client = BrokerClient.from_url(url)
+
+    def publisher(channel):
+        return lambda event: client.publish(channel, json.dumps(event).encode('utf-8'))
+
+    threading.Thread(target=_listen, args=(client,), name='cluster-events',
+                     daemon=True).start()
+    cluster.set_publisher(publisher(CLUSTER_CHANNEL))
+    presence.attach(publisher(PRESENCE_CHANNEL), cluster.WORKER_ID,
+                    Config.PRESENCE_SNAPSHOT_INTERVAL)
+
+    print(f"🔗 Küme modu: {url} (worker {cluster.WORKER_ID})")
+    return {'client_manager': LocalBrokerManager(url)}
+
+
+def _listen(client):
+    """Diğer worker'ların olaylarını uygular"""
+    for channel, data in client.subscribe(CLUSTER_CHANNEL, PRESENCE_CHANNEL,
+                                          on_reconnect=_resync):
+        try:
+            event = json.loads(data)
+            if channel == PRESENCE_CHANNEL:
+                presence.apply(event)
+            else:
+                apply_cluster_event(event)
+        except Exception as e:
+            print(f"⚠️ Küme olayı uygulanamadı: {e}")
+
+
+def _resync():
+    """Broker'a yeniden bağlanıldı: kopukken kaçırılan olayları telafi et"""
+    try:
+        invalidate_caches()
+    except Exception as e:
+        print(f"⚠️ Önbellekler sıfırlanamadı: {e}")
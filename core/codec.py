@@ -0,0 +1,421 @@
+# core/codec.py
+"""
+TCP Mesaj Kodlamaları
+Çerçeve yükü (core/protocol.py) iki biçimden birinde olabilir:
+
+- 'json': UTF-8 JSON (varsayılan, her istemci anlar)
+- 'binary': msgpack uyumlu ikili biçim; sözlük anahtarları tek baytlık
+  alan numaralarıyla gönderilir ("type", "sender", "message" ... her
+  mesajda tekrar yazılmaz)
+
+İkili yükler JSON'da geçersiz olan 0xC1 baytıyla başlar; decode() biçimi
+ilk bayttan anlar. Böylece kodlama login sırasında değiştiğinde yolda
+olan eski biçimli mesajlar da doğru çözülür. Kodlama login el
+sıkışmasında seçilir:
+
+    istemci: {"type": "login", ..., "encodings": ["binary", "json"]}
+    sunucu:  {"type": "login_response", ..., "encoding": "binary"}
+
+login_response hâlâ JSON gönderilir; sonraki mesajlar seçilen biçimdedir.
+"""
+
+import json
+import struct
+
+from config import Config
+from .protocol import ProtocolError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+
+# =====================================================
+# Alan numaraları
+# =====================================================
+
+# Sık kullanılan anahtarlar; sıra değişmemeli (numara = listedeki indeks).
+# Yeni alanlar SONA eklenir, en fazla 128 alan.
+FIELDS = (
+    'type', 'id', 'success', 'error', 'message', 'sender', 'sender_id',
+    'receiver_id', 'user', 'user_id', 'username', 'password', 'group_id',
+    'message_id', 'timestamp', 'content', 'users', 'encoding', 'encodings',
+    'is_own', 'seen', 'delivered', 'target_id', 'group_name', 'data',
+    'message_type',
+)
+assert len(FIELDS) <= 0x80
+
+_FIELD_IDS = {name: bytes([number]) for number, name in enumerate(FIELDS)}
+
+# İkili yüklerin ilk baytı (msgpack'te "hiç kullanılmaz")
+BINARY_MAGIC = 0xC1
+
+
+# =====================================================
+# İkili biçim (msgpack alt kümesi)
+# =====================================================
+
+_B = struct.Struct('!B')
+_H = struct.Struct('!H')
+_I = struct.Struct('!I')
+_b = struct.Struct('!b')
+_h = struct.Struct('!h')
+_i = struct.Struct('!i')
+_q = struct.Struct('!q')
+_Q = struct.Struct('!Q')
+_d = struct.Struct('!d')
+
+_NIL, _FALSE, _TRUE = b'\xc0', b'\xc2', b'\xc3'
+
+
+def _pack_str(value, out):
+    data = value.encode('utf-8')
+    size = len(data)
+    if size < 32:
+        out.append(bytes((0xA0 | size,)))
+    elif size < 0x100:
+        out.append(b'\xd9' + _B.pack(size))
+    elif size < 0x10000:
+        out.append(b'\xda' + _H.pack(size))
+    else:
+        out.append(b'\xdb' + _I.pack(size))
+    out.append(data)
+
+
+def _pack_int(value, out):
+    if 0 <= value < 0x80:
+        out.append(bytes((value,)))
+    elif -32 <= value < 0:
+        out.append(bytes((value & 0xFF,)))
+    elif -0x80 <= value < 0x80:
+        out.append(b'\xd0' + _b.pack(value))
+    elif -0x8000 <= value < 0x8000:
+        out.append(b'\xd1' + _h.pack(value))
+    elif -0x80000000 <= value < 0x80000000:
+        out.append(b'\xd2' + _i.pack(value))
+    elif -0x8000000000000000 <= value < 0x8000000000000000:
+        out.append(b'\xd3' + _q.pack(value))
+    elif 0 <= value < 0x10000000000000000:
+        out.append(b'\xcf' + _Q.pack(value))
+    else:
+        raise ValueError(f'Tamsayı 64 bite sığmıyor: {value}')
+
+
+def _pack(value, out):
+    """value'yu msgpack parçaları olarak out listesine ekler"""
+    kind = type(value)
+    if kind is str:
+        _pack_str(value, out)
+    elif kind is dict:
+        size = len(value)
+        if size < 16:
+            out.append(bytes((0x80 | size,)))
+        elif size < 0x10000:
+            out.append(b'\xde' + _H.pack(size))
+        else:
+            out.append(b'\xdf' + _I.pack(size))
+        for key, item in value.items():
+            if type(key) is not str:
+                key = _json_key(key)
+            field = _FIELD_IDS.get(key)
+            if field is not None:
+                out.append(field)
+            else:
+                _pack_str(key, out)
+            _pack(item, out)
+    elif value is None:
+        out.append(_NIL)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif kind is int:
+        _pack_int(value, out)
+    elif kind is float:
+        out.append(b'\xcb' + _d.pack(value))
+    elif kind is list or kind is tuple:
+        size = len(value)
+        if size < 16:
+            out.append(bytes((0x90 | size,)))
+        elif size < 0x10000:
+            out.append(b'\xdc' + _H.pack(size))
+        else:
+            out.append(b'\xdd' + _I.pack(size))
+        for item in value:
+            _pack(item, out)
+    elif kind is bytes or kind is bytearray:
+        size = len(value)
+        if size < 0x100:
+            out.append(b'\xc4' + _B.pack(size))
+        elif size < 0x10000:
+            out.append(b'\xc5' + _H.pack(size))
+        else:
+            out.append(b'\xc6' + _I.pack(size))
+        out.append(bytes(value))
+    # Alt sınıflar (IntEnum, OrderedDict, ...) için yavaş yol
+    elif isinstance(value, bool):
+        out.append(_TRUE if value else _FALSE)
+    elif isinstance(value, int):
+        _pack_int(int(value), out)
+    elif isinstance(value, float):
+        out.append(b'\xcb' + _d.pack(value))
+    elif isinstance(value, str):
+        _pack_str(str(value), out)
+    elif isinstance(value, dict):
+        _pack(dict(value), out)
+    elif isinstance(value, (list, tuple)):
+        _pack(list(value), out)
+    else:
+        raise TypeError(f'{type(value).__name__} ikili kodlanamaz')
+
+
+def _json_key(key):
+    """JSON'daki gibi str olmayan anahtarları metne çevirir (1 -> "1", True -> "true")"""
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, (int, float)):
+        return json.dumps(key)
+    if isinstance(key, str):
+        return str(key)
+    raise TypeError(f'{type(key).__name__} sözlük anahtarı olamaz')
+
+
+def _unpack(data, pos):
+    """
+    data[pos:] konumundaki değeri çözer
+
+    Returns:
+        tuple: (değer, sonraki konum)
+    """
+    code = data[pos]
+    pos += 1
+
+    # fixstr
+    if 0xA0 <= code <= 0xBF:
+        end = pos + (code & 0x1F)
+        return data[pos:end].decode('utf-8'), end
+    # positive fixint
+    if code < 0x80:
+        return code, pos
+    # fixmap
+    if code <= 0x8F:
+        return _unpack_map(data, pos, code & 0x0F)
+    # fixarray
+    if code <= 0x9F:
+        return _unpack_array(data, pos, code & 0x0F)
+    # negative fixint
+    if code >= 0xE0:
+        return code - 0x100, pos
+
+    if code == 0xC0:
+        return None, pos
+    if code == 0xC2:
+        return False, pos
+    if code == 0xC3:
+        return True, pos
+
+    if code == 0xD9:
+        size = data[pos]
+        pos += 1
+        return data[pos:pos + size].decode('utf-8'), pos + size
+    if code == 0xDA:
+        (size,) = _H.unpack_from(data, pos)
+        pos += 2
+        return data[pos:pos + size].decode('utf-8'), pos + size
+    if code == 0xDB:
+        (size,) = _I.unpack_from(data, pos)
+        pos += 4
+        return data[pos:pos + size].decode('utf-8'), pos + size
+
+    fixed = _FIXED.get(code)
+    if fixed is not None:
+        return fixed.unpack_from(data, pos)[0], pos + fixed.size
+
+    if code == 0xDE:
+        (size,) = _H.unpack_from(data, pos)
+        return _unpack_map(data, pos + 2, size)
+    if code == 0xDF:
+        (size,) = _I.unpack_from(data, pos)
+        return _unpack_map(data, pos + 4, size)
+    if code == 0xDC:
+        (size,) = _H.unpack_from(data, pos)
+        return _unpack_array(data, pos + 2, size)
+    if code == 0xDD:
+        (size,) = _I.unpack_from(data, pos)
+        return _unpack_array(data, pos + 4, size)
+
+    if code in _BIN_SIZES:
+        size_struct = _BIN_SIZES[code]
+        (size,) = size_struct.unpack_from(data, pos)
+        pos += size_struct.size
+        return bytes(data[pos:pos + size]), pos + size
+
+    raise ProtocolError(f'Bilinmeyen ikili tip: 0x{code:02x}')
+
+
+_FIXED = {
+    0xCB: _d, 0xCF: _Q,
+    0xD0: _b, 0xD1: _h, 0xD2: _i, 0xD3: _q,
+    # Diğer msgpack kodlayıcılarından gelebilecek tipler
+    0xCA: struct.Struct('!f'), 0xCC: _B, 0xCD: _H, 0xCE: _I,
+}
+_BIN_SIZES = {0xC4: _B, 0xC5: _H, 0xC6: _I}
+
+
+def _unpack_map(data, pos, size):
+    result = {}
+    for _ in range(size):
+        code = data[pos]
+        if code < 0x80:
+            # Alan numarası
+            try:
+                key = FIELDS[code]
+            except IndexError:
+                raise ProtocolError(f'Bilinmeyen alan numarası: {code}') from None
+            pos += 1
+        elif 0xA0 <= code <= 0xBF:
+            end = pos + 1 + (code & 0x1F)
+            key = data[pos + 1:end].decode('utf-8')
+            pos = end
+        else:
+            key, pos = _unpack(data, pos)
+        result[key], pos = _unpack(data, pos)
+    return result, pos
+
+
+def _unpack_array(data, pos, size):
+    result = []
+    append = result.append
+    for _ in range(size):
+        item, pos = _unpack(data, pos)
+        append(item)
+    return result, pos
+
+
+# =====================================================
+# Kodlayıcılar
+# =====================================================
+
+class JSONCodec:
+    """UTF-8 JSON (orjson kuruluysa onunla)"""
+
+    name = 'json'
+
+    def encode(self, message):
+        """
+        Mesajı çerçeve yüküne çevirir
+
+        Args:
+            message (dict): Mesaj
+
+        Returns:
+            bytes: Yük
+        """
+        if orjson is not None and Config.FAST_JSON:
+            return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(message).encode('utf-8')
+
+    def decode(self, payload):
+        """
+        Yükü mesaja çevirir
+
+        Raises:
+            ProtocolError: Geçersiz JSON
+        """
+        try:
+            if orjson is not None and Config.FAST_JSON:
+                return orjson.loads(payload)
+            return json.loads(payload)
+        except ValueError as e:
+            raise ProtocolError(f'Geçersiz JSON: {e}') from None
+
+
+class BinaryCodec:
+    """msgpack uyumlu ikili biçim, anahtarlar alan numarasıyla"""
+
+    name = 'binary'
+
+    def encode(self, message):
+        out = [b'\xc1']
+        _pack(message, out)
+        return b''.join(out)
+
+    def decode(self, payload):
+        if not payload or payload[0] != BINARY_MAGIC:
+            raise ProtocolError('İkili yük değil')
+        try:
+            value, end = _unpack(payload, 1)
+        except (IndexError, struct.error, UnicodeDecodeError) as e:
+            raise ProtocolError(f'Bozuk ikili yük: {e}') from None
+        if end != len(payload):
+            raise ProtocolError('İkili yükün sonunda fazladan bayt var')
+        return value
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec(), BinaryCodec())}
+DEFAULT_CODEC = CODECS['json']
+
+
+def get_codec(name):
+    """
+    Ada göre kodlayıcıyı döndürür
+
+    Args:
+        name (str): 'json' veya 'binary'
+
+    Returns:
+        JSONCodec | BinaryCodec: Kodlayıcı (bilinmiyorsa JSON)
+    """
+    return CODECS.get(name, DEFAULT_CODEC)
+
+
+def decode(payload):
+    """
+    Yükü biçimini ilk bayttan anlayarak çözer
+
+    Args:
+        payload (bytes): Çerçeve yükü
+
+    Returns:
+        dict: Mesaj
+
+    Raises:
+        ProtocolError: Geçersiz yük
+    """
+    if payload[:1] == b'\xc1':
+        return CODECS['binary'].decode(payload)
+    return DEFAULT_CODEC.decode(payload)
+
+
+def allowed_encodings():
+    """Config.TCP_ENCODINGS içindeki bilinen kodlamalar (tercih sırasıyla)"""
+    names = [name.strip() for name in Config.TCP_ENCODINGS.split(',')]
+    return [name for name in names if name in CODECS]
+
+
+def negotiate(offered):
+    """
+    İstemcinin önerdiği kodlamalardan birini seçer
+
+    İstemcinin tercih sırası esas alınır; sunucunun izin vermediği
+    kodlamalar atlanır. Ortak kodlama yoksa JSON kullanılır.
+
+    Args:
+        offered (list): İstemcinin desteklediği kodlamalar (login mesajındaki
+            "encodings" alanı; eski istemcilerde None)
+
+    Returns:
+        JSONCodec | BinaryCodec: Seçilen kodlayıcı
+    """
+    if not isinstance(offered, list):
+        return DEFAULT_CODEC
+    allowed = allowed_encodings()
+    for name in offered:
+        if name in allowed:
+            return CODECS[name]
+    return DEFAULT_CODEC
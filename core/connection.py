@@ -0,0 +1,401 @@
+# core/connection.py
+"""
+TCP İstemci Bağlantıları
+TCPServer'ın mesaj işleyicileri (process_message, handle_login, ...)
+istemciye doğrudan soket üzerinden değil, bu sınıfların send() metoduyla
+yazar; böylece aynı işleyiciler hem thread'li hem asyncio modunda çalışır.
+Mesajlar core/protocol.py'deki uzunluk önekli çerçevelerle, login'de
+anlaşılan kodlamayla (core/codec.py) taşınır.
+
+send() soket yazmasını beklemez: çerçeve bağlantının sınırlı giden
+kuyruğuna (OutboundQueue) eklenir ve soket yazılabildikçe kuyruktaki
+çerçeveler tek sendmsg() çağrısıyla birlikte gönderilir. Yavaş veya
+takılmış bir istemci diğer istemcilere teslimatı geciktirmez; kuyruğu
+sınırı aşarsa Config.TCP_SLOW_CONSUMER_POLICY uygulanır.
+"""
+
+import os
+import socket
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from config import Config
+from .codec import DEFAULT_CODEC
+from .protocol import FrameDecoder, ProtocolError, encode_frame
+
+
+# Tek sendmsg() çağrısındaki en fazla çerçeve sayısı
+try:
+    _IOV_MAX = min(os.sysconf('SC_IOV_MAX'), 1024)
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 64
+
+if hasattr(socket.socket, 'sendmsg'):
+    def _send_buffers(sock, buffers):
+        """Tamponları tek sistem çağrısıyla gönderir (vectored I/O)"""
+        return sock.sendmsg(buffers)
+else:  # pragma: no cover - Windows'ta sendmsg yok (asyncio modu: bkz. tcp_server.use_selector_event_loop)
+    def _send_buffers(sock, buffers):
+        return sock.send(b''.join(buffers))
+
+
+class OutboundQueue:
+    """
+    Bağlantı başına sınırlı giden çerçeve kuyruğu
+
+    - Kuyruk high watermark'ı aşınca bağlantı "tıkalı" sayılır; low
+      watermark'a inince tıkanıklık biter
+    - limit aşılacaksa çerçeve kuyruğa alınmaz (push False döner)
+    - Kısmen gönderilen çerçevenin kalanı kopyalanmadan (memoryview)
+      kuyruğun başında bekler
+    """
+
+    def __init__(self, high=None, low=None, limit=None):
+        self.high = high or Config.TCP_SEND_HIGH_WATERMARK
+        self.low = min(Config.TCP_SEND_LOW_WATERMARK if low is None else low, self.high)
+        self.limit = max(limit or Config.TCP_SEND_QUEUE_LIMIT, self.high)
+        self.frames = deque()
+        self.nbytes = 0
+        self.peak_bytes = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.congested_since = None  # high watermark'ın aşıldığı an (monotonic)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def congested(self):
+        return self.congested_since is not None
+
+    def push(self, data):
+        """
+        Çerçeveyi kuyruğun sonuna ekler
+
+        Returns:
+            bool: Eklendi mi? (False: limit aşılıyor)
+        """
+        if self.nbytes + len(data) > self.limit:
+            return False
+        self.frames.append(data)
+        self.nbytes += len(data)
+        if self.nbytes > self.peak_bytes:
+            self.peak_bytes = self.nbytes
+        if self.nbytes > self.high and self.congested_since is None:
+            self.congested_since = time.monotonic()
+        return True
+
+    def buffers(self):
+        """Tek sendmsg() ile gönderilecek çerçeveler"""
+        return list(islice(self.frames, _IOV_MAX))
+
+    def consume(self, sent):
+        """
+        Gönderilen baytları kuyruktan çıkarır
+
+        Args:
+            sent (int): sendmsg() dönüş değeri
+
+        Returns:
+            bool: Kuyruk bu çağrıyla low watermark'a indi mi?
+        """
+        self.nbytes -= sent
+        self.sent_bytes += sent
+        frames = self.frames
+        while sent:
+            size = len(frames[0])
+            if sent < size:
+                frames[0] = memoryview(frames[0])[sent:]
+                break
+            frames.popleft()
+            sent -= size
+
+        if self.congested_since is not None and self.nbytes <= self.low:
+            self.congested_since = None
+            return True
+        return False
+
+    def stats(self):
+        """Kuyruk metrikleri"""
+        congested_since = self.congested_since
+        return {
+            'queued_bytes': self.nbytes,
+            'queued_frames': len(self.frames),
+            'peak_bytes': self.peak_bytes,
+            'sent_bytes': self.sent_bytes,
+            'dropped': self.dropped,
+            'congested_s': (round(time.monotonic() - congested_since, 3)
+                            if congested_since is not None else None)
+        }
+
+
+class Connection(ABC):
+    """Sunucuya bağlı tek bir TCP istemcisi (thread'li / asyncio alt sınıfları)"""
+
+    def __init__(self, address):
+        self.address = address
+        self.user = None  # Giriş yapınca kullanıcı bilgileri
+        self.codec = DEFAULT_CODEC  # Login'de anlaşılan kodlama
+        self.outbound = OutboundQueue()
+        self.closed = False
+        self.evicted = None  # Yavaş tüketici olarak kapatıldıysa nedeni
+
+    def encode(self, message):
+        """Mesajı bağlantının kodlamasıyla gönderilecek çerçeveye çevirir"""
+        return encode_frame(self.codec.encode(message))
+
+    def send(self, message):
+        """Mesajı istemciye gönderir (herhangi bir thread'den çağrılabilir, bloklamaz)"""
+        self.send_bytes(self.encode(message))
+
+    @abstractmethod
+    def send_bytes(self, data):
+        """Kodlanmış çerçeveyi giden kuyruğa ekler (bloklamaz)"""
+
+    @abstractmethod
+    def close(self):
+        """Bağlantıyı kapatır (herhangi bir thread'den çağrılabilir)"""
+
+    def abort(self):
+        """Bağlantıyı hemen kapatır"""
+        self.close()
+
+    def _admit(self, data):
+        """
+        Çerçeveyi giden kuyruğa almayı dener; yavaş tüketici politikasını uygular
+
+        - 'disconnect': kuyruk limitini aşan veya high watermark üzerinde
+          TCP_SLOW_CONSUMER_TIMEOUT'tan uzun kalan bağlantı kapatılır
+        - 'drop': limiti aşan çerçeveler atılır (dropped sayacı), bağlantı kalır
+
+        Returns:
+            bool: Çerçeve kuyruğa alındı mı?
+        """
+        queue = self.outbound
+        disconnect = Config.TCP_SLOW_CONSUMER_POLICY != 'drop'
+        if (disconnect and queue.congested
+                and time.monotonic() - queue.congested_since > Config.TCP_SLOW_CONSUMER_TIMEOUT):
+            self._evict(f'{Config.TCP_SLOW_CONSUMER_TIMEOUT} sn boyunca kuyruk boşalmadı')
+            return False
+        if queue.push(data):
+            return True
+        if disconnect:
+            self._evict(f'giden kuyruk {queue.limit} baytı aştı')
+        else:
+            queue.dropped += 1
+        return False
+
+    def _check_congestion(self, congested_since):
+        """Kuyruk hâlâ aynı tıkanıklıktaysa 'disconnect' politikasını uygular"""
+        if (self.outbound.congested_since == congested_since
+                and Config.TCP_SLOW_CONSUMER_POLICY != 'drop'):
+            self._evict(f'{Config.TCP_SLOW_CONSUMER_TIMEOUT} sn boyunca kuyruk boşalmadı')
+
+    def _evict(self, reason):
+        """Yavaş tüketiciyi kapatır"""
+        if self.closed:
+            return
+        self.evicted = reason
+        print(f"🐢 Yavaş istemci kapatıldı ({self.address}): {reason}")
+        self.abort()
+
+    def stats(self):
+        """Bağlantının giden kuyruk metrikleri"""
+        stats = self.outbound.stats()
+        stats['address'] = f'{self.address[0]}:{self.address[1]}'
+        stats['user'] = self.user['username'] if self.user else None
+        return stats
+
+    def __repr__(self):
+        user = self.user['username'] if self.user else '-'
+        return f'<{type(self).__name__} {self.address} {user}>'
+
+
+class ThreadedConnection(Connection):
+    """
+    Thread başına istemci modunda bloklayan soket bağlantısı
+
+    Okuma bağlantının kendi thread'inde yapılır. Çerçeveler kuyruğa
+    eklenir ve ilk gönderimde açılan yazıcı thread'i tarafından
+    gönderilir; send() çağıran thread soketi beklemez.
+    """
+
+    def __init__(self, sock, address):
+        super().__init__(address)
+        self.sock = sock
+        self._cond = threading.Condition()
+        self._writer = None
+
+    def send_bytes(self, data):
+        with self._cond:
+            was_congested = self.outbound.congested
+            if self.closed or not self._admit(data):
+                return
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+            self._cond.notify()
+            if self.outbound.congested and not was_congested:
+                timer = threading.Timer(Config.TCP_SLOW_CONSUMER_TIMEOUT, self._check_congestion,
+                                        args=(self.outbound.congested_since,))
+                timer.daemon = True
+                timer.start()
+
+    def _write_loop(self):
+        queue = self.outbound
+        while True:
+            with self._cond:
+                while not queue.frames and not self.closed:
+                    self._cond.wait()
+                if self.closed:
+                    return
+                buffers = queue.buffers()
+            try:
+                sent = _send_buffers(self.sock, buffers)
+            except OSError:
+                self.abort()
+                return
+            with self._cond:
+                queue.consume(sent)
+
+    def _check_congestion(self, congested_since):
+        with self._cond:
+            super()._check_congestion(congested_since)
+
+    def abort(self):
+        """
+        Bağlantıyı kapatır; soket okuyucu thread'de close() ile bırakılır
+
+        shutdown() recv / sendmsg'de bekleyen thread'leri uyandırır.
+        """
+        with self._cond:
+            if self.closed:
+                return
+            self.closed = True
+            self._cond.notify_all()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self):
+        self.abort()
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class AsyncConnection(Connection):
+    """
+    asyncio modunda non-blocking soket bağlantısı
+
+    Okuma: soket okunabilir olunca olay döngüsü recv_into ile doğrudan
+    FrameDecoder tamponuna okur; tamamlanan her çerçeve on_frame'e verilir.
+    Yazma: send() herhangi bir thread'den çağrılabilir; çerçeve döngüde
+    giden kuyruğa eklenir, kuyruktaki çerçeveler soket yazılabildikçe
+    sendmsg() ile birlikte gönderilir. Giden kuyruk tıkalıyken
+    istemciden okuma durur (yanıtlarını okumayan istemciden yeni istek
+    alınmaz). Hiçbir çağrı bloklamaz.
+    """
+
+    def __init__(self, sock, address, loop, on_frame, on_close):
+        super().__init__(address)
+        self.sock = sock
+        self.loop = loop
+        self.decoder = FrameDecoder()
+        self.inbox = deque()  # İşlenmeyi bekleyen çerçeveler
+        self.busy = False     # inbox şu an işleniyor mu?
+        self._on_frame = on_frame
+        self._on_close = on_close
+        self._reading = False
+        self._writing = False
+
+    def start(self):
+        self.resume_reading()
+
+    def pause_reading(self):
+        if self._reading:
+            self.loop.remove_reader(self.sock)
+            self._reading = False
+
+    def resume_reading(self):
+        if not self._reading and not self.closed and not self.outbound.congested:
+            self.loop.add_reader(self.sock, self._on_readable)
+            self._reading = True
+
+    def _on_readable(self):
+        try:
+            nbytes = self.sock.recv_into(self.decoder.get_buffer())
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self.abort()
+            return
+        if not nbytes:
+            self.abort()
+            return
+
+        self.decoder.buffer_updated(nbytes)
+        try:
+            for payload in self.decoder.read_frames():
+                self._on_frame(self, payload)
+        except ProtocolError as e:
+            print(f"❌ Protokol hatası ({self.address}): {e}")
+            self.abort()
+
+    def send_bytes(self, data):
+        self.loop.call_soon_threadsafe(self._write, data)
+
+    def _write(self, data):
+        if self.closed:
+            return
+        queue = self.outbound
+        was_congested = queue.congested
+        if not self._admit(data):
+            return
+        if not self._writing:
+            self._flush()
+        if queue.congested and not was_congested and not self.closed:
+            self.pause_reading()
+            self.loop.call_later(Config.TCP_SLOW_CONSUMER_TIMEOUT,
+                                 self._check_congestion, queue.congested_since)
+
+    def _flush(self):
+        """Kuyruktaki çerçeveleri soketin kabul ettiği kadar gönderir"""
+        queue = self.outbound
+        while queue.frames:
+            try:
+                sent = _send_buffers(self.sock, queue.buffers())
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self.abort()
+                return
+            if queue.consume(sent) and len(self.inbox) < Config.TCP_MAX_PENDING_MESSAGES // 2:
+                self.resume_reading()
+
+        if queue.frames and not self._writing:
+            self.loop.add_writer(self.sock, self._flush)
+            self._writing = True
+        elif not queue.frames and self._writing:
+            self.loop.remove_writer(self.sock)
+            self._writing = False
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.abort)
+
+    def abort(self):
+        """Bağlantıyı hemen kapatır (sadece olay döngüsünden çağrılır)"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pause_reading()
+        if self._writing:
+            self.loop.remove_writer(self.sock)
+            self._writing = False
+        self.sock.close()
+        self._on_close(self)
@@ -0,0 +1,192 @@
+# core/protocol.py
+"""
+TCP Mesaj Protokolü (Çerçeveleme)
+Her mesaj 4 baytlık (big-endian) uzunluk önekiyle gönderilir:
+
+    +----------------+----------------------+
+    | uzunluk (!I)   | yük (uzunluk bayt)   |
+    +----------------+----------------------+
+
+TCP bir bayt akışıdır: tek recv() yarım bir mesaj veya art arda birkaç
+mesaj döndürebilir. FrameDecoder gelen baytları yeniden kullanılan tek
+bir tampona alır (recv_into), tamamlanan çerçeveleri sırayla çıkarır ve
+yarım kalanı bir sonraki okumaya saklar. TCPServer, TCPBridge ve broker
+aynı kodlayıcıyı kullanır.
+"""
+
+import struct
+
+from config import Config
+
+
+_LENGTH = struct.Struct('!I')
+HEADER_SIZE = _LENGTH.size
+
+
+class ProtocolError(Exception):
+    """Geçersiz veya sınırı aşan çerçeve; bağlantı kapatılmalıdır"""
+
+
+def encode_frame(payload, max_frame_size=None):
+    """
+    Yükü uzunluk önekli çerçeveye çevirir
+
+    Args:
+        payload (bytes): Yük
+        max_frame_size (int, optional): Sınır (varsayılan Config.TCP_MAX_FRAME_SIZE)
+
+    Returns:
+        bytes: Çerçeve
+
+    Raises:
+        ProtocolError: Yük sınırı aşıyor
+    """
+    max_frame_size = max_frame_size or Config.TCP_MAX_FRAME_SIZE
+    if len(payload) > max_frame_size:
+        raise ProtocolError(f'Çerçeve çok büyük: {len(payload)} > {max_frame_size}')
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class FrameDecoder:
+    """
+    Artımlı çerçeve çözücü
+
+    Kullanım (bloklayan soket):
+        decoder = FrameDecoder()
+        n = sock.recv_into(decoder.get_buffer())
+        decoder.buffer_updated(n)
+        for payload in decoder.read_frames():
+            ...
+
+    Özellikler:
+    - Okumalar önceden ayrılmış tampona doğrudan yazılır; recv başına
+      kopya veya string birleştirmesi yapılmaz
+    - Tek okumadaki birden fazla çerçeve sırayla çıkarılır (pipelining)
+    - Yarım çerçeve tamponda kalır; tampon gerektiğinde (en fazla
+      max_frame_size + başlık kadar) büyür, boşalınca küçülür
+    - Tampon ilk okumada ayrılır; hiç veri göndermeyen boşta bağlantılar
+      bellek tutmaz
+    - Uzunluğu max_frame_size'ı aşan çerçeve ProtocolError verir; yük
+      tampona alınmadan reddedilir
+    """
+
+    # Boşalan tampon bu kat sayıdan büyükse ilk boyutuna döner
+    _SHRINK_FACTOR = 16
+
+    def __init__(self, max_frame_size=None, buffer_size=4096):
+        self.max_frame_size = max_frame_size or Config.TCP_MAX_FRAME_SIZE
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._view = memoryview(self._buffer)
+        self._start = 0  # İlk işlenmemiş bayt
+        self._end = 0    # Geçerli verinin sonu
+
+    @property
+    def pending(self):
+        """Tamponda bekleyen (henüz çerçeve olmamış) bayt sayısı"""
+        return self._end - self._start
+
+    def get_buffer(self, min_size=4096):
+        """
+        Okuma için tamponun boş kısmını döndürür
+
+        Args:
+            min_size (int): En az bu kadar boş yer açılır
+
+        Returns:
+            memoryview: Yazılabilir bölge (buffer_updated ile bildirilir)
+        """
+        needed = min_size
+        if self.pending >= HEADER_SIZE:
+            # Yarım çerçevenin tamamı sığsın
+            (length,) = _LENGTH.unpack_from(self._buffer, self._start)
+            if length <= self.max_frame_size:
+                needed = max(needed, HEADER_SIZE + length - self.pending)
+
+        if len(self._buffer) - self._end < needed:
+            self._make_room(needed)
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes):
+        """get_buffer ile alınan bölgeye nbytes yazıldığını bildirir"""
+        self._end += nbytes
+
+    def feed(self, data):
+        """Veriyi tampona kopyalar (soket dışı kaynaklar ve testler için)"""
+        data = memoryview(data)
+        while data:
+            target = self.get_buffer(min(len(data), 65536))
+            count = min(len(target), len(data))
+            target[:count] = data[:count]
+            self.buffer_updated(count)
+            data = data[count:]
+
+    def read_frames(self):
+        """
+        Tamamlanmış çerçevelerin yüklerini sırayla üretir
+
+        Yields:
+            bytes: Çerçeve yükü
+
+        Raises:
+            ProtocolError: Çerçeve uzunluğu sınırı aşıyor
+        """
+        buffer = self._buffer
+        while self._end - self._start >= HEADER_SIZE:
+            (length,) = _LENGTH.unpack_from(buffer, self._start)
+            if length > self.max_frame_size:
+                raise ProtocolError(f'Çerçeve çok büyük: {length} > {self.max_frame_size}')
+            frame_end = self._start + HEADER_SIZE + length
+            if frame_end > self._end:
+                break
+            payload = bytes(self._view[self._start + HEADER_SIZE:frame_end])
+            self._start = frame_end
+            yield payload
+
+        if self._start == self._end:
+            self._start = self._end = 0
+            if len(self._buffer) > self.buffer_size * self._SHRINK_FACTOR:
+                self._replace(bytearray(self.buffer_size))
+
+    def _make_room(self, needed):
+        """Bekleyen veriyi başa taşır; yetmezse tamponu büyütür"""
+        pending = self.pending
+        size = len(self._buffer)
+        if pending + needed > size:
+            buffer = bytearray(max(size * 2, pending + needed, self.buffer_size))
+            buffer[:pending] = self._view[self._start:self._end]
+            self._replace(buffer)
+        elif pending:
+            # Kaynak ve hedef örtüşebilir; önce kopyala
+            self._buffer[:pending] = bytes(self._view[self._start:self._end])
+        self._start, self._end = 0, pending
+
+    def _replace(self, buffer):
+        self._view.release()
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+
+
+def recv_frames(sock, decoder=None):
+    """
+    Bloklayan soketten çerçeveleri okur
+
+    Args:
+        sock (socket.socket): Soket
+        decoder (FrameDecoder, optional): Çözücü (varsayılan yeni bir tane)
+
+    Yields:
+        bytes: Çerçeve yükü (bağlantı kapanınca biter)
+
+    Raises:
+        ProtocolError: Geçersiz çerçeve veya yarım çerçeveyle kapanan bağlantı
+    """
+    decoder = decoder or FrameDecoder()
+    while True:
+        nbytes = sock.recv_into(decoder.get_buffer())
+        if not nbytes:
+            if decoder.pending:
+                raise ProtocolError('Bağlantı yarım çerçeveyle kapandı')
+            return
+        decoder.buffer_updated(nbytes)
+        yield from decoder.read_frames()
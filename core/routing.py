@@ -0,0 +1,163 @@
+# core/routing.py
+"""
+TCP Mesaj Yönlendirme
+Giriş yapmış bağlantıların indeksleri; alıcı bağlantılar tüm istemcileri
+taramadan, alıcı sayısıyla orantılı sürede bulunur:
+
+- user_id  -> {bağlantı}  (kullanıcının tüm açık oturumları)
+- group_id -> {bağlantı}  (grubun çevrimiçi üyelerinin oturumları)
+
+Grup tablosu database.cache.membership_index'i dinler:
+- Bu süreçte yapılan üyelik değişiklikleri (add_user_to_group /
+  remove_user_from_group) tabloya hemen yansır
+- Başka süreçlerin (web worker'ları) değişiklikleri TCP sunucusuna olay
+  olarak gelmez; indeks MEMBERSHIP_INDEX_TTL dolduktan sonraki ilk
+  bind() / group_connections() çağrısında yeniden yüklenince yansır.
+  Bu süre boyunca gruba yeni katılan çevrimiçi bir üye grup mesajlarını
+  almayabilir, ayrılan bir üye almaya devam edebilir
+"""
+
+import threading
+
+from database.cache import membership_index
+from database.queries import refresh_membership_index
+
+
+class RoutingTable:
+    """Kullanıcı ve grup bazında bağlantı indeksleri"""
+
+    def __init__(self, index=membership_index):
+        self._index = index
+        self._lock = threading.Lock()
+        self._users = {}   # user_id -> {connection}
+        self._groups = {}  # group_id -> {connection}
+        self._bound = {}   # connection -> (user_id, {group_id})
+        index.add_listener(self._on_membership)
+
+    def bind(self, connection, user_id):
+        """
+        Giriş yapan bağlantıyı tablolara ekler
+
+        Args:
+            connection (Connection): Bağlantı
+            user_id (int): Kullanıcı ID'si
+        """
+        self._refresh()
+        with self._lock:
+            self._unbind(connection)
+            # Kilit altında tekrar okunur: araya giren üyelik değişikliği
+            # dinleyici üzerinden bu kayda uygulanır
+            groups = set(self._index.groups_of(user_id))
+            self._bound[connection] = (user_id, groups)
+            self._users.setdefault(user_id, set()).add(connection)
+            for group_id in groups:
+                self._groups.setdefault(group_id, set()).add(connection)
+
+    def unbind(self, connection):
+        """Bağlantıyı tablolardan çıkarır"""
+        with self._lock:
+            self._unbind(connection)
+
+    def _unbind(self, connection):
+        entry = self._bound.pop(connection, None)
+        if entry is None:
+            return
+        user_id, groups = entry
+        _discard(self._users, user_id, connection)
+        for group_id in groups:
+            _discard(self._groups, group_id, connection)
+
+    def close(self):
+        """Üyelik indeksini dinlemeyi bırakır"""
+        self._index.remove_listener(self._on_membership)
+
+    def _refresh(self):
+        """İndeks hiç yüklenmediyse veya süresi dolduysa yükler (dinleyici tabloyu yeniler)"""
+        if self._index.needs_load():
+            refresh_membership_index()
+
+    def _on_membership(self, op, group_id, user_id):
+        """membership_index değişti"""
+        with self._lock:
+            if op == 'load':
+                self._rebuild_groups()
+                return
+            for connection in self._users.get(user_id, ()):
+                groups = self._bound[connection][1]
+                if op == 'add':
+                    groups.add(group_id)
+                    self._groups.setdefault(group_id, set()).add(connection)
+                else:
+                    groups.discard(group_id)
+                    _discard(self._groups, group_id, connection)
+
+    def _rebuild_groups(self):
+        groups_by_user = {}
+        self._groups = {}
+        for connection, (user_id, groups) in self._bound.items():
+            if user_id not in groups_by_user:
+                groups_by_user[user_id] = self._index.groups_of(user_id)
+            groups.clear()
+            groups.update(groups_by_user[user_id])
+            for group_id in groups:
+                self._groups.setdefault(group_id, set()).add(connection)
+
+    def user_connections(self, user_id):
+        """Kullanıcının açık bağlantıları"""
+        with self._lock:
+            return list(self._users.get(user_id, ()))
+
+    def group_connections(self, group_id):
+        """Grubun çevrimiçi üyelerinin bağlantıları"""
+        self._refresh()
+        with self._lock:
+            return list(self._groups.get(group_id, ()))
+
+    def all_connections(self):
+        """Giriş yapmış tüm bağlantılar"""
+        with self._lock:
+            return list(self._bound)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'connections': len(self._bound),
+                'users': len(self._users),
+                'groups': len(self._groups)
+            }
+
+
+def _discard(table, key, connection):
+    connections = table.get(key)
+    if connections is not None:
+        connections.discard(connection)
+        if not connections:
+            del table[key]
+
+
+def fan_out(connections, message, exclude=None):
+    """
+    Mesajı bağlantılara gönderir
+
+    Mesaj her kodlama için bir kez kodlanır; aynı kodlamayı kullanan tüm
+    alıcılara aynı çerçeve baytları verilir.
+
+    Args:
+        connections (iterable): Alıcı bağlantılar
+        message (dict): Mesaj
+        exclude (Connection, optional): Atlanacak bağlantı (gönderen)
+
+    Returns:
+        int: Mesajın verildiği bağlantı sayısı
+    """
+    frames = {}
+    delivered = 0
+    for connection in connections:
+        if connection is exclude or connection.closed:
+            continue
+        data = frames.get(connection.codec)
+        if data is None:
+            data = frames[connection.codec] = connection.encode(message)
+        connection.send_bytes(data)
+        delivered += 1
+    return delivered
@@ -1,5 +1,7 @@
 from flask_socketio import SocketIO
-import socket, threading, json
+import socket, threading
+from . import codec
+from .protocol import ProtocolError, encode_frame, recv_frames
 
 class TCPBridge:
     def __init__(self, socketio: SocketIO, host='localhost', port=9999, session_id=None):
@@ -10,6 +12,7 @@ class TCPBridge:
         self.socket = None
         self.connected = False
         self.receive_thread = None
+        self.codec = codec.DEFAULT_CODEC  # login_response ile değişir
 
     def connect_to_tcp_server(self):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -19,12 +22,21 @@ class TCPBridge:
         self.receive_thread.start()
     
     def send_message(self, message):
-        self.socket.send(json.dumps(message).encode('utf-8'))
+        if message.get('type') == 'login' and 'encodings' not in message:
+            # Sunucuyla kodlama anlaş (yanıt gelene kadar JSON gönderilir)
+            message = dict(message, encodings=codec.allowed_encodings())
+        self.socket.sendall(encode_frame(self.codec.encode(message)))
 
     def receive_messages(self):
-        while self.connected:
-            data = self.socket.recv(4096).decode('utf-8')
-            if not data: break
-            message = json.loads(data)
-            # session_id’ye bağlı WebSocket’e gönder
-            self.socketio.emit('tcp_message', message, room=self.session_id)
\ No newline at end of file
+        try:
+            # Çerçeveler tek tampondan okunur; bölünmüş / birleşmiş mesajlar doğru ayrılır
+            for payload in recv_frames(self.socket):
+                message = codec.decode(payload)
+                if message.get('type') == 'login_response' and message.get('success'):
+                    self.codec = codec.get_codec(message.get('encoding'))
+                # session_id’ye bağlı WebSocket’e gönder
+                self.socketio.emit('tcp_message', message, room=self.session_id)
+        except (OSError, ProtocolError) as e:
+            print(f"⚠️ TCP köprüsü bağlantısı kapandı: {e}")
+        finally:
+            self.connected = False
\ No newline at end of file
@@ -1,29 +1,102 @@
 # core/tcp_server.py
+import argparse
+import asyncio
 import socket
+import sys
 import threading
-import json
-from database.queries import verify_user, save_message, get_online_users
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import Config
+from database.queries import (
+    authenticate_user, save_message, get_online_users, get_user_by_id, is_user_in_group
+)
+from database.passwords import PasswordPoolBusy
+from . import codec
+from .connection import ThreadedConnection, AsyncConnection
+from .protocol import ProtocolError, recv_frames
+from .routing import RoutingTable, fan_out
+
+
+def use_selector_event_loop():
+    """
+    asyncio modu için add_reader / add_writer destekleyen olay döngüsünü seçer
+
+    Windows'un varsayılan ProactorEventLoop'u bu çağrılarda
+    NotImplementedError verir; orada SelectorEventLoop kullanılır
+    (select() tabanlıdır, ~500 bağlantıyla sınırlıdır; daha fazlası
+    için TCP_SERVER_MODE=threaded).
+    """
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
 
 class TCPServer:
-    """Mevcut TCP sunucunuzun kodunu buraya taşıyın"""
-    
-    def __init__(self, host='0.0.0.0', port=9999):
+    """
+    Yerel istemciler için TCP sunucu
+
+    İki çalışma modu vardır (Config.TCP_SERVER_MODE):
+    - 'asyncio': Tüm bağlantılar tek olay döngüsünde tutulur; boşta
+      bekleyen bağlantı başına thread açılmaz. Mesaj işleyicileri
+      (veritabanı / şifre doğrulama bloklar) sınırlı bir worker havuzunda
+      çalışır, her bağlantının mesajları sırayla işlenir.
+    - 'threaded': Her bağlantı için ayrı thread (eski davranış)
+
+    İki modda da gönderimler bloklamaz: her bağlantının sınırlı bir giden
+    kuyruğu vardır (core/connection.py), yavaş istemciler
+    Config.TCP_SLOW_CONSUMER_POLICY'ye göre kapatılır veya mesajları atılır.
+    Kuyruk metrikleri stats() ile (istemciler için 'stats' mesajı) alınır.
+
+    Mesajlar self.routes (core/routing.py) üzerinden yalnızca alıcıların
+    bağlantılarına iletilir; bağlı tüm istemciler taranmaz.
+    """
+
+    def __init__(self, host='0.0.0.0', port=9999, mode=None, backlog=None):
         self.host = host
         self.port = port
+        self.mode = mode or Config.TCP_SERVER_MODE
+        self.backlog = backlog or Config.TCP_BACKLOG
         self.server_socket = None
-        self.clients = {}  # {socket: user_info}
+        self.clients = {}  # {connection: user_info}
+        self.routes = RoutingTable()  # user_id / group_id -> bağlantılar
+        self.connections = set()  # Açık tüm bağlantılar
+        self.evicted = 0  # Yavaş tüketici olarak kapatılan bağlantı sayısı
         self.running = False
-    
+        self._loop = None
+        self._stopped = None
+        self._executor = None
+
     def start(self):
-        """Sunucuyu başlat"""
+        """Sunucuyu başlat (durdurulana kadar bloklar)"""
+        try:
+            if self.mode == 'asyncio':
+                use_selector_event_loop()
+                asyncio.run(self._serve_async())
+            elif self.mode == 'threaded':
+                self._serve_threaded()
+            else:
+                raise ValueError(f'Bilinmeyen sunucu modu: {self.mode}')
+        finally:
+            # Durmuş sunucunun tablosu üyelik değişikliklerini dinlemesin
+            self.routes.close()
+
+    def _listen(self):
+        """Dinleyen soketi oluşturur"""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(self.backlog)
+
+    # -------------------------------------------------
+    # Thread'li mod
+    # -------------------------------------------------
+
+    def _serve_threaded(self):
+        self._listen()
         self.running = True
-        
-        print(f"🚀 TCP Sunucu başlatıldı: {self.host}:{self.port}")
-        
+
+        print(f"🚀 TCP Sunucu başlatıldı: {self.host}:{self.port} (threaded)")
+
         while self.running:
             try:
                 client_socket, address = self.server_socket.accept()
@@ -36,76 +109,316 @@ class TCPServer:
             except Exception as e:
                 if self.running:
                     print(f"❌ Hata: {e}")
-    
+
     def handle_client(self, client_socket, address):
-        """İstemciyi yönet - Mevcut kodunuzu buraya ekleyin"""
+        """İstemciyi yönet (thread'li mod)"""
+        connection = ThreadedConnection(client_socket, address)
+        self.connections.add(connection)
         try:
-            while True:
-                data = client_socket.recv(4096).decode('utf-8')
-                if not data:
-                    break
-                
-                # Mesajı işle
-                message = json.loads(data)
-                self.process_message(client_socket, message)
-        
+            for payload in recv_frames(client_socket):
+                # Mesajı işle (JSON veya ikili; biçim yükten anlaşılır)
+                message = codec.decode(payload)
+                self.process_message(connection, message)
+
+        except ConnectionError:
+            pass
+        except ProtocolError as e:
+            if not connection.closed:  # Yavaş tüketici olarak kapatıldıysa yarım kalır
+                print(f"❌ Protokol hatası ({address}): {e}")
         except Exception as e:
             print(f"❌ İstemci hatası: {e}")
         finally:
-            self.remove_client(client_socket)
-            client_socket.close()
-    
-    def process_message(self, client_socket, message):
+            self.remove_client(connection)
+            connection.close()
+
+    # -------------------------------------------------
+    # asyncio modu
+    # -------------------------------------------------
+
+    async def _serve_async(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=Config.TCP_HANDLER_WORKERS,
+            thread_name_prefix='tcp-handler'
+        )
+        self._listen()
+        self.server_socket.setblocking(False)
+        self._loop.add_reader(self.server_socket, self._accept_ready)
+        self.running = True
+
+        print(f"🚀 TCP Sunucu başlatıldı: {self.host}:{self.port} (asyncio)")
+
+        try:
+            await self._stopped.wait()
+        finally:
+            self.running = False
+            self._loop.remove_reader(self.server_socket)
+            self.server_socket.close()
+            for connection in list(self.connections):
+                connection.abort()
+            self._executor.shutdown(wait=False)
+
+    def _accept_ready(self):
+        """Bekleyen bağlantıları kabul eder (olay döngüsünde)"""
+        for _ in range(self.backlog):
+            try:
+                client_socket, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"❌ Hata: {e}")
+                return
+
+            client_socket.setblocking(False)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = AsyncConnection(
+                client_socket, address, self._loop,
+                on_frame=self._on_frame, on_close=self.remove_client
+            )
+            self.connections.add(connection)
+            connection.start()
+
+    def _on_frame(self, connection, payload):
+        """Gelen çerçeveyi bağlantının sırasına ekler (olay döngüsünde)"""
+        connection.inbox.append(payload)
+        if len(connection.inbox) >= Config.TCP_MAX_PENDING_MESSAGES:
+            # İşleyiciler yetişemiyor: istemciden okumayı durdur
+            connection.pause_reading()
+        if not connection.busy:
+            connection.busy = True
+            self._loop.create_task(self._drain_inbox(connection))
+
+    async def _drain_inbox(self, connection):
+        """Bağlantının mesajlarını sırayla işler"""
+        try:
+            while connection.inbox and not connection.closed:
+                payload = connection.inbox.popleft()
+                if len(connection.inbox) < Config.TCP_MAX_PENDING_MESSAGES // 2:
+                    connection.resume_reading()
+
+                # İşleyiciler bloklayabilir; döngü dışında çalıştır
+                message = codec.decode(payload)
+                await self._loop.run_in_executor(
+                    self._executor, self.process_message, connection, message
+                )
+        except ProtocolError as e:
+            print(f"❌ Protokol hatası ({connection.address}): {e}")
+            connection.abort()
+        except Exception as e:
+            print(f"❌ İstemci hatası: {e}")
+            connection.abort()
+        finally:
+            connection.busy = False
+
+    # -------------------------------------------------
+    # Mesaj işleyicileri (iki modda ortak)
+    # -------------------------------------------------
+
+    def process_message(self, connection, message):
         """Mesajı işle"""
         msg_type = message.get('type')
-        
+
         if msg_type == 'login':
-            self.handle_login(client_socket, message)
+            self.handle_login(connection, message)
         elif msg_type == 'message':
-            self.handle_message(client_socket, message)
+            self.handle_message(connection, message)
+        elif msg_type == 'ping':
+            connection.send({'type': 'pong', 'id': message.get('id')})
+        elif msg_type == 'stats':
+            if connection.user:
+                connection.send({'type': 'stats_response', 'success': True, 'stats': self.stats()})
+            else:
+                connection.send({'type': 'stats_response', 'success': False,
+                                 'error': 'Giriş yapılmadı'})
         # ... diğer mesaj tipleri
-    
-    def handle_login(self, client_socket, message):
-        """Login işlemi"""
+
+    def handle_login(self, connection, message):
+        """
+        Login işlemi
+
+        İstemci "encodings" alanında desteklediği kodlamaları gönderirse
+        biri seçilir ve yanıtta "encoding" olarak bildirilir. Yanıt JSON
+        gider; bağlantının sonraki mesajları seçilen kodlamayla gönderilir.
+        """
         username = message.get('username')
         password = message.get('password')
-        
-        success, user = verify_user(username, password)
-        
+
+        try:
+            success, user = authenticate_user(username, password)
+        except PasswordPoolBusy:
+            connection.send({'type': 'login_response', 'success': False,
+                             'error': 'Sunucu yoğun, tekrar deneyin'})
+            return
+
         if success:
-            self.clients[client_socket] = user
-            response = {'type': 'login_response', 'success': True, 'user': user}
+            # Şifre hash'i istemciye gönderilmez
+            user = {'id': user['id'], 'username': user['username']}
+            connection.user = user
+            self.clients[connection] = user
+            self.routes.bind(connection, user['id'])
+            if connection.closed:
+                # Login sürerken bağlantı kapandı; remove_client çoktan çalıştı
+                self.routes.unbind(connection)
+                self.clients.pop(connection, None)
+                return
+            selected = codec.negotiate(message.get('encodings'))
+            connection.send({'type': 'login_response', 'success': True, 'user': user,
+                             'encoding': selected.name})
+            connection.codec = selected
         else:
-            response = {'type': 'login_response', 'success': False, 'error': 'Geçersiz kullanıcı'}
-        
-        client_socket.send(json.dumps(response).encode('utf-8'))
-    
-    def handle_message(self, client_socket, message):
-        """Mesaj gönderimi"""
-        # Mevcut mesaj gönderme kodunuzu buraya ekleyin
-        pass
-    
-    def remove_client(self, client_socket):
+            connection.send({'type': 'login_response', 'success': False,
+                             'error': 'Geçersiz kullanıcı'})
+
+    def handle_message(self, connection, message):
+        """
+        Mesaj gönderimi
+
+        Mesaj kaydedilir ve alıcıların açık bağlantılarına 'new_message'
+        olarak iletilir; gönderene 'message_response' döner.
+
+            {"type": "message", "message_type": "private", "target_id": 7, "message": "..."}
+            {"type": "message", "message_type": "group", "group_id": 3, "message": "..."}
+            {"type": "message", "message_type": "broadcast", "message": "..."}
+
+        message_type verilmezse target_id / group_id alanından anlaşılır.
+        Alıcılar yönlendirme tablolarından bulunur (alıcı sayısıyla
+        orantılı); mesaj her kodlama için bir kez kodlanır.
+        """
+        sender = connection.user
+        if not sender:
+            connection.send({'type': 'message_response', 'success': False,
+                             'error': 'Giriş yapılmadı'})
+            return
+
+        text = message.get('message') or message.get('content')
+        message_type = message.get('message_type') or (
+            'private' if message.get('target_id') is not None
+            else 'group' if message.get('group_id') is not None
+            else 'broadcast'
+        )
+        if not isinstance(text, str) or not text.strip():
+            return self._message_error(connection, 'Mesaj boş olamaz')
+
+        payload = {
+            'type': 'new_message',
+            'message_type': message_type,
+            'sender': sender['username'],
+            'sender_id': sender['id'],
+            'message': text
+        }
+
+        if message_type == 'private':
+            try:
+                target_id = int(message.get('target_id'))
+            except (TypeError, ValueError):
+                return self._message_error(connection, 'Geçersiz alıcı')
+            if not get_user_by_id(target_id):
+                return self._message_error(connection, 'Alıcı bulunamadı')
+            message_id = save_message(sender['id'], text, 'private', receiver_id=target_id)
+            payload['target_id'] = target_id
+            # Alıcının ve gönderenin diğer oturumları
+            recipients = self.routes.user_connections(target_id)
+            if target_id != sender['id']:
+                recipients += self.routes.user_connections(sender['id'])
+
+        elif message_type == 'group':
+            try:
+                group_id = int(message.get('group_id'))
+            except (TypeError, ValueError):
+                return self._message_error(connection, 'Geçersiz grup')
+            if not is_user_in_group(sender['id'], group_id):
+                return self._message_error(connection, 'Bu grubun üyesi değilsiniz')
+            message_id = save_message(sender['id'], text, 'group', group_id=group_id)
+            payload['group_id'] = group_id
+            recipients = self.routes.group_connections(group_id)
+
+        elif message_type == 'broadcast':
+            message_id = save_message(sender['id'], text, 'broadcast')
+            recipients = self.routes.all_connections()
+
+        else:
+            return self._message_error(connection, 'Bilinmeyen mesaj tipi')
+
+        if not message_id:
+            return self._message_error(connection, 'Mesaj kaydedilemedi')
+
+        payload['id'] = message_id
+        payload['timestamp'] = datetime.now().isoformat()
+        delivered = fan_out(recipients, payload, exclude=connection)
+        connection.send({'type': 'message_response', 'success': True,
+                         'message_id': message_id, 'delivered': delivered})
+
+    def _message_error(self, connection, error):
+        connection.send({'type': 'message_response', 'success': False, 'error': error})
+
+    def remove_client(self, connection):
         """İstemciyi kaldır"""
-        if client_socket in self.clients:
-            user = self.clients[client_socket]
+        self.connections.discard(connection)
+        if connection.evicted:
+            self.evicted += 1
+        self.routes.unbind(connection)
+        user = self.clients.pop(connection, None)
+        if user:
             print(f"👋 {user['username']} ayrıldı")
-            del self.clients[client_socket]
-    
+
+    def stats(self, top=50):
+        """
+        Giden kuyruk metrikleri
+
+        Args:
+            top (int): Kuyruğu en dolu kaç bağlantı listelensin
+
+        Returns:
+            dict: Toplamlar ve bağlantı başına kuyruk derinliği
+        """
+        connections = [connection.stats() for connection in list(self.connections)]
+        connections.sort(key=lambda item: item['queued_bytes'], reverse=True)
+        return {
+            'mode': self.mode,
+            'connections': len(connections),
+            'authenticated': len(self.clients),
+            'queued_bytes': sum(item['queued_bytes'] for item in connections),
+            'congested': sum(1 for item in connections if item['congested_s'] is not None),
+            'dropped': sum(item['dropped'] for item in connections),
+            'evicted': self.evicted,
+            'policy': Config.TCP_SLOW_CONSUMER_POLICY,
+            'high_watermark': Config.TCP_SEND_HIGH_WATERMARK,
+            'low_watermark': Config.TCP_SEND_LOW_WATERMARK,
+            'queue_limit': Config.TCP_SEND_QUEUE_LIMIT,
+            'routes': self.routes.stats(),
+            'queues': connections[:top]
+        }
+
     def stop(self):
         """Sunucuyu durdur"""
         self.running = False
-        if self.server_socket:
+        if self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+        elif self.server_socket:
+            # Bloklayan accept()'i uyandırır (Linux'ta close() yetmez)
+            try:
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.server_socket.close()
 
-# Standalone çalıştırma
+# Standalone çalıştırma (proje kökünden: python -m core.tcp_server)
 if __name__ == '__main__':
     from database.db_manager import init_db
+
+    parser = argparse.ArgumentParser(description='TCP sunucu')
+    parser.add_argument('--host', default=Config.TCP_HOST)
+    parser.add_argument('--port', type=int, default=Config.TCP_PORT)
+    parser.add_argument('--mode', choices=['asyncio', 'threaded'], default=Config.TCP_SERVER_MODE)
+    parser.add_argument('--backlog', type=int, default=Config.TCP_BACKLOG)
+    args = parser.parse_args()
+
     init_db()
-    
-    server = TCPServer()
+
+    server = TCPServer(args.host, args.port, args.mode, args.backlog)
     try:
         server.start()
     except KeyboardInterrupt:
         print("\n🛑 Sunucu durduruluyor...")
-        server.stop()
\ No newline at end of file
+        server.stop()
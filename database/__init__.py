@@ -12,6 +12,7 @@ from .queries import (
     get_user_by_id,
     get_user_by_username,
     get_all_users,
+    search_usernames,
     get_online_users,
     set_user_online,
     # Grup işlemleri
@@ -23,14 +24,19 @@ from .queries import (
     get_group_members,
     get_user_groups,
     is_user_in_group,
+    load_membership_index,
     
     # Mesaj işlemleri
     save_message,
+    save_message_async,
     get_messages_by_user,
+    iter_user_messages,
     get_group_messages,
     get_private_messages,
     get_broadcast_messages,
+    search_messages,
     get_offline_messages,
+    deliver_offline_messages,
     mark_message_delivered,
     mark_message_read
 )
@@ -39,11 +45,13 @@ __all__ = [
     'get_db', 'init_db', 'close_db',
     'create_tables',
     'register_user', 'authenticate_user', 'get_user_by_id',
-    'get_user_by_username', 'get_all_users','get_online_users','set_user_online',
+    'get_user_by_username', 'get_all_users', 'search_usernames','get_online_users','set_user_online',
     'create_group', 'get_group_by_id', 'get_all_groups',
     'add_user_to_group', 'remove_user_from_group',
     'get_group_members', 'get_user_groups', 'is_user_in_group',
-    'save_message', 'get_messages_by_user', 'get_group_messages',
-    'get_private_messages', 'get_broadcast_messages',
-    'get_offline_messages', 'mark_message_delivered', 'mark_message_read'
+    'load_membership_index',
+    'save_message', 'save_message_async', 'get_messages_by_user', 'iter_user_messages',
+    'get_group_messages',
+    'get_private_messages', 'get_broadcast_messages', 'search_messages',
+    'get_offline_messages', 'deliver_offline_messages', 'mark_message_delivered', 'mark_message_read'
 ]
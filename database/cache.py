@@ -0,0 +1,495 @@
+"""
+Bellek İçi Önbellekler
+Sık okunan ve nadiren değişen satırlar için LRU + TTL önbellek
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from config import Config
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Boyutu sınırlı, süreli (TTL) LRU önbellek
+
+    Özellikler:
+    - max_size aşılınca en uzun süredir kullanılmayan kayıt atılır
+    - ttl saniyeden eski kayıtlar okunurken geçersiz sayılır
+    - Thread-safe; isabet / ıskalama / atılma istatistikleri tutar
+    """
+
+    def __init__(self, max_size=10000, ttl=60.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (son_geçerlilik, değer)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Kaydı döndürür; yoksa veya süresi dolduysa default"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at < now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Kaydı ekler veya günceller"""
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """
+        Kaydı önbellekten siler
+
+        Returns:
+            Silinen değer (yoksa None)
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class MembershipIndex:
+    """
+    Grup üyeliklerinin bellek içi indeksi
+
+    Özellikler:
+    - group_id -> {user_id} ve user_id -> {group_id} eşlemeleri
+    - Üyelik kontrolü O(1), veritabanına gitmez
+    - add_user_to_group / remove_user_from_group ile güncel tutulur
+    - ttl > 0 ise başka süreçlerin değişikliklerini almak için
+      indeks periyodik olarak veritabanından yeniden yüklenir; aynı anda
+      tek thread yükler, diğerleri bu sırada eski indeksi kullanır
+    - add_listener ile kaydolanlar her değişiklikte haberdar edilir
+      (ör. TCP sunucusunun grup yönlendirme tablosu)
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self._groups = {}
+        self._users = {}
+        self._loaded_at = None
+        self._version = 0  # her add/remove'da artar
+        self._lock = threading.Lock()
+        self._load_done = threading.Condition(self._lock)
+        self._loading = False
+        self._listeners = []
+
+        self.lookups = 0
+        self.saved_queries = 0
+        self.loads = 0
+
+    @property
+    def version(self):
+        return self._version
+
+    def needs_load(self):
+        if self._loaded_at is None:
+            return True
+        return bool(self.ttl) and time.monotonic() - self._loaded_at > self.ttl
+
+    def begin_load(self):
+        """
+        Yeniden yüklemeyi tek bir thread'e verir
+
+        Başka bir thread yüklerken eski indeks kullanılır; indeks hiç
+        yüklenmediyse yüklemenin bitmesi beklenir.
+
+        Returns:
+            bool: Yükleme bu çağırana mı düştü? True ise load() veya
+                  abort_load() ile bitirilmelidir
+        """
+        with self._lock:
+            while self.needs_load():
+                if not self._loading:
+                    self._loading = True
+                    return True
+                if self.loads:
+                    return False
+                self._load_done.wait()
+            return False
+
+    def abort_load(self):
+        """Başarısız yüklemeyi bırakır; sonraki kontrol yeniden dener"""
+        with self._lock:
+            self._loading = False
+            self._load_done.notify_all()
+
+    def load(self, pairs, since=None):
+        """
+        İndeksi (group_id, user_id) çiftlerinden yeniden kurar
+
+        Args:
+            pairs: (group_id, user_id) çiftleri
+            since (int, optional): Çiftler okunmadan önceki version; okuma
+                sırasında add/remove olduysa indeks bir sonraki kontrolde
+                tekrar yüklenir
+        """
+        groups, users = {}, {}
+        for group_id, user_id in pairs:
+            groups.setdefault(group_id, set()).add(user_id)
+            users.setdefault(user_id, set()).add(group_id)
+        with self._lock:
+            self._groups, self._users = groups, users
+            stale = since is not None and since != self._version
+            self._loaded_at = None if stale else time.monotonic()
+            self.loads += 1
+            self._loading = False
+            self._load_done.notify_all()
+        self._notify('load', None, None)
+
+    def is_member(self, user_id, group_id, loaded=False):
+        """
+        Args:
+            loaded (bool): İndeks bu kontrol için veritabanından yüklendiyse
+                           True (kazanılmış sorgu sayılmaz)
+        """
+        with self._lock:
+            self.lookups += 1
+            if not loaded:
+                self.saved_queries += 1
+            return user_id in self._groups.get(group_id, ())
+
+    def add(self, group_id, user_id):
+        with self._lock:
+            self._version += 1
+            self._groups.setdefault(group_id, set()).add(user_id)
+            self._users.setdefault(user_id, set()).add(group_id)
+        self._notify('add', group_id, user_id)
+
+    def remove(self, group_id, user_id):
+        with self._lock:
+            self._version += 1
+            self._groups.get(group_id, set()).discard(user_id)
+            self._users.get(user_id, set()).discard(group_id)
+        self._notify('remove', group_id, user_id)
+
+    def add_listener(self, listener):
+        """
+        Üyelik değişikliklerini dinler
+
+        Args:
+            listener (callable): listener(op, group_id, user_id); op 'add',
+                'remove' veya 'load' (indeks baştan yüklendi, ID'ler None)
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """add_listener ile eklenen dinleyiciyi çıkarır"""
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def _notify(self, op, group_id, user_id):
+        # Kilit dışında çağrılır; dinleyici indeksi okuyabilir
+        for listener in self._listeners:
+            listener(op, group_id, user_id)
+
+    def members(self, group_id):
+        """Grubun üye ID'lerini döndürür"""
+        with self._lock:
+            return frozenset(self._groups.get(group_id, ()))
+
+    def groups_of(self, user_id):
+        """Kullanıcının üye olduğu grup ID'lerini döndürür"""
+        with self._lock:
+            return frozenset(self._users.get(user_id, ()))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'groups': len(self._groups),
+                'users': len(self._users),
+                'memberships': sum(len(m) for m in self._groups.values()),
+                'lookups': self.lookups,
+                'saved_queries': self.saved_queries,
+                'loads': self.loads
+            }
+
+
+class _Room:
+    """Tek bir odanın tamponu (ID'ye göre artan sıralı)"""
+
+    __slots__ = ('messages', 'ids', 'exhaustive', 'ready', 'warmed_at', 'size')
+
+    def __init__(self):
+        self.messages = []
+        self.ids = []
+        self.exhaustive = False  # Odanın tüm geçmişi tamponda mı?
+        self.ready = False       # Veritabanından ısıtıldı mı?
+        self.warmed_at = 0.0
+        self.size = 0            # Tahmini bayt
+
+
+class RecentMessages:
+    """
+    Oda başına son mesajların bellek içi tamponu
+
+    Özellikler:
+    - Oda: broadcast, her grup ve her özel sohbet (versions.room_key)
+    - Oda en fazla depth mesaj tutar; ilk okumada veritabanından ısıtılır,
+      sonrasında kaydedilen mesajlar eklenir
+    - Toplam tahmini boyut budget_bytes'ı aşınca en uzun süredir
+      kullanılmayan odalar atılır
+    - ttl > 0 ise odalar bu süre sonra yeniden ısıtılır (başka süreçlerin
+      yazdıkları için)
+    """
+
+    ROW_OVERHEAD = 400  # Mesaj dict'i başına tahmini sabit bayt
+
+    def __init__(self, depth=200, budget_bytes=32 * 1024 * 1024, ttl=0):
+        self.depth = max(1, int(depth))
+        self.budget_bytes = budget_bytes
+        self.ttl = ttl
+        self._rooms = OrderedDict()  # oda anahtarı -> _Room
+        self._index = {}             # mesaj ID'si -> oda anahtarı
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.warms = 0
+        self.evictions = 0
+
+    def _row_size(self, row):
+        return self.ROW_OVERHEAD + len(row.get('message_content') or '')
+
+    def _expired(self, room):
+        return bool(self.ttl) and time.monotonic() - room.warmed_at > self.ttl
+
+    def _drop(self, key):
+        room = self._rooms.pop(key, None)
+        if room is not None:
+            self._bytes -= room.size
+            for message_id in room.ids:
+                self._index.pop(message_id, None)
+
+    def _insert(self, room, key, row):
+        position = bisect_left(room.ids, row['id'])
+        room.ids.insert(position, row['id'])
+        room.messages.insert(position, row)
+        size = self._row_size(row)
+        room.size += size
+        self._bytes += size
+        self._index[row['id']] = key
+
+    def _trim(self, room):
+        while len(room.ids) > self.depth:
+            message_id = room.ids.pop(0)
+            size = self._row_size(room.messages.pop(0))
+            room.size -= size
+            self._bytes -= size
+            self._index.pop(message_id, None)
+            room.exhaustive = False
+
+    def _evict(self, keep):
+        while self._bytes > self.budget_bytes and len(self._rooms) > 1:
+            key = next(iter(self._rooms))
+            if key == keep:
+                self._rooms.move_to_end(key)
+                continue
+            self._drop(key)
+            self.evictions += 1
+
+    def read(self, key, limit, before_id=None, after_id=None):
+        """
+        Geçmiş sayfasını tampondan döndürür
+
+        Returns:
+            list: Eskiden yeniye sıralı mesaj kopyaları; oda ısınmamışsa
+                  veya istenen aralık tamponda değilse None
+        """
+        with self._lock:
+            room = self._rooms.get(key)
+            if room is None or not room.ready or self._expired(room):
+                self.misses += 1
+                return None
+
+            if after_id is not None:
+                # Tampon ilk ID'sinden itibaren odanın tüm mesajlarını içerir
+                if not room.exhaustive and (not room.ids or after_id < room.ids[0] - 1):
+                    self.misses += 1
+                    return None
+                start = bisect_right(room.ids, after_id)
+                page = room.messages[start:start + limit]
+            else:
+                end = len(room.ids) if before_id is None else bisect_left(room.ids, before_id)
+                if end < limit and not room.exhaustive:
+                    self.misses += 1
+                    return None
+                page = room.messages[max(0, end - limit):end]
+
+            self._rooms.move_to_end(key)
+            self.hits += 1
+            return [dict(row) for row in page]
+
+    def begin_warm(self, key):
+        """
+        Oda ısıtmasını başlatır; bu andan sonra eklenen mesajlar tutulur
+
+        Returns:
+            bool: Isıtma bu çağırana mı düştü? (oda zaten sıcaksa veya
+                  başka bir istek ısıtıyorsa False)
+        """
+        with self._lock:
+            room = self._rooms.get(key)
+            if room is not None and (not room.ready or not self._expired(room)):
+                return False
+            self._drop(key)
+            self._rooms[key] = _Room()
+            return True
+
+    def finish_warm(self, key, rows, exhaustive):
+        """
+        Isıtmayı veritabanından okunan son mesajlarla tamamlar
+
+        Args:
+            rows (list): Eskiden yeniye sıralı en yeni mesajlar
+            exhaustive (bool): rows odanın tüm geçmişi mi?
+        """
+        with self._lock:
+            room = self._rooms.get(key)
+            if room is None or room.ready:
+                return
+            for row in rows:
+                if row['id'] not in self._index:
+                    self._insert(room, key, dict(row))
+            room.exhaustive = exhaustive
+            self._trim(room)
+            room.ready = True
+            room.warmed_at = time.monotonic()
+            self.warms += 1
+            self._rooms.move_to_end(key)
+            self._evict(key)
+
+    def abort_warm(self, key):
+        """Başarısız ısıtmanın yarım kalan odasını siler"""
+        with self._lock:
+            room = self._rooms.get(key)
+            if room is not None and not room.ready:
+                self._drop(key)
+
+    def append(self, key, make_row):
+        """
+        Kaydedilen mesajı oda tamponuna ekler
+
+        Args:
+            make_row (callable): Mesaj satırını üretir; sadece oda
+                                 bellekteyse çağrılır, None dönebilir
+        """
+        if key not in self._rooms:
+            return
+        row = make_row()
+        if row is None:
+            return
+        with self._lock:
+            room = self._rooms.get(key)
+            if room is None or row['id'] in self._index:
+                return
+            self._insert(room, key, row)
+            self._trim(room)
+            self._rooms.move_to_end(key)
+            self._evict(key)
+
+    def update(self, message_id, **fields):
+        """Tampondaki mesajın alanlarını günceller (durum değişiklikleri)"""
+        with self._lock:
+            key = self._index.get(message_id)
+            room = self._rooms.get(key) if key is not None else None
+            if room is None:
+                return
+            position = bisect_left(room.ids, message_id)
+            if position < len(room.ids) and room.ids[position] == message_id:
+                room.messages[position].update(fields)
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._index.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'rooms': len(self._rooms),
+                'messages': len(self._index),
+                'bytes': self._bytes,
+                'budget_bytes': self.budget_bytes,
+                'depth': self.depth,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'warms': self.warms,
+                'evictions': self.evictions
+            }
+
+
+# =====================================================
+# UYGULAMA GENELİ ÖNBELLEKLER
+# =====================================================
+
+# ('id', user_id) ve ('username', username) anahtarları aynı satırı tutar
+user_cache = LRUCache(
+    max_size=Config.USER_CACHE_SIZE,
+    ttl=Config.USER_CACHE_TTL
+)
+
+# Grup üyelik indeksi
+membership_index = MembershipIndex(ttl=Config.MEMBERSHIP_INDEX_TTL)
+
+# Hazır grup listesi (/api/groups/all); tek anahtar: 'all'
+group_directory_cache = LRUCache(max_size=1, ttl=Config.GROUP_DIRECTORY_TTL)
+
+# Oda başına son mesajlar (geçmiş açılışları); kapalıysa None
+recent_messages = RecentMessages(
+    depth=Config.RECENT_MESSAGES_DEPTH,
+    budget_bytes=Config.RECENT_MESSAGES_BUDGET_MB * 1024 * 1024,
+    ttl=Config.RECENT_MESSAGES_TTL
+) if Config.RECENT_MESSAGES_ENABLED else None
@@ -0,0 +1,47 @@
+"""
+Küme Olayları
+Bellek içi önbellekleri (üyelik indeksi, kullanıcı önbelleği, son mesaj
+tamponları, ETag sürümleri) değiştiren yazmaları diğer worker'lara duyurur.
+Tek süreçli çalışmada yayıncı yoktur ve publish() hiçbir şey yapmaz.
+"""
+
+import os
+import socket
+
+
+# Bu sürecin kimliği; kendi olaylarımızı geri aldığımızda atlamak için
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}:{os.urandom(3).hex()}'
+
+_publisher = None
+
+
+def set_publisher(publisher):
+    """
+    Olay yayıncısını ayarlar
+
+    Args:
+        publisher (callable): Olay dict'ini alır (None = kapalı)
+    """
+    global _publisher
+    _publisher = publisher
+
+
+def publish(kind, **payload):
+    """
+    Diğer worker'lara olay yayınlar
+
+    Args:
+        kind (str): Olay tipi ('membership', 'user', 'presence', 'message', 'status')
+        **payload: JSON'a çevrilebilir olay alanları
+    """
+    if _publisher is None:
+        return
+    try:
+        _publisher({'kind': kind, 'origin': WORKER_ID, **payload})
+    except Exception as e:
+        print(f"⚠️ Küme olayı gönderilemedi ({kind}): {e}")
+
+
+def is_local(event):
+    """Olay bu süreçten mi çıktı?"""
+    return event.get('origin') == WORKER_ID
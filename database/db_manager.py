@@ -3,116 +3,445 @@ Veritabanı Bağlantı Yöneticisi
 SQLite bağlantılarını yönetir
 """
 
+import queue
 import sqlite3
-from pathlib import Path
 import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import Config
+from .metrics import query_metrics
 
 # Veritabanı dosyası yolu
-DB_FILE = Path(__file__).parent.parent / 'messaging.db'
+DB_FILE = Config.DB_FILE
 
-# Thread-safe bağlantı yönetimi için
-_local = threading.local()
 
+# =====================================================
+# BAĞLANTI HAVUZU
+# =====================================================
 
-def get_db():
+def _readonly_uri(path):
     """
-    Thread-safe SQLite veritabanı bağlantısı döndürür
-    
-    Returns:
-        sqlite3.Connection: Veritabanı bağlantı nesnesi
-    
+    Dosyanın salt-okunur SQLite URI'si
+
+    Yol yüzde kodlanır; '?', '#' ve '%' içeren yollar da doğru açılır.
+    """
+    return Path(path).resolve().as_uri() + '?mode=ro'
+
+
+class ReaderPoolBusy(sqlite3.OperationalError):
+    """Okuyucu havuzunda DB_BUSY_TIMEOUT_MS içinde boş bağlantı bulunamadı"""
+
+
+class _Connection(sqlite3.Connection):
+    """ATTACH edilmiş partition'ları takip edebilen bağlantı"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.attached = OrderedDict()  # takma ad -> dosya yolu (LRU)
+
+
+class ConnectionPool:
+    """
+    Tek yazıcı / çok okuyuculu SQLite bağlantı havuzu
+
     Özellikler:
-    - Her thread için ayrı bağlantı oluşturur
-    - Row factory ile dict benzeri erişim sağlar
-    - Otomatik bağlantı yönetimi
+    - Tüm yazma işlemleri tek bir yazıcı bağlantısı üzerinden, kilitle sıralı yapılır
+    - Okumalar salt-okunur bağlantılardan oluşan havuzdan karşılanır
+    - WAL modunda okuyucular yazıcıyı beklemez
+    - PRAGMA ayarları config.Config üzerinden yapılandırılır
     """
-    if not hasattr(_local, 'connection') or _local.connection is None:
-        _local.connection = sqlite3.connect(
-            DB_FILE,
+
+    def __init__(self, db_file, reader_count=4):
+        self.db_file = db_file
+        self.reader_count = max(1, int(reader_count))
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._readers = queue.LifoQueue()
+        self._created_readers = 0
+        self._all_readers = []
+        self._lock = threading.Lock()
+
+    def _connect(self, readonly=False):
+        """Yapılandırılmış yeni bir SQLite bağlantısı açar"""
+        if readonly:
+            target = _readonly_uri(self.db_file)
+        else:
+            target = str(self.db_file)
+
+        conn = sqlite3.connect(
+            target,
             check_same_thread=False,
-            timeout=10.0  # Timeout 10 saniye
+            timeout=Config.DB_BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=Config.DB_CACHED_STATEMENTS,
+            uri=readonly,
+            factory=_Connection
         )
         # Row'ları dict gibi kullanabilmek için
-        _local.connection.row_factory = sqlite3.Row
-        # Foreign key kontrollerini aktif et
-        _local.connection.execute('PRAGMA foreign_keys = ON')
-    
-    return _local.connection
+        conn.row_factory = sqlite3.Row
+
+        conn.execute(f'PRAGMA busy_timeout = {int(Config.DB_BUSY_TIMEOUT_MS)}')
+        conn.execute(f'PRAGMA cache_size = {int(Config.DB_CACHE_SIZE)}')
+        conn.execute(f'PRAGMA mmap_size = {int(Config.DB_MMAP_SIZE)}')
+        if not readonly:
+            conn.execute(f'PRAGMA journal_mode = {Config.DB_JOURNAL_MODE}')
+            conn.execute(f'PRAGMA synchronous = {Config.DB_SYNCHRONOUS}')
+            # Foreign key kontrollerini aktif et
+            conn.execute('PRAGMA foreign_keys = ON')
+        else:
+            conn.execute('PRAGMA query_only = ON')
+            # Autocommit: reddedilen bir yazma örtük BEGIN'i açık bırakıp
+            # okuyucuyu eski bir WAL anlık görüntüsüne kilitlemesin
+            conn.isolation_level = None
+        return conn
+
+    def get_writer(self):
+        """Yazıcı bağlantısını döndürür (gerekirse oluşturur)"""
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = self._connect()
+        return self._writer
+
+    @contextmanager
+    def writer(self):
+        """
+        Yazıcı bağlantısını kilitleyerek verir
+
+        Kullanım:
+            with pool.writer() as conn:
+                conn.execute(...)
+                conn.commit()
+        """
+        with self._writer_lock:
+            yield self.get_writer()
+
+    @contextmanager
+    def reader(self):
+        """Havuzdan salt-okunur bir bağlantı ödünç verir"""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    def _acquire_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created_readers < self.reader_count:
+                # Salt-okunur bağlantı için dosyanın var olması gerekir
+                self.get_writer()
+                conn = self._connect(readonly=True)
+                self._created_readers += 1
+                self._all_readers.append(conn)
+                return conn
+
+        try:
+            return self._readers.get(timeout=Config.DB_BUSY_TIMEOUT_MS / 1000.0)
+        except queue.Empty:
+            raise ReaderPoolBusy(
+                f'Okuyucu bağlantı havuzu dolu ({self.reader_count} bağlantı)'
+            ) from None
+
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapatır"""
+        with self._lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+            self._created_readers = 0
+            self._readers = queue.LifoQueue()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Uygulama geneli bağlantı havuzunu döndürür
+
+    Returns:
+        ConnectionPool: DB_FILE için yapılandırılmış havuz
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_FILE, Config.DB_READER_COUNT)
+    return _pool
+
+
+def get_db():
+    """
+    Yazıcı SQLite bağlantısını döndürür
+
+    Returns:
+        sqlite3.Connection: Veritabanı bağlantı nesnesi
+
+    Not:
+    - Bağlantı tüm thread'ler arasında paylaşılır; birden fazla sorgudan
+      oluşan yazma işlemleri için get_pool().writer() kullanılmalıdır
+    """
+    return get_pool().get_writer()
 
 
 def close_db():
     """
-    Mevcut thread'in veritabanı bağlantısını kapatır
-    
+    Havuzdaki tüm veritabanı bağlantılarını kapatır
+
     Kullanım:
     - Uygulama kapanırken
-    - Uzun süre kullanılmayacak bağlantılar için
     """
-    if hasattr(_local, 'connection') and _local.connection is not None:
-        _local.connection.close()
-        _local.connection = None
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
 
 
 def init_db():
     """
     Veritabanını başlatır ve tabloları oluşturur
-    
+
     Bu fonksiyon:
     1. Veritabanı dosyasını oluşturur (yoksa)
     2. Tüm tabloları oluşturur
     3. Foreign key kontrollerini aktif eder
+    4. Geçmiş ayların mesajlarını partition'lara taşır
+    5. Grup üyelik indeksini belleğe yükler
     """
     from .models import create_tables
-    
+
     print("🔧 Veritabanı başlatılıyor...")
-    
-    # Veritabanı bağlantısı al
-    conn = get_db()
-    
-    # Tabloları oluştur
-    create_tables(conn)
-    
+
+    # Tabloları yazıcı bağlantısı üzerinden oluştur
+    with get_pool().writer() as conn:
+        create_tables(conn)
+
+    # Geçmiş ayların mesajlarını arşiv partition'larına taşı
+    from .partitions import rotate_partitions
+    rotate_partitions()
+
+    # Üyelik kontrolleri bellekten cevaplansın
+    from .queries import load_membership_index
+    load_membership_index()
+
     print(f"✅ Veritabanı hazır: {DB_FILE}")
 
 
-def execute_query(query, params=None, fetch=False, fetchall=False, commit=True):
+def ensure_attached(conn, alias, path):
+    """
+    Partition dosyasını bağlantıya (gerekirse) salt-okunur ATTACH eder
+
+    Bağlantı başına en fazla Config.MAX_ATTACHED_PARTITIONS dosya açık
+    tutulur; sınır aşılınca en uzun süredir kullanılmayan DETACH edilir.
+    """
+    if alias in conn.attached:
+        conn.attached.move_to_end(alias)
+        return
+
+    while len(conn.attached) >= Config.MAX_ATTACHED_PARTITIONS:
+        old_alias, _ = conn.attached.popitem(last=False)
+        conn.execute(f'DETACH DATABASE {old_alias}')
+
+    conn.execute(f'ATTACH DATABASE ? AS {alias}', (_readonly_uri(path),))
+    conn.attached[alias] = path
+
+
+def _is_read_query(query):
+    """Sorgunun salt okuma (SELECT) olup olmadığını kontrol eder"""
+    return query.lstrip()[:6].upper() == 'SELECT'
+
+
+def _query_name(query, name):
+    """İsim verilmemiş sorgular için SQL'den sabit bir isim türetir"""
+    return name or 'sql:' + ' '.join(query.split())[:60]
+
+
+def _record(name, start, acquired, rows, error, query, params, conn):
+    """Sorgu metriklerini (ve gerekirse yavaş sorgu kaydını) yazar"""
+    elapsed_ms = (time.perf_counter() - acquired) * 1000.0
+    query_metrics.record(
+        name, elapsed_ms, rows=rows,
+        lock_wait_ms=(acquired - start) * 1000.0, error=error
+    )
+    if query is not None and query_metrics.is_slow(elapsed_ms):
+        query_metrics.record_slow(name, elapsed_ms, query, params, conn)
+
+
+def execute_read(query, params=None, fetch=False, lazy=False, name=None,
+                 attach=None):
+    """
+    Salt okuma sorgusu yürütür (asla commit etmez)
+
+    Sorgu okuyucu havuzundaki bir bağlantıda çalışır; hazırlanmış
+    ifadeler bağlantının statement cache'inden (DB_CACHED_STATEMENTS)
+    yeniden kullanılır.
+
+    Args:
+        query (str): SELECT sorgusu
+        params (tuple): Sorgu parametreleri
+        fetch (bool): Tek satır döndür
+        lazy (bool): Satırları liste yerine iterator olarak döndür
+        name (str, optional): Metrikler için sabit sorgu adı
+        attach (tuple, optional): Sorgunun ihtiyaç duyduğu (takma ad, dosya)
+                                  partition'ı
+
+    Returns:
+        dict/list/iterator: Tek satır, satır listesi veya satır iterator'ı
+
+    Not:
+    - lazy=True iken okuyucu bağlantısı iterator tükenene (veya
+      kapatılana) kadar havuza dönmez
+    """
+    name = _query_name(query, name)
+    if lazy:
+        return _iter_rows(query, params, name, attach)
+
+    start = time.perf_counter()
+    with get_pool().reader() as conn:
+        acquired = time.perf_counter()
+        rows, error = 0, False
+        try:
+            if attach:
+                ensure_attached(conn, *attach)
+            cursor = conn.execute(query, params or ())
+            if fetch:
+                result = cursor.fetchone()
+                rows = 1 if result else 0
+                return dict(result) if result else None
+            result = [dict(row) for row in cursor.fetchall()]
+            rows = len(result)
+            return result
+        except sqlite3.Error as e:
+            error = True
+            print(f"❌ Veritabanı hatası: {e}")
+            raise
+        finally:
+            _record(name, start, acquired, rows, error, query, params, conn)
+
+
+def _iter_rows(query, params, name, attach=None):
+    """Satırları tek tek dict olarak üretir"""
+    start = time.perf_counter()
+    with get_pool().reader() as conn:
+        acquired = time.perf_counter()
+        rows, error = 0, False
+        cursor = None
+        try:
+            if attach:
+                ensure_attached(conn, *attach)
+            cursor = conn.execute(query, params or ())
+            for row in cursor:
+                rows += 1
+                yield dict(row)
+        except sqlite3.Error:
+            error = True
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            _record(name, start, acquired, rows, error, None, None, None)
+
+
+@contextmanager
+def write_transaction(name):
+    """
+    Birden fazla sorguyu tek bir yazma transaction'ında çalıştırır
+
+    Başarıda commit, hatada rollback yapar ve işlemi metriklere
+    tek sorgu olarak (değişen satır sayısıyla) kaydeder.
+
+    Kullanım:
+        with write_transaction('deliver_offline_messages') as conn:
+            conn.execute(...)
+    """
+    start = time.perf_counter()
+    with get_pool().writer() as conn:
+        acquired = time.perf_counter()
+        changes_before = conn.total_changes
+        error = False
+        try:
+            yield conn
+            conn.commit()
+        except sqlite3.Error as e:
+            error = True
+            conn.rollback()
+            print(f"❌ Veritabanı hatası: {e}")
+            raise
+        except BaseException:
+            error = True
+            conn.rollback()
+            raise
+        finally:
+            _record(name, start, acquired, conn.total_changes - changes_before,
+                    error, None, None, None)
+
+
+def execute_query(query, params=None, fetch=False, fetchall=False, commit=True,
+                  name=None):
     """
     Güvenli SQL sorgu yürütme fonksiyonu
-    
+
+    SELECT sorguları execute_read ile okuyucu havuzuna (commit'siz),
+    diğer tüm sorgular yazıcı bağlantısına yönlendirilir.
+
     Args:
         query (str): SQL sorgusu
         params (tuple): Sorgu parametreleri (SQL injection koruması)
         fetch (bool): Tek satır döndür
         fetchall (bool): Tüm satırları döndür
         commit (bool): Değişiklikleri kaydet
-    
+        name (str, optional): Metrikler için sabit sorgu adı
+
     Returns:
         list/dict/int: Sorgu sonucu veya lastrowid
     """
-    conn = get_db()
-    cursor = conn.cursor()
-    
-    try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        if commit:
-            conn.commit()
-        
-        if fetch:
-            result = cursor.fetchone()
-            return dict(result) if result else None
-        elif fetchall:
-            return [dict(row) for row in cursor.fetchall()]
-        else:
-            return cursor.lastrowid
-    
-    except sqlite3.Error as e:
-        conn.rollback()
-        print(f"❌ Veritabanı hatası: {e}")
-        raise
-    finally:
-        cursor.close()
+    if _is_read_query(query):
+        if fetch or fetchall:
+            return execute_read(query, params, fetch=fetch, name=name)
+        execute_read(query, params, name=name)
+        return None
+
+    name = _query_name(query, name)
+    start = time.perf_counter()
+    with get_pool().writer() as conn:
+        acquired = time.perf_counter()
+        cursor = None
+        rows, error = 0, False
+
+        try:
+            cursor = conn.execute(query, params or ())
+            rows = max(cursor.rowcount, 0)
+
+            if commit:
+                conn.commit()
+
+            if fetch:
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            elif fetchall:
+                return [dict(row) for row in cursor.fetchall()]
+            else:
+                return cursor.lastrowid
 
+        except sqlite3.Error as e:
+            error = True
+            conn.rollback()
+            print(f"❌ Veritabanı hatası: {e}")
+            raise
+        finally:
+            if cursor is not None:
+                cursor.close()
+            _record(name, start, acquired, rows, error, query, params, conn)
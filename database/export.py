@@ -0,0 +1,74 @@
+"""
+Mesaj Geçmişi Dışa Aktarma
+Kullanıcının tüm mesaj geçmişini NDJSON (satır başına bir JSON mesaj)
+olarak parça parça üretir. Hem /api/messages/export hem de
+scripts/export_messages.py bu üreteci kullanır; bellek kullanımı
+geçmişin uzunluğundan bağımsızdır.
+"""
+
+import json
+import zlib
+
+from config import Config
+from .queries import iter_user_messages
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson isteğe bağlı
+    orjson = None
+
+
+# Üretilen parçaların hedef boyutu (bayt, sıkıştırma öncesi)
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def _encode_line(message):
+    """Mesajı tek satırlık JSON'a çevirir"""
+    if orjson is not None and Config.FAST_JSON:
+        return orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(message, ensure_ascii=False, separators=(',', ':'),
+                       default=str) + '\n').encode('utf-8')
+
+
+def export_user_messages(user_id, after_id=None, compress=False, progress=None):
+    """
+    Kullanıcının mesaj geçmişini NDJSON parçaları olarak üretir
+
+    Args:
+        user_id (int): Kullanıcı ID'si
+        after_id (int, optional): Bu ID'den sonrasını aktar (yarıda kalan
+                                  aktarmaya devam etmek için son satırın id'si)
+        compress (bool): Çıktıyı anında gzip ile sıkıştır
+        progress (callable, optional): Her parça üretilmeden hemen önce
+                                       (toplam satır, parçadaki son ID) ile çağrılır
+
+    Yields:
+        bytes: Sadece tam satırlardan oluşan NDJSON parçaları
+
+    Not:
+    - compress=True iken her parça ayrı bir gzip üyesidir; art arda
+      eklenen parçalar (ve devam eden aktarmalar) geçerli tek bir gzip
+      dosyası oluşturur, yarıda kesilen indirmenin tam parçaları okunabilir
+    """
+    buffer = bytearray()
+    count, last_id = 0, after_id
+
+    def flush():
+        data = bytes(buffer)
+        buffer.clear()
+        if progress is not None:
+            progress(count, last_id)
+        if not compress:
+            return data
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip başlığı
+        return compressor.compress(data) + compressor.flush()
+
+    for message in iter_user_messages(user_id, after_id):
+        buffer += _encode_line(message)
+        count += 1
+        last_id = message['id']
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield flush()
+
+    if buffer:
+        yield flush()
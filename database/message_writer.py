@@ -0,0 +1,307 @@
+"""
+Toplu Mesaj Yazıcı (Write-behind)
+save_message ile gelen INSERT'leri kuyruğa alır ve arka plan
+thread'inde toplu transaction'lar halinde veritabanına yazar
+"""
+
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from config import Config
+from .db_manager import get_pool
+from .metrics import query_metrics
+
+
+# Kuyruğa konan özel işaretler
+_FLUSH = object()
+_STOP = object()
+
+
+class MessageWriter:
+    """
+    Mesajları batch'ler halinde yazan arka plan yazıcısı
+
+    Özellikler:
+    - Her batch tek bir transaction (tek commit / fsync) ile yazılır
+    - batch_size mesaj birikince veya flush_interval_ms dolunca yazılır
+    - Çağırana atanan mesaj ID'si Future (veya callback) ile döner
+    - Kapanışta kuyrukta kalan mesajlar yazılır
+    - Yazılamayan batch'in Future'ları hatayla tamamlanır; thread ölmez
+    """
+
+    def __init__(self, batch_size=128, flush_interval_ms=20):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0, flush_interval_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # İstatistikler
+        self.messages_written = 0
+        self.batches_written = 0
+        self.failed = 0
+
+    def start(self):
+        """Yazıcı thread'ini başlatır"""
+        with self._lock:
+            self._stopped = False
+            self._start_locked()
+        return self
+
+    def _start_locked(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run,
+                name='message-writer',
+                daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, query, params, callback=None):
+        """
+        INSERT sorgusunu yazma kuyruğuna ekler
+
+        Args:
+            query (str): INSERT sorgusu
+            params (tuple): Sorgu parametreleri
+            callback (callable, optional): Mesaj ID'si ile çağrılır
+                                           (hata durumunda None ile)
+
+        Returns:
+            Future: Sonucu mesaj ID'si olan Future
+
+        Raises:
+            RuntimeError: Yazıcı durdurulduysa
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(
+                lambda f: callback(None if f.exception() else f.result())
+            )
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError('Mesaj yazıcı durduruldu')
+            # Thread beklenmedik şekilde öldüyse yeniden başlat
+            self._start_locked()
+            self._queue.put((query, params, future))
+        return future
+
+    def flush(self, timeout=None):
+        """
+        Kuyrukta bekleyen tüm mesajlar yazılana kadar bekler
+
+        Returns:
+            bool: Süre dolmadan tamamlandıysa True
+        """
+        if not self.running:
+            return self._queue.empty()
+        marker = Future()
+        self._queue.put((_FLUSH, None, marker))
+        try:
+            marker.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def stop(self, timeout=10.0):
+        """Kuyruğu boşaltır ve yazıcı thread'ini durdurur"""
+        with self._lock:
+            self._stopped = True
+            if not self.running:
+                return
+            self._queue.put((_STOP, None, None))
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Yazıcı istatistiklerini döndürür"""
+        return {
+            'messages_written': self.messages_written,
+            'batches_written': self.batches_written,
+            'failed': self.failed,
+            'pending': self._queue.qsize(),
+            'batch_size': self.batch_size,
+            'flush_interval_ms': int(self.flush_interval * 1000)
+        }
+
+    # -------------------------------------------------
+    # Arka plan döngüsü
+    # -------------------------------------------------
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, markers, stop = self._collect(item)
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    # Örn. yazıcı bağlantısı açılamadı: bekleyenler hatayla
+                    # döner, sonraki batch'ler yeniden denenir
+                    self._fail_batch(batch, e)
+            for marker in markers:
+                marker.set_result(True)
+            if stop:
+                break
+
+    def _fail_batch(self, batch, error):
+        """Henüz tamamlanmamış Future'ları hatayla tamamlar"""
+        print(f"❌ Mesaj batch'i yazılamadı: {error}")
+        for _, _, future in batch:
+            if not future.done():
+                self.failed += 1
+                future.set_exception(error)
+
+    def _collect(self, first):
+        """İlk elemandan başlayarak bir batch toplar"""
+        batch, markers = [], []
+        deadline = time.monotonic() + self.flush_interval
+        item = first
+
+        while True:
+            query, params, future = item
+            if query is _STOP:
+                # Kalan her şeyi bu batch'e al
+                return self._drain(batch, markers) + (True,)
+            if query is _FLUSH:
+                markers.append(future)
+                return batch, markers, False
+
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, markers, False
+
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, markers, False
+
+    def _drain(self, batch, markers):
+        while True:
+            try:
+                query, params, future = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, markers
+            if query is _FLUSH:
+                markers.append(future)
+            elif query is not _STOP:
+                batch.append((query, params, future))
+
+    def _write_batch(self, batch):
+        """Batch'i tek transaction'da yazar, hata olursa tek tek dener"""
+        start = time.perf_counter()
+        with get_pool().writer() as conn:
+            acquired = time.perf_counter()
+            results = self._write_batch_locked(conn, batch)
+        query_metrics.record(
+            'save_message_batch',
+            (time.perf_counter() - acquired) * 1000.0,
+            rows=len(batch),
+            lock_wait_ms=(acquired - start) * 1000.0
+        )
+
+        # Future'lar (ve callback'leri) yazıcı kilidi bırakıldıktan sonra
+        # tamamlanır; callback'ler diğer yazmaları bekletmez
+        for (_, _, future), (message_id, error) in zip(batch, results):
+            if error is None:
+                future.set_result(message_id)
+            else:
+                future.set_exception(error)
+
+    def _write_batch_locked(self, conn, batch):
+        """
+        Returns:
+            list: Her mesaj için (mesaj ID'si, hata) çifti
+        """
+        cursor = conn.cursor()
+        try:
+            ids = []
+            for query, params, _ in batch:
+                cursor.execute(query, params)
+                ids.append(cursor.lastrowid)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Hatalı tek mesaj tüm batch'i düşürmesin
+            return [self._write_one(conn, query, params) for query, params, _ in batch]
+        finally:
+            cursor.close()
+
+        self.batches_written += 1
+        self.messages_written += len(batch)
+        return [(message_id, None) for message_id in ids]
+
+    def _write_one(self, conn, query, params):
+        try:
+            cursor = conn.execute(query, params)
+            conn.commit()
+            self.batches_written += 1
+            self.messages_written += 1
+            return cursor.lastrowid, None
+        except Exception as e:
+            conn.rollback()
+            self.failed += 1
+            print(f"❌ Mesaj yazılamadı: {e}")
+            return None, e
+
+
+# =====================================================
+# UYGULAMA GENELİ YAZICI
+# =====================================================
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_message_writer():
+    """
+    Yapılandırmaya göre paylaşılan yazıcıyı döndürür
+
+    Returns:
+        MessageWriter: Write-behind kapalıysa None
+    """
+    global _writer
+    if not Config.MESSAGE_WRITE_BEHIND:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = MessageWriter(
+                    batch_size=Config.MESSAGE_BATCH_SIZE,
+                    flush_interval_ms=Config.MESSAGE_FLUSH_INTERVAL_MS
+                ).start()
+    return _writer
+
+
+def result_timeout():
+    """
+    save_message'ın yazıcı sonucunu en fazla kaç saniye bekleyeceği
+
+    Batch en geç MESSAGE_FLUSH_INTERVAL_MS sonra yazılmaya başlar; SQLite
+    kilidi için DB_BUSY_TIMEOUT_MS, batch tek tek yeniden denenirse bir o
+    kadar daha beklenebilir.
+    """
+    return (Config.MESSAGE_FLUSH_INTERVAL_MS + 2 * Config.DB_BUSY_TIMEOUT_MS) / 1000.0
+
+
+def shutdown_message_writer(timeout=10.0):
+    """Kuyrukta kalan mesajları yazar ve yazıcıyı kapatır"""
+    global _writer
+    if _writer is not None:
+        _writer.stop(timeout)
+        _writer = None
+
+
+atexit.register(shutdown_message_writer)
@@ -0,0 +1,168 @@
+"""
+Sorgu Metrikleri
+Her isimlendirilmiş sorgu için çağrı sayısı, gecikme histogramı,
+dönen satır sayısı ve kilit bekleme süresini tutar
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+from config import Config
+
+
+# Histogram kova sınırları (ms): 0.01 ms'den ~60 sn'ye geometrik artış
+_BUCKET_BOUNDS = []
+_bound = 0.01
+while _bound < 60000:
+    _BUCKET_BOUNDS.append(round(_bound, 4))
+    _bound *= 1.25
+
+
+class Histogram:
+    """Sabit geometrik kovalı gecikme histogramı (ms)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value_ms):
+        self.counts[bisect_left(_BUCKET_BOUNDS, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def percentile(self, q):
+        """
+        Yaklaşık yüzdelik değeri (kova üst sınırı) döndürür
+
+        Args:
+            q (float): 0-100 arası yüzdelik
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(_BUCKET_BOUNDS):
+                    return round(min(_BUCKET_BOUNDS[index], self.max), 3)
+                return round(self.max, 3)
+        return round(self.max, 3)
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max, 3)
+        }
+
+
+class QueryStats:
+    """Tek bir isimlendirilmiş sorgunun istatistikleri"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency = Histogram()
+        self.lock_wait = Histogram()
+
+    def snapshot(self):
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.latency.total, 3),
+            'latency': self.latency.snapshot(),
+            'lock_wait': self.lock_wait.snapshot()
+        }
+
+
+class QueryMetrics:
+    """
+    Süreç içi sorgu metrikleri kaydı
+
+    Özellikler:
+    - Sorgu adına göre istatistikler (çağrı, hata, satır, gecikme, kilit bekleme)
+    - Eşiği (Config.SLOW_QUERY_MS) aşan sorgular için yavaş sorgu kaydı
+      (SQL, parametre tipleri ve EXPLAIN QUERY PLAN)
+    """
+
+    def __init__(self, slow_query_ms=None, slow_log_size=100):
+        self.slow_query_ms = slow_query_ms
+        self._stats = {}
+        self._slow_queries = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed_ms, rows=0, lock_wait_ms=0.0, error=False):
+        """Bir sorgu çalışmasını kaydeder"""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = QueryStats(name)
+            stats.calls += 1
+            stats.rows += rows
+            if error:
+                stats.errors += 1
+            stats.latency.add(elapsed_ms)
+            stats.lock_wait.add(lock_wait_ms)
+
+    def is_slow(self, elapsed_ms):
+        return bool(self.slow_query_ms) and elapsed_ms >= self.slow_query_ms
+
+    def record_slow(self, name, elapsed_ms, query, params, conn=None):
+        """
+        Yavaş sorguyu kaydeder
+
+        Args:
+            conn: Verilirse sorgu planı bu bağlantıda çıkarılır
+        """
+        plan = []
+        if conn is not None:
+            try:
+                plan = [row[3] for row in
+                        conn.execute(f'EXPLAIN QUERY PLAN {query}', params or ())]
+            except Exception as e:
+                plan = [f'plan alınamadı: {e}']
+
+        entry = {
+            'name': name,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'sql': ' '.join(query.split()),
+            'params_shape': [type(p).__name__ for p in (params or ())],
+            'plan': plan,
+            'at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        print(f"🐢 Yavaş sorgu: {name} ({entry['elapsed_ms']} ms)")
+
+    def snapshot(self):
+        """Tüm sorguların istatistiklerini toplam süreye göre sıralı döndürür"""
+        with self._lock:
+            stats = [s.snapshot() for s in self._stats.values()]
+        return sorted(stats, key=lambda s: s['total_ms'], reverse=True)
+
+    def slow_queries(self):
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+
+
+# Uygulama geneli kayıt
+query_metrics = QueryMetrics(slow_query_ms=Config.SLOW_QUERY_MS)
@@ -3,6 +3,13 @@ Veritabanı Tablo Yapıları
 Tüm tabloların CREATE TABLE komutları
 """
 
+# Partition'lara taşınan mesaj kolonları (main.messages ile aynı sıra)
+MESSAGE_COLUMNS = (
+    'id', 'sender_id', 'receiver_id', 'group_id', 'message_content',
+    'message_hash', 'message_type', 'status', 'is_offline', 'created_at',
+    'delivered_at', 'read_at', 'conversation_key'
+)
+
 
 def create_tables(conn):
     """
@@ -16,6 +23,7 @@ def create_tables(conn):
     2. groups - Grup bilgileri
     3. group_members - Grup üyelikleri
     4. messages - Mesaj kayıtları
+    5. message_partitions - Aylık arşiv partition'ları
     """
     cursor = conn.cursor()
     
@@ -40,6 +48,7 @@ def create_tables(conn):
             description TEXT,
             created_by INTEGER NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            member_count INTEGER NOT NULL DEFAULT 0,
             FOREIGN KEY (created_by) REFERENCES users (id) ON DELETE CASCADE
         )
     ''')
@@ -73,20 +82,260 @@ def create_tables(conn):
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             delivered_at TIMESTAMP,
             read_at TIMESTAMP,
+            conversation_key INTEGER,
             FOREIGN KEY (sender_id) REFERENCES users (id) ON DELETE CASCADE,
             FOREIGN KEY (receiver_id) REFERENCES users (id) ON DELETE CASCADE,
             FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE
         )
     ''')
     
+    # ============= MESAJ PARTITION'LARI TABLOSU =============
+    # Aylık arşiv dosyaları ve içerdikleri mesaj ID aralıkları
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS message_partitions (
+            name TEXT PRIMARY KEY,
+            month TEXT UNIQUE NOT NULL,
+            file_name TEXT NOT NULL,
+            min_id INTEGER NOT NULL,
+            max_id INTEGER NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # Eski şemalı veritabanlarını güncelle (indekslerden önce)
+    migrate_tables(conn)
+    
     # ============= İNDEXLER (Performans İçin) =============
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages(sender_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_receiver ON messages(receiver_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_group ON messages(group_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_type ON messages(message_type)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_status ON messages(status)')
+
+    # Geçmiş sayfaları için (filtre, id) bileşik indeksleri: her sayfa
+    # sıralama gerektirmeyen sınırlı bir indeks aralık taramasıdır
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_group_id ON messages(group_id, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_type_id ON messages(message_type, id)')
+    # Bileşik indekslerin ön ekleri olan eski tek kolonlu indeksler
+    cursor.execute('DROP INDEX IF EXISTS idx_messages_group')
+    cursor.execute('DROP INDEX IF EXISTS idx_messages_type')
+    # Özel sohbet geçmişi tek bir aralık taraması
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_key, id)')
+    # Sadece teslim edilmemiş mesajları içeren kısmi indeks (çevrimdışı kutusu)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_offline
+        ON messages(receiver_id, id) WHERE is_offline = 1
+    ''')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_group_members_user ON group_members(user_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_group_members_group ON group_members(group_id)')
     
+    # Kullanıcı adı önek araması (büyük/küçük harf duyarsız)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users(lower(username))')
+    
+    # ============= ÜYE SAYISI TRIGGER'LARI =============
+    # groups.member_count her üyelik değişikliğinde artırılıp azaltılır;
+    # grup listesi COUNT() ... GROUP BY çalıştırmaz
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_insert
+        AFTER INSERT ON group_members
+        BEGIN
+            UPDATE groups SET member_count = member_count + 1 WHERE id = new.group_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_group_members_delete
+        AFTER DELETE ON group_members
+        BEGIN
+            UPDATE groups SET member_count = member_count - 1 WHERE id = old.group_id;
+        END
+    ''')
+    
+    # ============= TAM METİN ARAMA (FTS5) =============
+    create_search_index(conn)
+    create_username_index(conn)
+    
     conn.commit()
     print("✅ Veritabanı tabloları oluşturuldu")
+
+
+def create_search_index(conn):
+    """
+    Mesaj içerikleri için FTS5 tam metin arama indeksini oluşturur
+
+    Args:
+        conn: SQLite veritabanı bağlantısı
+
+    Not:
+    - Yetki filtresi için gereken kolonlar UNINDEXED olarak indekste tutulur;
+      böylece partition'lara taşınan mesajlar da aranabilir kalır
+    - Bu yüzden main.messages'tan silme (rotasyon) indeksi etkilemez
+    - Yeni mesajlar INSERT trigger'ı ile eklenir (write-behind yazıcı dahil)
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+    ).fetchone()
+
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+                message_content,
+                sender_id UNINDEXED,
+                receiver_id UNINDEXED,
+                group_id UNINDEXED,
+                message_type UNINDEXED,
+                created_at UNINDEXED
+            )
+        ''')
+    except Exception as e:
+        print(f"⚠️ FTS5 kullanılamıyor, mesaj araması kapalı: {e}")
+        return
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_fts_insert
+        AFTER INSERT ON messages
+        BEGIN
+            INSERT INTO messages_fts
+                (rowid, message_content, sender_id, receiver_id,
+                 group_id, message_type, created_at)
+            VALUES
+                (new.id, new.message_content, new.sender_id, new.receiver_id,
+                 new.group_id, new.message_type, new.created_at);
+        END
+    ''')
+
+    if not exists:
+        # Mevcut mesajları indeksle
+        cursor = conn.execute('''
+            INSERT INTO messages_fts
+                (rowid, message_content, sender_id, receiver_id,
+                 group_id, message_type, created_at)
+            SELECT id, message_content, sender_id, receiver_id,
+                   group_id, message_type, created_at
+            FROM messages
+        ''')
+        if cursor.rowcount > 0:
+            print(f"🔧 {cursor.rowcount} mesaj arama indeksine eklendi")
+
+
+def create_username_index(conn):
+    """
+    Kullanıcı adlarında alt metin araması için trigram FTS5 indeksini oluşturur
+
+    Args:
+        conn: SQLite veritabanı bağlantısı
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'users_fts'"
+    ).fetchone()
+
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS users_fts
+            USING fts5(username, tokenize = 'trigram')
+        ''')
+    except Exception as e:
+        print(f"⚠️ Trigram FTS5 kullanılamıyor, alt metin araması kapalı: {e}")
+        return
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_insert
+        AFTER INSERT ON users
+        BEGIN
+            INSERT INTO users_fts (rowid, username) VALUES (new.id, new.username);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_update
+        AFTER UPDATE OF username ON users
+        BEGIN
+            UPDATE users_fts SET username = new.username WHERE rowid = new.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_users_fts_delete
+        AFTER DELETE ON users
+        BEGIN
+            DELETE FROM users_fts WHERE rowid = old.id;
+        END
+    ''')
+
+    if not exists:
+        conn.execute('INSERT INTO users_fts (rowid, username) SELECT id, username FROM users')
+
+
+def create_message_partition(conn, schema):
+    """
+    ATTACH edilmiş bir partition dosyasında mesaj tablosunu oluşturur
+
+    Args:
+        conn: SQLite veritabanı bağlantısı
+        schema (str): ATTACH takma adı
+
+    Not:
+    - Dosyalar arası foreign key tanımlanamadığı için kısıtlar yoktur;
+      satırlar zaten doğrulanmış olarak main.messages'tan taşınır
+    """
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {schema}.messages (
+            id INTEGER PRIMARY KEY,
+            sender_id INTEGER NOT NULL,
+            receiver_id INTEGER,
+            group_id INTEGER,
+            message_content TEXT NOT NULL,
+            message_hash TEXT NOT NULL,
+            message_type TEXT NOT NULL,
+            status TEXT DEFAULT 'sent',
+            is_offline INTEGER DEFAULT 0,
+            created_at TIMESTAMP,
+            delivered_at TIMESTAMP,
+            read_at TIMESTAMP,
+            conversation_key INTEGER
+        )
+    ''')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_messages_sender ON messages(sender_id)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_messages_receiver ON messages(receiver_id)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_messages_group_id ON messages(group_id, id)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_messages_type_id ON messages(message_type, id)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS {schema}.idx_messages_conversation ON messages(conversation_key, id)')
+
+
+def _column_exists(conn, table, column):
+    """Tabloda kolonun olup olmadığını kontrol eder"""
+    return any(row[1] == column for row in conn.execute(f'PRAGMA table_info({table})'))
+
+
+def migrate_tables(conn):
+    """
+    Mevcut veritabanlarını güncel şemaya taşır
+
+    Args:
+        conn: SQLite veritabanı bağlantısı
+
+    Migration'lar:
+    1. messages.conversation_key - özel mesajlar için (min(kullanıcı), max(kullanıcı))
+       çiftinden türetilen sohbet anahtarı; mevcut satırlar doldurulur
+    2. groups.member_count - trigger'larla güncel tutulan üye sayısı;
+       kolon eklenirken group_members'tan hesaplanır
+    """
+    if not _column_exists(conn, 'messages', 'conversation_key'):
+        conn.execute('ALTER TABLE messages ADD COLUMN conversation_key INTEGER')
+        print("🔧 messages.conversation_key kolonu eklendi")
+
+    # queries.get_conversation_key ile aynı formül
+    cursor = conn.execute('''
+        UPDATE messages
+        SET conversation_key = (min(sender_id, receiver_id) << 32)
+                               | max(sender_id, receiver_id)
+        WHERE message_type = 'private'
+          AND receiver_id IS NOT NULL
+          AND conversation_key IS NULL
+    ''')
+    if cursor.rowcount > 0:
+        print(f"🔧 {cursor.rowcount} özel mesaja conversation_key yazıldı")
+
+    if not _column_exists(conn, 'groups', 'member_count'):
+        conn.execute('ALTER TABLE groups ADD COLUMN member_count INTEGER NOT NULL DEFAULT 0')
+        conn.execute('''
+            UPDATE groups
+            SET member_count = (SELECT COUNT(*) FROM group_members gm
+                                WHERE gm.group_id = groups.id)
+        ''')
+        print("🔧 groups.member_count kolonu eklendi")
@@ -0,0 +1,186 @@
+"""
+Mesaj Partition'ları
+Geçmiş ayların mesajlarını aylık SQLite dosyalarına taşır; geçmiş
+sorguları bu dosyaları gerektiğinde ATTACH ederek okur
+
+Kullanım (proje kökünden, örn. her ay başında):
+    python -m database.partitions
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import Config
+from .db_manager import get_pool, execute_read, write_transaction
+from .models import MESSAGE_COLUMNS, create_message_partition
+
+
+# =====================================================
+# YARDIMCI FONKSİYONLAR
+# =====================================================
+
+def partition_alias(month):
+    """'2024-01' -> 'p_202401' (ATTACH takma adı)"""
+    return 'p_' + month.replace('-', '')
+
+
+def partition_path(file_name):
+    """Partition dosyasının tam yolunu döndürür"""
+    return Path(Config.PARTITION_DIR) / file_name
+
+
+def _month_bounds(month):
+    """'2024-01' -> ('2024-01-01 00:00:00', '2024-02-01 00:00:00')"""
+    year, mon = (int(part) for part in month.split('-'))
+    next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return (f'{year:04d}-{mon:02d}-01 00:00:00',
+            f'{next_year:04d}-{next_mon:02d}-01 00:00:00')
+
+
+# =====================================================
+# PARTITION LİSTESİ
+# =====================================================
+
+_cache_lock = threading.Lock()
+_cache = {'loaded_at': 0.0, 'partitions': []}
+
+
+def get_partitions(newest_first=True):
+    """
+    Arşiv partition'larının listesini döndürür
+
+    Liste Config.PARTITION_CACHE_TTL saniye boyunca bellekte tutulur;
+    bu süreç içindeki rotasyonlar önbelleği hemen yeniler.
+
+    Args:
+        newest_first (bool): True ise en yeni (en büyük ID'li) partition önce
+
+    Returns:
+        list: {'name', 'month', 'path', 'min_id', 'max_id', 'row_count'} listesi
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        if now - _cache['loaded_at'] > Config.PARTITION_CACHE_TTL:
+            rows = execute_read(
+                'SELECT * FROM message_partitions ORDER BY min_id',
+                name='get_partitions'
+            )
+            for row in rows:
+                row['path'] = partition_path(row['file_name'])
+            _cache['partitions'] = rows
+            _cache['loaded_at'] = now
+        partitions = _cache['partitions']
+
+    return list(reversed(partitions)) if newest_first else list(partitions)
+
+
+def invalidate_partition_cache():
+    """Partition listesi önbelleğini geçersiz kılar"""
+    with _cache_lock:
+        _cache['loaded_at'] = 0.0
+
+
+# =====================================================
+# ROTASYON
+# =====================================================
+
+# Partition'a taşınabilecek (durumu son halini almış) mesajlar
+_FINAL = "is_offline = 0 AND (status = 'read' OR message_type != 'private')"
+
+
+def rotate_partitions(now=None):
+    """
+    Geçmiş ayların mesajlarını aylık partition dosyalarına taşır
+
+    İçinde bulunulan ayın mesajları main.messages'ta (sıcak) kalır.
+    Partition'lar salt okunur ATTACH edildiğinden sadece durumu artık
+    değişmeyecek mesajlar taşınır (_FINAL):
+    - Okunmamış özel mesajlar (çevrimdışı kutusundakiler dahil) okunana
+      kadar ana tabloda kalır; durum güncellemeleri hep main'e gider
+    - Grup ve broadcast mesajlarının alıcı bazında durumu yoktur
+
+    Args:
+        now (datetime, optional): Referans zaman (varsayılan: şimdi, UTC)
+
+    Returns:
+        int: Taşınan mesaj sayısı
+    """
+    now = now or datetime.utcnow()
+    current_month_start = now.strftime('%Y-%m-01 00:00:00')
+
+    months = execute_read(
+        f'''
+        SELECT DISTINCT substr(created_at, 1, 7) AS month
+        FROM messages
+        WHERE created_at < ? AND {_FINAL}
+        ''',
+        (current_month_start,),
+        name='rotate_partitions_months'
+    )
+
+    moved = 0
+    for row in months:
+        moved += _move_month(row['month'])
+
+    invalidate_partition_cache()
+    if moved:
+        print(f"📦 {moved} mesaj {len(months)} partition'a taşındı")
+    return moved
+
+
+def _move_month(month):
+    """Tek bir ayın mesajlarını partition dosyasına taşır"""
+    alias = partition_alias(month)
+    file_name = f'messages_{month.replace("-", "_")}.db'
+    path = partition_path(file_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    start, end = _month_bounds(month)
+    where = f'created_at >= ? AND created_at < ? AND {_FINAL}'
+    columns = ', '.join(MESSAGE_COLUMNS)
+
+    with get_pool().writer() as conn:
+        # ATTACH/DETACH açık bir transaction içinde yapılamaz
+        conn.commit()
+        conn.execute(f'ATTACH DATABASE ? AS {alias}', (str(path),))
+        try:
+            create_message_partition(conn, alias)
+            conn.commit()
+
+            with write_transaction('rotate_partitions') as tx:
+                tx.execute(
+                    f'''INSERT OR IGNORE INTO {alias}.messages ({columns})
+                        SELECT {columns} FROM main.messages WHERE {where}''',
+                    (start, end)
+                )
+                min_id, max_id, row_count = tx.execute(
+                    f'SELECT min(id), max(id), count(*) FROM {alias}.messages'
+                ).fetchone()
+                tx.execute(
+                    '''
+                    INSERT INTO message_partitions
+                        (name, month, file_name, min_id, max_id, row_count)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        min_id = excluded.min_id,
+                        max_id = excluded.max_id,
+                        row_count = excluded.row_count
+                    ''',
+                    (alias, month, file_name, min_id, max_id, row_count)
+                )
+                moved = tx.execute(
+                    f'DELETE FROM main.messages WHERE {where}', (start, end)
+                ).rowcount
+        finally:
+            conn.execute(f'DETACH DATABASE {alias}')
+
+    return moved
+
+
+# Standalone çalıştırma
+if __name__ == '__main__':
+    from .db_manager import init_db
+    init_db()
+    rotate_partitions()
@@ -0,0 +1,284 @@
+"""
+Şifre Hash'leme
+Şifreler PBKDF2-HMAC-SHA256 ile hash'lenir. Hesaplama istek thread'inde
+değil, boyutu sınırlı ayrı bir worker havuzunda yapılır; kesinti sonrası
+giriş fırtınalarında aynı anda en fazla Config.PASSWORD_WORKERS hash
+hesaplanır, sınırı aşan istekler kuyrukta bekler veya reddedilir.
+
+Saklama biçimi:
+    pbkdf2_sha256$<iterasyon>$<salt (base64)>$<hash (base64)>
+Eski kayıtlar (64 karakterlik düz SHA-256 hex) girişte yeni biçime
+çevrilir.
+"""
+
+import atexit
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from .metrics import Histogram
+
+
+ALGORITHM = 'pbkdf2_sha256'
+SALT_BYTES = 16
+
+
+class PasswordPoolBusy(Exception):
+    """Hash kuyruğu dolu; istek Config.PASSWORD_QUEUE_TIMEOUT içinde alınamadı"""
+
+
+# =====================================================
+# HASH BİÇİMİ
+# =====================================================
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _pbkdf2(password, salt, iterations):
+    # OpenSSL hesaplama süresince GIL'i bırakır
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+
+def make_hash(password, iterations):
+    """
+    Şifreyi yeni rastgele salt ile hash'ler
+
+    Args:
+        password (str): Şifre
+        iterations (int): PBKDF2 iterasyon sayısı
+
+    Returns:
+        str: Saklanacak hash
+    """
+    salt = os.urandom(SALT_BYTES)
+    digest = _pbkdf2(password, salt, iterations)
+    return f'{ALGORITHM}${iterations}${_b64(salt)}${_b64(digest)}'
+
+
+def is_legacy_hash(stored):
+    """Kayıt eski (tuzsuz tek tur SHA-256) biçimde mi?"""
+    return not stored.startswith(ALGORITHM + '$')
+
+
+def check_hash(password, stored):
+    """
+    Şifreyi saklanan hash ile sabit sürede karşılaştırır
+
+    Args:
+        password (str): Şifre
+        stored (str): Saklanan hash (yeni veya eski biçim)
+
+    Returns:
+        bool: Eşleşiyor mu?
+    """
+    if is_legacy_hash(stored):
+        legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(stored, legacy)
+
+    # Bozuk kayıt (eksik alan, geçersiz base64) eşleşmeyen şifre sayılır
+    try:
+        _, iterations, salt, expected = stored.split('$')
+        expected = base64.b64decode(expected)
+        digest = _pbkdf2(password, base64.b64decode(salt), int(iterations))
+    except (ValueError, binascii.Error):
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
+def needs_rehash(stored, iterations):
+    """Kayıt eski biçimde veya farklı iterasyon sayısıyla mı hash'lenmiş?"""
+    if is_legacy_hash(stored):
+        return True
+    try:
+        return int(stored.split('$')[1]) != iterations
+    except (IndexError, ValueError):
+        return True
+
+
+# =====================================================
+# WORKER HAVUZU
+# =====================================================
+
+class PasswordHasher:
+    """
+    Şifre hash'leme ve doğrulamayı sınırlı bir thread havuzunda yapar
+
+    Özellikler:
+    - Aynı anda en fazla `workers` hash hesaplanır
+    - Çalışan + bekleyen iş sayısı `workers + queue_size` ile sınırlıdır;
+      kuyruk doluysa çağıran queue_timeout kadar bekler, sonra
+      PasswordPoolBusy alır
+    - Kuyruk derinliği, kuyrukta bekleme ve doğrulama süreleri ölçülür
+    """
+
+    def __init__(self, iterations, workers=2, queue_size=64, queue_timeout=5.0):
+        self.iterations = int(iterations)
+        self.workers = max(1, int(workers))
+        self.capacity = self.workers + max(0, int(queue_size))
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='password')
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+
+        # İstatistikler
+        self.in_flight = 0      # Havuzda çalışan + havuz kuyruğunda bekleyen
+        self.blocked = 0        # Kapasite dolu olduğu için bekleyen çağıranlar
+        self.max_in_flight = 0
+        self.rejected = 0
+        self.hashed = 0
+        self.verified = 0
+        self.failed_verifications = 0
+        self.rehashed = 0
+        self._queue_wait = Histogram()
+        self._hash_latency = Histogram()
+        self._verify_latency = Histogram()
+
+    def _run(self, histogram, fn, *args):
+        """İşi havuzda çalıştırır ve sonucunu bekler (çağıran thread bloklanır)"""
+        with self._lock:
+            self.blocked += 1
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self.blocked -= 1
+            if not acquired:
+                self.rejected += 1
+        if not acquired:
+            raise PasswordPoolBusy('Şifre doğrulama kuyruğu dolu')
+
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        submitted = time.perf_counter()
+
+        def task():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_wait.add((started - submitted) * 1000.0)
+                    histogram.add((finished - submitted) * 1000.0)
+
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def hash(self, password):
+        """
+        Şifreyi güncel iterasyon sayısıyla hash'ler
+
+        Returns:
+            str: Saklanacak hash
+
+        Raises:
+            PasswordPoolBusy: Kuyruk dolu
+        """
+        stored = self._run(self._hash_latency, make_hash, password, self.iterations)
+        with self._lock:
+            self.hashed += 1
+        return stored
+
+    def verify(self, password, stored):
+        """
+        Şifreyi doğrular; gerekiyorsa güncel ayarlarla yeniden hash'ler
+
+        Yeniden hash'leme aynı havuz işinde yapılır (şifre düz metin olarak
+        sadece burada elde bulunur).
+
+        Args:
+            password (str): Şifre
+            stored (str): Saklanan hash
+
+        Returns:
+            tuple: (eşleşti mi?, yeni hash veya None)
+
+        Raises:
+            PasswordPoolBusy: Kuyruk dolu
+        """
+        def task():
+            if not check_hash(password, stored):
+                return False, None
+            if needs_rehash(stored, self.iterations):
+                return True, make_hash(password, self.iterations)
+            return True, None
+
+        ok, new_hash = self._run(self._verify_latency, task)
+        with self._lock:
+            self.verified += 1
+            if not ok:
+                self.failed_verifications += 1
+            if new_hash:
+                self.rehashed += 1
+        return ok, new_hash
+
+    def stats(self):
+        """Havuz istatistiklerini döndürür"""
+        with self._lock:
+            return {
+                'algorithm': ALGORITHM,
+                'iterations': self.iterations,
+                'workers': self.workers,
+                'capacity': self.capacity,
+                'queue_depth': max(0, self.in_flight - self.workers) + self.blocked,
+                'in_flight': self.in_flight,
+                'blocked': self.blocked,
+                'max_in_flight': self.max_in_flight,
+                'rejected': self.rejected,
+                'hashed': self.hashed,
+                'verified': self.verified,
+                'failed_verifications': self.failed_verifications,
+                'rehashed': self.rehashed,
+                'queue_wait': self._queue_wait.snapshot(),
+                'hash_latency': self._hash_latency.snapshot(),
+                'verify_latency': self._verify_latency.snapshot()
+            }
+
+    def shutdown(self):
+        """Havuzu kapatır (çalışan işler tamamlanır)"""
+        self._executor.shutdown(wait=True)
+
+
+# =====================================================
+# UYGULAMA GENELİ HAVUZ
+# =====================================================
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Uygulama genelindeki şifre havuzunu döndürür (ilk çağrıda oluşturur)"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                iterations=Config.PASSWORD_HASH_ITERATIONS,
+                workers=Config.PASSWORD_WORKERS,
+                queue_size=Config.PASSWORD_QUEUE_SIZE,
+                queue_timeout=Config.PASSWORD_QUEUE_TIMEOUT
+            )
+        return _hasher
+
+
+def shutdown_password_hasher():
+    """Havuzu kapatır"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is not None:
+            _hasher.shutdown()
+            _hasher = None
+
+
+atexit.register(shutdown_password_hasher)
@@ -0,0 +1,171 @@
+"""
+Toplu Çevrimiçi Durum Yazıcı
+set_user_online çağrılarını bellekte biriktirir ve users tablosuna
+periyodik olarak tek transaction'da yazar
+"""
+
+import atexit
+import threading
+from datetime import datetime
+
+from config import Config
+from .db_manager import write_transaction
+
+
+_UPDATE_QUERY = '''
+    UPDATE users
+    SET is_online = ?, last_seen = ?
+    WHERE id = ?
+'''
+
+
+class PresenceWriter:
+    """
+    is_online / last_seen güncellemelerini batch'leyen arka plan yazıcısı
+
+    Özellikler:
+    - Kullanıcı başına sadece son durum tutulur (giriş + çıkış = tek UPDATE)
+    - flush_interval_ms'de bir bekleyenler executemany ile tek commit'te yazılır
+    - Yazılamayan güncellemeler, yenisi gelmediyse sonraki tura kalır
+    - Kapanışta bekleyenler yazılır
+    """
+
+    def __init__(self, flush_interval_ms=1000):
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+        self._pending = {}  # user_id -> (is_online, last_seen)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # İstatistikler
+        self.updates = 0
+        self.rows_written = 0
+        self.batches_written = 0
+        self.failed = 0
+
+    def start(self):
+        """Yazıcı thread'ini başlatır"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='presence-writer',
+                    daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def mark(self, user_id, is_online):
+        """
+        Kullanıcının çevrimiçi durumunu yazma için biriktirir
+
+        Returns:
+            tuple: (is_online, last_seen) - önbelleğe yansıtmak için
+        """
+        state = (1 if is_online else 0,
+                 datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'))
+        with self._lock:
+            self._pending[user_id] = state
+            self.updates += 1
+        return state
+
+    def pending_state(self, user_id):
+        """Henüz yazılmamış durumu döndürür (yoksa None)"""
+        return self._pending.get(user_id)
+
+    @property
+    def has_pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        """
+        Bekleyen tüm güncellemeleri tek transaction'da yazar
+
+        Returns:
+            int: Yazılan satır sayısı
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            rows = [(is_online, last_seen, user_id)
+                    for user_id, (is_online, last_seen) in batch.items()]
+            try:
+                with write_transaction('set_user_online_batch') as conn:
+                    conn.executemany(_UPDATE_QUERY, rows)
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Çevrimiçi durumlar yazılamadı: {e}")
+                with self._lock:
+                    for user_id, state in batch.items():
+                        self._pending.setdefault(user_id, state)
+                return 0
+
+            self.batches_written += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def stop(self):
+        """Bekleyenleri yazar ve thread'i durdurur"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.flush_interval * 2 + 5)
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        """Yazıcı istatistiklerini döndürür"""
+        return {
+            'updates': self.updates,
+            'rows_written': self.rows_written,
+            'batches_written': self.batches_written,
+            'failed': self.failed,
+            'pending': len(self._pending),
+            'flush_interval_ms': int(self.flush_interval * 1000)
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+# =====================================================
+# UYGULAMA GENELİ YAZICI
+# =====================================================
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_presence_writer():
+    """
+    Yapılandırmaya göre paylaşılan yazıcıyı döndürür
+
+    Returns:
+        PresenceWriter: Toplu yazma kapalıysa None
+    """
+    global _writer
+    if not Config.PRESENCE_WRITE_BEHIND:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = PresenceWriter(
+                    flush_interval_ms=Config.PRESENCE_FLUSH_INTERVAL_MS
+                ).start()
+    return _writer
+
+
+def shutdown_presence_writer():
+    """Bekleyen durumları yazar ve yazıcıyı kapatır"""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
+
+
+atexit.register(shutdown_presence_writer)
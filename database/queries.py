@@ -4,8 +4,19 @@ Tüm CRUD (Create, Read, Update, Delete) işlemleri
 """
 
 import hashlib
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from .db_manager import get_db, execute_query
+from config import Config
+from . import cluster
+from .cache import user_cache, membership_index, group_directory_cache, recent_messages
+from .db_manager import get_db, execute_query, execute_read, write_transaction
+from .message_writer import get_message_writer, result_timeout
+from .presence_writer import get_presence_writer
+from .partitions import get_partitions, invalidate_partition_cache
+from .passwords import get_password_hasher, needs_rehash, PasswordPoolBusy
+from .versions import (
+    resource_versions, room_key, members_key, GROUPS, USERS, MESSAGE_STATUS
+)
 
 
 # =====================================================
@@ -27,15 +38,38 @@ def get_message_hash(message_content):
 
 def hash_password(password):
     """
-    Şifreyi SHA256 ile hash'ler
+    Şifreyi PBKDF2-SHA256 ile hash'ler
+
+    Hesaplama şifre havuzunda yapılır (bkz. passwords.py); iterasyon
+    sayısı Config.PASSWORD_HASH_ITERATIONS'tır.
     
     Args:
         password (str): Kullanıcı şifresi
     
     Returns:
         str: Hash'lenmiş şifre
+
+    Raises:
+        PasswordPoolBusy: Şifre kuyruğu dolu
+    """
+    return get_password_hasher().hash(password)
+
+
+def get_conversation_key(user1_id, user2_id):
+    """
+    İki kullanıcı arasındaki özel sohbetin anahtarını hesaplar
+
+    Anahtar kullanıcı sırasından bağımsızdır: (min << 32) | max
+
+    Args:
+        user1_id (int): Birinci kullanıcı ID'si
+        user2_id (int): İkinci kullanıcı ID'si
+
+    Returns:
+        int: Sohbet anahtarı
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    low, high = sorted((int(user1_id), int(user2_id)))
+    return (low << 32) | high
 
 
 # =====================================================
@@ -61,20 +95,68 @@ def register_user(username, password, email=None):
             INSERT INTO users (username, password_hash, email)
             VALUES (?, ?, ?)
         '''
-        user_id = execute_query(query, (username, password_hash, email))
+        user_id = execute_query(query, (username, password_hash, email), name='register_user')
+        _on_user_changed(user_id, username)
+        cluster.publish('user', user_id=user_id, username=username)
         
         print(f"✅ Kullanıcı oluşturuldu: {username} (ID: {user_id})")
         return True, user_id
     
+    except PasswordPoolBusy:
+        return False, "Sunucu şu anda yoğun, lütfen tekrar deneyin"
     except Exception as e:
         if 'UNIQUE constraint failed' in str(e):
             return False, "Bu kullanıcı adı zaten kullanılıyor"
         return False, str(e)
 
 
+# Olmayan kullanıcılar da aynı maliyetle doğrulanır (kullanıcı adı
+# varlığı yanıt süresinden anlaşılmasın)
+_dummy_hash = None
+
+
+def _missing_user_hash():
+    """
+    Olmayan kullanıcılar için doğrulanacak sahte hash
+
+    İlk çağrıda (veya iterasyon sayısı değiştiyse) şifre havuzunda
+    hesaplanır; istek thread'inde PBKDF2 çalışmaz ve eşzamanlı
+    hesaplamalar havuz kapasitesiyle sınırlı kalır.
+
+    Raises:
+        PasswordPoolBusy: Şifre kuyruğu dolu
+    """
+    global _dummy_hash
+    hasher = get_password_hasher()
+    if _dummy_hash is None or needs_rehash(_dummy_hash, hasher.iterations):
+        _dummy_hash = hasher.hash(hashlib.sha256(b'missing-user').hexdigest())
+    return _dummy_hash
+
+
+def _rehash_password(user, new_hash):
+    """Eski biçimdeki (veya eski maliyetli) hash'i yenisiyle değiştirir"""
+    try:
+        # Arada şifre değiştiyse üzerine yazma
+        execute_query(
+            'UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?',
+            (new_hash, user['id'], user['password_hash']),
+            name='rehash_password'
+        )
+    except Exception as e:
+        print(f"⚠️ Şifre hash'i güncellenemedi ({user['username']}): {e}")
+        return
+    invalidate_user(user['id'], user['username'])
+    cluster.publish('user', user_id=user['id'], username=user['username'])
+    user['password_hash'] = new_hash
+
+
 def authenticate_user(username, password):
     """
     Kullanıcı giriş doğrulaması
+
+    Doğrulama şifre havuzunda yapılır. Hash eski biçimdeyse (düz SHA-256)
+    veya farklı iterasyon sayısıyla üretilmişse başarılı girişte güncel
+    ayarlarla yeniden hash'lenip kaydedilir.
     
     Args:
         username (str): Kullanıcı adı
@@ -82,16 +164,18 @@ def authenticate_user(username, password):
     
     Returns:
         tuple: (başarılı mı?, kullanıcı bilgileri veya None)
+
+    Raises:
+        PasswordPoolBusy: Şifre kuyruğu dolu
     """
-    password_hash = hash_password(password)
-    
-    query = '''
-        SELECT * FROM users
-        WHERE username = ? AND password_hash = ?
-    '''
-    user = execute_query(query, (username, password_hash), fetch=True)
+    # Kullanıcı satırı önbellekten gelebilir; hash sabit sürede karşılaştırılır
+    user = get_user_by_username(username)
+    stored = user['password_hash'] if user else _missing_user_hash()
+    ok, new_hash = get_password_hasher().verify(password, stored)
     
-    if user:
+    if user and ok:
+        if new_hash:
+            _rehash_password(user, new_hash)
         # Kullanıcıyı online yap
         set_user_online(user['id'], True)
         print(f"✅ Giriş başarılı: {username}")
@@ -100,9 +184,59 @@ def authenticate_user(username, password):
     return False, None
 
 
+def _cache_user(user):
+    """Kullanıcı satırını ID ve kullanıcı adı anahtarlarıyla önbelleğe alır"""
+    if user and Config.USER_CACHE_ENABLED:
+        user_cache.set(('id', user['id']), user)
+        user_cache.set(('username', user['username']), user)
+
+
+def _apply_pending_presence(user):
+    """Veritabanından okunan satıra henüz yazılmamış çevrimiçi durumu uygular"""
+    writer = get_presence_writer()
+    if user and writer is not None:
+        state = writer.pending_state(user['id'])
+        if state is not None:
+            user['is_online'], user['last_seen'] = state
+    return user
+
+
+def _on_user_changed(user_id, username=None):
+    """Kullanıcı satırı değişti: önbellekten çıkar, liste sürümünü artır"""
+    invalidate_user(user_id, username)
+    resource_versions.bump(USERS)
+
+
+def _on_presence(user_id, is_online, last_seen):
+    """Henüz yazılmamış çevrimiçi durumu önbellekteki satıra yansıtır"""
+    cached = user_cache.get(('id', user_id))
+    if cached is not None:
+        # Aynı dict kullanıcı adı anahtarı altında da tutuluyor
+        cached['is_online'], cached['last_seen'] = is_online, last_seen
+    resource_versions.bump(USERS)
+
+
+def invalidate_user(user_id=None, username=None):
+    """
+    Kullanıcıyı önbellekten çıkarır
+
+    Args:
+        user_id (int, optional): Kullanıcı ID'si
+        username (str, optional): Kullanıcı adı
+    """
+    if user_id is not None:
+        cached = user_cache.invalidate(('id', user_id))
+        if cached:
+            user_cache.invalidate(('username', cached['username']))
+    if username is not None:
+        cached = user_cache.invalidate(('username', username))
+        if cached:
+            user_cache.invalidate(('id', cached['id']))
+
+
 def get_user_by_id(user_id):
     """
-    ID'ye göre kullanıcı bilgilerini getirir
+    ID'ye göre kullanıcı bilgilerini getirir (önbellekli)
     
     Args:
         user_id (int): Kullanıcı ID'si
@@ -110,13 +244,22 @@ def get_user_by_id(user_id):
     Returns:
         dict: Kullanıcı bilgileri veya None
     """
+    if Config.USER_CACHE_ENABLED:
+        cached = user_cache.get(('id', user_id))
+        if cached is not None:
+            return dict(cached)
+
     query = 'SELECT * FROM users WHERE id = ?'
-    return execute_query(query, (user_id,), fetch=True)
+    user = _apply_pending_presence(
+        execute_read(query, (user_id,), fetch=True, name='get_user_by_id')
+    )
+    _cache_user(user)
+    return dict(user) if user else None
 
 
 def get_user_by_username(username):
     """
-    Kullanıcı adına göre bilgileri getirir
+    Kullanıcı adına göre bilgileri getirir (önbellekli)
     
     Args:
         username (str): Kullanıcı adı
@@ -124,35 +267,134 @@ def get_user_by_username(username):
     Returns:
         dict: Kullanıcı bilgileri veya None
     """
+    if Config.USER_CACHE_ENABLED:
+        cached = user_cache.get(('username', username))
+        if cached is not None:
+            return dict(cached)
+
     query = 'SELECT * FROM users WHERE username = ?'
-    return execute_query(query, (username,), fetch=True)
+    user = _apply_pending_presence(
+        execute_read(query, (username,), fetch=True, name='get_user_by_username')
+    )
+    _cache_user(user)
+    return dict(user) if user else None
 
 
-def get_all_users():
+def get_all_users(lazy=False):
     """
     Tüm kullanıcıları getirir
     
+    Args:
+        lazy (bool): Kullanıcıları Config.STREAM_BATCH_SIZE'lık keyset
+                     batch'leriyle üreten iterator döndür
+
     Returns:
-        list: Kullanıcı listesi
+        list/iterator: Kullanıcı listesi
     """
+    _flush_presence()
+    if lazy:
+        return _iter_all_users(Config.STREAM_BATCH_SIZE)
     query = 'SELECT id, username, is_online, last_seen FROM users ORDER BY username'
-    return execute_query(query, fetchall=True)
+    return execute_read(query, name='get_all_users')
+
+
+def _iter_all_users(batch_size):
+    """Kullanıcıları username sırasıyla batch'ler halinde üretir"""
+    query = '''
+        SELECT id, username, is_online, last_seen FROM users
+        WHERE username > ? ORDER BY username LIMIT ?
+    '''
+    cursor = ''
+    while True:
+        batch = execute_read(query, (cursor, batch_size), name='get_all_users_batch')
+        yield from batch
+        if len(batch) < batch_size:
+            return
+        cursor = batch[-1]['username']
+
+
+def _sqlite_lower(text):
+    """SQLite lower() ile aynı şekilde sadece ASCII harfleri küçültür"""
+    return ''.join(c.lower() if 'A' <= c <= 'Z' else c for c in text)
+
+
+def search_usernames(text, limit=20, after=None, substring=False):
+    """
+    Kullanıcı adına göre arama yapar
+
+    Varsayılan olarak lower(username) indeksi üzerinde önek araması
+    (tek aralık taraması) yapılır. substring=True ise trigram FTS5
+    indeksiyle alt metin araması yapılır (en az 3 karakter).
+
+    Args:
+        text (str): Aranan metin
+        limit (int): Maksimum sonuç sayısı
+        after (tuple, optional): (username, id) cursor'ı; bu kullanıcıdan
+                                 sonraki sonuçlar döner
+        substring (bool): Alt metin araması yap
+
+    Returns:
+        list: {'id', 'username', 'is_online'} listesi (lower(username) sıralı)
+    """
+    needle = _sqlite_lower(text)
+    if not needle:
+        return []
+    _flush_presence()
+    where, params = [], []
+
+    if after is not None:
+        after_name, after_id = _sqlite_lower(after[0]), after[1]
+        where.append('(lower(u.username) > ? OR (lower(u.username) = ? AND u.id > ?))')
+        params += [after_name, after_name, after_id]
+
+    if substring and len(needle) >= 3:
+        source = 'users_fts f JOIN users u ON u.id = f.rowid'
+        where.insert(0, 'users_fts MATCH ?')
+        params.insert(0, '"' + text.replace('"', '""') + '"')
+    else:
+        # Önek aralığı: [needle, needle'ın son karakteri bir artırılmış)
+        source = 'users u'
+        where.insert(0, 'lower(u.username) >= ? AND lower(u.username) < ?')
+        params[0:0] = [needle, needle[:-1] + chr(ord(needle[-1]) + 1)]
+
+    query = f'''
+        SELECT u.id, u.username, u.is_online
+        FROM {source}
+        WHERE {' AND '.join(where)}
+        ORDER BY lower(u.username), u.id
+        LIMIT ?
+    '''
+    return execute_read(query, tuple(params) + (limit,), name='search_usernames')
 
 
 def set_user_online(user_id, is_online=True):
     """
     Kullanıcının çevrimiçi durumunu günceller
     
+    Toplu yazıcı açıksa (Config.PRESENCE_WRITE_BEHIND) güncelleme
+    biriktirilir ve periyodik batch'lerle yazılır; önbellekteki satır
+    hemen güncellenir.
+    
     Args:
         user_id (int): Kullanıcı ID'si
         is_online (bool): Çevrimiçi mi?
     """
+    writer = get_presence_writer()
+    if writer is not None:
+        is_online, last_seen = writer.mark(user_id, is_online)
+        _on_presence(user_id, is_online, last_seen)
+        cluster.publish('presence', user_id=user_id,
+                        is_online=is_online, last_seen=last_seen)
+        return
+
     query = '''
         UPDATE users
         SET is_online = ?, last_seen = CURRENT_TIMESTAMP
         WHERE id = ?
     '''
-    execute_query(query, (1 if is_online else 0, user_id))
+    execute_query(query, (1 if is_online else 0, user_id), name='set_user_online')
+    _on_user_changed(user_id)
+    cluster.publish('user', user_id=user_id)
 
 
 def get_online_users():
@@ -162,8 +404,16 @@ def get_online_users():
     Returns:
         list: Çevrimiçi kullanıcı listesi
     """
+    _flush_presence()
     query = 'SELECT id, username FROM users WHERE is_online = 1 ORDER BY username'
-    return execute_query(query, fetchall=True)
+    return execute_read(query, name='get_online_users')
+
+
+def _flush_presence():
+    """Liste sorgularından önce bekleyen çevrimiçi durumları yazar"""
+    writer = get_presence_writer()
+    if writer is not None and writer.has_pending:
+        writer.flush()
 
 
 # =====================================================
@@ -187,10 +437,12 @@ def create_group(group_name, created_by, description=None):
             INSERT INTO groups (group_name, description, created_by)
             VALUES (?, ?, ?)
         '''
-        group_id = execute_query(query, (group_name, description, created_by))
+        group_id = execute_query(query, (group_name, description, created_by), name='create_group')
         
         # Oluşturanı gruba admin olarak ekle
         add_user_to_group(group_id, created_by, role='admin')
+        group_directory_cache.clear()
+        resource_versions.bump(GROUPS)
         
         print(f"✅ Grup oluşturuldu: {group_name} (ID: {group_id})")
         return True, group_id
@@ -212,26 +464,30 @@ def get_group_by_id(group_id):
         dict: Grup bilgileri veya None
     """
     query = 'SELECT * FROM groups WHERE id = ?'
-    return execute_query(query, (group_id,), fetch=True)
+    return execute_read(query, (group_id,), fetch=True, name='get_group_by_id')
 
 
 def get_all_groups():
     """
     Tüm grupları getirir
     
+    Liste önbellekte tutulur; grup oluşturma ve üyelik değişikliklerinde
+    temizlenir. member_count trigger'larla güncel tutulan kolondur.
+    
     Returns:
         list: Grup listesi
     """
-    query = '''
-        SELECT g.*, u.username as creator_name,
-               COUNT(gm.user_id) as member_count
-        FROM groups g
-        LEFT JOIN users u ON g.created_by = u.id
-        LEFT JOIN group_members gm ON g.id = gm.group_id
-        GROUP BY g.id
-        ORDER BY g.group_name
-    '''
-    return execute_query(query, fetchall=True)
+    groups = group_directory_cache.get('all')
+    if groups is None:
+        query = '''
+            SELECT g.*, u.username as creator_name
+            FROM groups g
+            LEFT JOIN users u ON g.created_by = u.id
+            ORDER BY g.group_name
+        '''
+        groups = execute_read(query, name='get_all_groups')
+        group_directory_cache.set('all', groups)
+    return [dict(group) for group in groups]
 
 
 def add_user_to_group(group_id, user_id, role='member'):
@@ -251,7 +507,9 @@ def add_user_to_group(group_id, user_id, role='member'):
             INSERT INTO group_members (group_id, user_id, role)
             VALUES (?, ?, ?)
         '''
-        execute_query(query, (group_id, user_id, role))
+        execute_query(query, (group_id, user_id, role), name='add_user_to_group')
+        _on_membership('add', int(group_id), int(user_id))
+        cluster.publish('membership', op='add', group_id=int(group_id), user_id=int(user_id))
         return True
     except:
         return False
@@ -266,7 +524,19 @@ def remove_user_from_group(group_id, user_id):
         user_id (int): Kullanıcı ID'si
     """
     query = 'DELETE FROM group_members WHERE group_id = ? AND user_id = ?'
-    execute_query(query, (group_id, user_id))
+    execute_query(query, (group_id, user_id), name='remove_user_from_group')
+    _on_membership('remove', int(group_id), int(user_id))
+    cluster.publish('membership', op='remove', group_id=int(group_id), user_id=int(user_id))
+
+
+def _on_membership(op, group_id, user_id):
+    """Üyelik değişti: indeks, grup listesi önbelleği ve sürümler"""
+    if op == 'add':
+        membership_index.add(group_id, user_id)
+    else:
+        membership_index.remove(group_id, user_id)
+    group_directory_cache.clear()
+    resource_versions.bump(GROUPS, members_key(group_id))
 
 
 def get_group_members(group_id):
@@ -286,7 +556,7 @@ def get_group_members(group_id):
         WHERE gm.group_id = ?
         ORDER BY gm.role DESC, u.username
     '''
-    return execute_query(query, (group_id,), fetchall=True)
+    return execute_read(query, (group_id,), name='get_group_members')
 
 
 def get_user_groups(user_id):
@@ -306,13 +576,15 @@ def get_user_groups(user_id):
         WHERE gm.user_id = ?
         ORDER BY g.group_name
     '''
-    return execute_query(query, (user_id,), fetchall=True)
+    return execute_read(query, (user_id,), name='get_user_groups')
 
 
 def is_user_in_group(user_id, group_id):
     """
     Kullanıcının grupta olup olmadığını kontrol eder
     
+    Veritabanına gitmez; bellek içi üyelik indeksinden cevaplanır.
+    
     Args:
         user_id (int): Kullanıcı ID'si
         group_id (int): Grup ID'si
@@ -320,9 +592,48 @@ def is_user_in_group(user_id, group_id):
     Returns:
         bool: Grupta mı?
     """
-    query = 'SELECT 1 FROM group_members WHERE user_id = ? AND group_id = ?'
-    result = execute_query(query, (user_id, group_id), fetch=True)
-    return result is not None
+    try:
+        user_id, group_id = int(user_id), int(group_id)
+    except (TypeError, ValueError):
+        return False
+
+    loaded = refresh_membership_index()
+    return membership_index.is_member(user_id, group_id, loaded=loaded)
+
+
+def refresh_membership_index():
+    """
+    Üyelik indeksini hiç yüklenmediyse veya süresi dolduysa yükler
+
+    Aynı anda tek thread yükler; diğerleri bu sırada eski indeksi kullanır.
+
+    Returns:
+        bool: Bu çağrı indeksi yükledi mi?
+    """
+    if not membership_index.needs_load() or not membership_index.begin_load():
+        return False
+    try:
+        load_membership_index()
+    except Exception:
+        membership_index.abort_load()
+        raise
+    return True
+
+
+def load_membership_index():
+    """
+    Üyelik indeksini group_members tablosundan (yeniden) yükler
+    
+    Returns:
+        int: Yüklenen üyelik sayısı
+    """
+    since = membership_index.version
+    rows = execute_read(
+        'SELECT group_id, user_id FROM group_members',
+        name='load_membership_index'
+    )
+    membership_index.load(((row['group_id'], row['user_id']) for row in rows), since=since)
+    return len(rows)
 
 
 # =====================================================
@@ -365,85 +676,486 @@ def save_message(sender_id, message_content, message_type,
     return message_id
 
 """
+_SAVE_MESSAGE_QUERY = '''
+    INSERT INTO messages
+    (sender_id, receiver_id, group_id, message_content,
+     message_hash, message_type, is_offline, conversation_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def _message_params(sender_id, message_content, message_type,
+                    receiver_id, group_id, is_offline):
+    """save_message INSERT parametrelerini hazırlar"""
+    conversation_key = None
+    if message_type == 'private' and receiver_id:
+        conversation_key = get_conversation_key(sender_id, receiver_id)
+
+    # Broadcast mesajı için receiver_id ve group_id null olabilir
+    return (
+        sender_id,
+        receiver_id if receiver_id else None,
+        group_id if group_id else None,
+        message_content,
+        get_message_hash(message_content),
+        message_type,
+        1 if is_offline else 0,
+        conversation_key
+    )
+
+
+def _int_or_none(value):
+    return int(value) if value else None
+
+
+def _message_row(message_id, params):
+    """
+    Kaydedilen mesajın geçmiş sorgularıyla aynı biçimdeki satırı
+
+    Returns:
+        dict: m.* + sender_name (gönderen bulunamazsa None)
+    """
+    sender = get_user_by_id(int(params[0]))
+    if sender is None:
+        return None
+    return {
+        'id': message_id,
+        'sender_id': sender['id'],
+        'receiver_id': _int_or_none(params[1]),
+        'group_id': _int_or_none(params[2]),
+        'message_content': params[3],
+        'message_hash': params[4],
+        'message_type': params[5],
+        'status': 'sent',
+        'is_offline': params[6],
+        'created_at': _utc_now(),
+        'delivered_at': None,
+        'read_at': None,
+        'conversation_key': params[7],
+        'sender_name': sender['username']
+    }
+
+
+def _message_saved(message_id, params, room, local=True):
+    """Commit sonrası: oda sürümünü artırır ve son mesaj tamponuna ekler"""
+    resource_versions.bump(room)
+    if recent_messages is not None:
+        recent_messages.append(room, lambda: _message_row(message_id, params))
+    if local:
+        cluster.publish('message', message_id=message_id, params=list(params))
+
+
+def _on_status(message_ids, **fields):
+    """Teslim / okundu güncellemesi: sürüm ve tampondaki satırlar"""
+    resource_versions.bump(MESSAGE_STATUS)
+    if recent_messages is not None:
+        for message_id in message_ids:
+            recent_messages.update(message_id, **fields)
+
+
+def _message_room(params):
+    """_message_params çıktısından mesajın oda sürüm anahtarını döndürür"""
+    message_type = params[5]
+    if message_type == 'group':
+        return room_key('group', int(params[2]) if params[2] else None)
+    if message_type == 'private':
+        return room_key('private', params[7])
+    return room_key(message_type)
+
+
 def save_message(sender_id, message_content, message_type,
-                 receiver_id=None, group_id=None, is_offline=False):
+                 receiver_id=None, group_id=None, is_offline=False,
+                 callback=None):
     """
     Mesajı veritabanına kaydeder
-    """
-    message_hash = get_message_hash(message_content)
 
-    # Broadcast mesajı için receiver_id ve group_id null olabilir
-    query = '''
-        INSERT INTO messages
-        (sender_id, receiver_id, group_id, message_content,
-         message_hash, message_type, is_offline)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    '''
+    Write-behind modu açıksa (Config.MESSAGE_WRITE_BEHIND) mesaj yazıcı
+    kuyruğuna eklenir ve batch commit edilene kadar beklenir: her çağrı
+    en fazla MESSAGE_FLUSH_INTERVAL_MS (+ batch yazma süresi) kadar
+    bloklanır. Karşılığında yoğun yükte commit (fsync) sayısı batch
+    başına bire iner. ID'yi beklemesi gerekmeyen çağıranlar
+    save_message_async kullanmalıdır. Sonuç en fazla
+    message_writer.result_timeout() saniye beklenir; süre dolarsa None
+    döner (mesaj daha sonra yine de yazılabilir).
+
+    Args:
+        callback (callable, optional): Mesaj ID'si ile çağrılır
 
+    Returns:
+        int: Mesaj ID'si (hata durumunda None)
+    """
     try:
-        message_id = execute_query(
-            query,
-            (
-                sender_id,
-                receiver_id if receiver_id else None,
-                group_id if group_id else None,
-                message_content,
-                message_hash,
-                message_type,
-                1 if is_offline else 0
-            )
+        future = save_message_async(
+            sender_id, message_content, message_type,
+            receiver_id=receiver_id, group_id=group_id,
+            is_offline=is_offline, callback=callback
         )
-        return message_id
+        return future.result(timeout=result_timeout())
+    except FutureTimeoutError:
+        print("[DB ERROR] save_message: yazıcı zaman aşımı")
+        return None
     except Exception as e:
         print("[DB ERROR] save_message:", e)
         return None
 
-def get_messages_by_user(user_id, limit=100):
+
+def save_message_async(sender_id, message_content, message_type,
+                       receiver_id=None, group_id=None, is_offline=False,
+                       callback=None):
+    """
+    Mesajı kaydeder, sonucu beklemeden Future döndürür
+
+    Write-behind kapalıysa mesaj hemen yazılır ve tamamlanmış
+    bir Future döner.
+
+    Returns:
+        Future: Sonucu mesaj ID'si olan Future
+    """
+    params = _message_params(sender_id, message_content, message_type,
+                             receiver_id, group_id, is_offline)
+
+    room = _message_room(params)
+
+    writer = get_message_writer()
+    if writer is not None:
+        def on_saved(message_id):
+            # Batch commit edildikten sonra
+            if message_id is not None:
+                _message_saved(message_id, params, room)
+            if callback is not None:
+                callback(message_id)
+        return writer.submit(_SAVE_MESSAGE_QUERY, params, on_saved)
+
+    future = Future()
+    try:
+        message_id = execute_query(_SAVE_MESSAGE_QUERY, params, name='save_message')
+        _message_saved(message_id, params, room)
+        future.set_result(message_id)
+    except Exception as e:
+        future.set_exception(e)
+    if callback is not None:
+        callback(None if future.exception() else future.result())
+    return future
+
+_HISTORY_SELECT = '''
+    SELECT m.*, u.username as sender_name
+    FROM {schema}.messages m
+    JOIN main.users u ON m.sender_id = u.id
+'''
+
+# Akıtılan sayfaların ID aralığını belirlemek için sadece ID okunur
+_HISTORY_ID_SELECT = 'SELECT m.id FROM {schema}.messages m'
+
+
+def _fetch_page(name, where, params, limit, before_id, after_id, partition=None,
+                select=_HISTORY_SELECT):
+    """
+    Tek bir şemadan (main veya bir partition) keyset sayfası getirir
+
+    Returns:
+        list: before/cursor'suz istekte yeniden eskiye, after_id ile
+              istekte eskiden yeniye sıralı mesajlar
+    """
+    if after_id is not None:
+        where += ' AND m.id > ?'
+        params += (after_id,)
+        order = 'ASC'
+    else:
+        if before_id is not None:
+            where += ' AND m.id < ?'
+            params += (before_id,)
+        order = 'DESC'
+
+    schema = partition['name'] if partition else 'main'
+    attach = (partition['name'], partition['path']) if partition else None
+    query = (f'{select.format(schema=schema)} '
+             f'WHERE {where} ORDER BY m.id {order} LIMIT ?')
+    return execute_read(query, params + (limit,), name=name, attach=attach)
+
+
+def _fetch_history_page(name, where, params, limit, before_id=None, after_id=None,
+                        select=_HISTORY_SELECT):
+    """
+    Keyset (cursor) sayfalama ile mesaj geçmişi sayfası getirir
+
+    Sıralama m.id üzerinden yapılır; (filtre, id) bileşik indeksleri
+    sayesinde her sayfa sınırlı bir indeks aralık taramasıdır.
+    Önce sıcak main.messages okunur, ardından ID aralığı sayfaya
+    girebilecek her arşiv partition'ının sayfası ID'ye göre birleştirilir.
+    main her zaman okunur: okunmamış mesajlar eski ID'leriyle main'de
+    kalır ve partition aralıklarıyla örtüşebilir. Aralıklar örtüşse de
+    sonuç doğru olsun diye dolaşma bir aralık sınırında kesilmez; sayfa
+    dolduysa aralığı sayfanın dışında kalan partition'lar sorgulanmadan
+    atlanır.
+
+    Args:
+        name (str): Metrikler için sorgu adı
+        where (str): m.* üzerinde filtre koşulu
+        params (tuple): Filtre parametreleri
+        limit (int): Sayfa boyutu
+        before_id (int, optional): Bu ID'den eski mesajlar
+        after_id (int, optional): Bu ID'den yeni mesajlar
+        select (str, optional): {schema} yer tutuculu SELECT ... FROM kısmı
+
+    Returns:
+        list: Eskiden yeniye sıralı mesaj listesi
+    """
+    descending = after_id is None
+    messages = _fetch_page(name, where, params, limit, before_id, after_id,
+                           select=select)
+
+    for partition in get_partitions(newest_first=descending):
+        if descending:
+            if before_id is not None and partition['min_id'] >= before_id:
+                continue
+            # Partition'ın hiçbir satırı dolu sayfaya giremez
+            if len(messages) >= limit and partition['max_id'] < messages[-1]['id']:
+                continue
+        else:
+            if partition['max_id'] <= after_id:
+                continue
+            if len(messages) >= limit and partition['min_id'] > messages[-1]['id']:
+                continue
+
+        older = _fetch_page(name, where, params, limit, before_id, after_id,
+                            partition, select)
+        messages = _merge_pages(messages, older, limit, descending)
+
+    if descending:
+        messages.reverse()  # Eski'den yeniye
+    return messages
+
+
+def iter_history_page(name, where, params, limit, before_id=None, after_id=None,
+                      batch_size=None):
+    """
+    Büyük geçmiş sayfalarını keyset batch'leriyle üretir
+
+    Sayfa, _fetch_history_page ile eskiden yeniye Config.STREAM_BATCH_SIZE
+    satırlık batch'ler halinde okunur; bellekte aynı anda tek batch tutulur
+    ve okuyucu bağlantısı batch'ler arasında havuza döner, yavaş bir
+    istemci bağlantı tutmaz. after_id'siz isteklerde sayfanın ID aralığı
+    önce sadece ID'ler okunarak belirlenir. Sonuç _fetch_history_page ile
+    aynıdır.
+
+    Args:
+        batch_size (int, optional): Batch boyutu (varsayılan
+                                    Config.STREAM_BATCH_SIZE)
+        (diğerleri _fetch_history_page ile aynı)
+
+    Yields:
+        dict: Eskiden yeniye sıralı mesajlar
+    """
+    batch_size = batch_size or Config.STREAM_BATCH_SIZE
+
+    if after_id is None:
+        ids = _fetch_history_page(name + '_bounds', where, params, limit,
+                                  before_id, select=_HISTORY_ID_SELECT)
+        if not ids:
+            return
+        # Sayfa [ilk, son] aralığıdır; arada yazılan mesajlar sayfaya girmez
+        where += ' AND m.id <= ?'
+        params += (ids[-1]['id'],)
+        after_id = ids[0]['id'] - 1
+
+    remaining = limit
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batch = _fetch_history_page(name + '_stream', where, params, size,
+                                    after_id=after_id)
+        yield from batch
+        if len(batch) < size:
+            return
+        remaining -= size
+        after_id = batch[-1]['id']
+
+
+def _room_history(room, name, where, params, limit, before_id=None, after_id=None,
+                  lazy=False):
+    """
+    Oda geçmişini önce son mesaj tamponundan, olmazsa veritabanından getirir
+
+    Oda ilk açıldığında en yeni Config.RECENT_MESSAGES_DEPTH mesajla
+    ısıtılır; tamponun kapsadığı sayfalar SQLite'a gitmeden döner.
+
+    Args:
+        room: versions.room_key ile üretilen oda anahtarı
+        lazy (bool): Tamponu atlayıp iter_history_page ile batch'ler halinde üret
+        (diğerleri _fetch_history_page ile aynı)
+
+    Returns:
+        list/iterator: Eskiden yeniye sıralı mesajlar
+    """
+    if lazy:
+        return iter_history_page(name, where, params, limit, before_id, after_id)
+    if recent_messages is None:
+        return _fetch_history_page(name, where, params, limit, before_id, after_id)
+
+    messages = recent_messages.read(room, limit, before_id, after_id)
+    if messages is not None:
+        return messages
+
+    if recent_messages.begin_warm(room):
+        depth = recent_messages.depth
+        try:
+            rows = _fetch_history_page(name, where, params, depth)
+        except Exception:
+            recent_messages.abort_warm(room)
+            raise
+        recent_messages.finish_warm(room, rows, exhaustive=len(rows) < depth)
+
+        messages = recent_messages.read(room, limit, before_id, after_id)
+        if messages is not None:
+            return messages
+
+    return _fetch_history_page(name, where, params, limit, before_id, after_id)
+
+
+def _merge_pages(messages, more, limit, descending):
+    """İki sayfayı ID sırasına göre birleştirir ve limit'e kırpar"""
+    if not more:
+        return messages
+    by_id = {m['id']: m for m in messages}
+    for message in more:
+        by_id.setdefault(message['id'], message)
+    merged = sorted(by_id.values(), key=lambda m: m['id'], reverse=descending)
+    return merged[:limit]
+
+
+def get_messages_by_user(user_id, limit=100, before_id=None):
     """
     Kullanıcının tüm mesajlarını getirir
     
     Args:
         user_id (int): Kullanıcı ID'si
         limit (int): Maksimum mesaj sayısı
+        before_id (int, optional): Sadece bu ID'den eski mesajlar
     
     Returns:
-        list: Mesaj listesi
+        list: Mesaj listesi (yeniden eskiye)
     """
-    query = '''
-        SELECT m.*, u.username as sender_name
-        FROM messages m
-        JOIN users u ON m.sender_id = u.id
-        WHERE m.sender_id = ? OR m.receiver_id = ?
-        ORDER BY m.created_at DESC
-        LIMIT ?
-    '''
-    return execute_query(query, (user_id, user_id, limit), fetchall=True)
+    messages = _fetch_history_page(
+        'get_messages_by_user',
+        '(m.sender_id = ? OR m.receiver_id = ?)',
+        (user_id, user_id), limit, before_id
+    )
+    messages.reverse()
+    return messages
+
+
+# Bundan fazla gruba üye kullanıcılarda grup kolu tek IN koşuluna düşer
+_EXPORT_MAX_GROUP_BRANCHES = 100
+
+
+def _user_message_branches(user_id):
+    """
+    Kullanıcının gönderdiği/aldığı mesajlar için UNION ALL kollarını döndürür
+
+    Her kol kendi indeksinde id sırasıyla okunur (sender_id, receiver_id ve
+    (group_id, id) indekslerinin sonunda rowid vardır); SQLite kolları
+    sıralı birleştirir ve LIMIT'e ulaşınca durur. Aynı mesajın iki kolda
+    gelmemesi için gönderenin kendisi diğer kollardan çıkarılır.
+
+    Returns:
+        list: (koşul, parametreler) listesi
+    """
+    branches = [
+        ('m.sender_id = ?', (user_id,)),
+        ("m.receiver_id = ? AND +m.message_type = 'private' AND m.sender_id != ?",
+         (user_id, user_id))
+    ]
+    group_ids = [group['id'] for group in get_user_groups(user_id)]
+    if len(group_ids) > _EXPORT_MAX_GROUP_BRANCHES:
+        placeholders = ', '.join('?' * len(group_ids))
+        branches.append((f"m.group_id IN ({placeholders}) AND +m.message_type = 'group' "
+                         "AND m.sender_id != ?", (*group_ids, user_id)))
+    else:
+        branches.extend(("m.group_id = ? AND +m.message_type = 'group' AND m.sender_id != ?",
+                         (group_id, user_id)) for group_id in group_ids)
+    return branches
+
+
+def _fetch_export_batch(branches, after_id, limit, partition=None):
+    """Tek şemadan after_id sonrasındaki limit kadar mesajı getirir"""
+    schema = partition['name'] if partition else 'main'
+    select = _HISTORY_SELECT.format(schema=schema)
+    query = ' UNION ALL '.join(
+        f'{select} WHERE {where} AND m.id > ?' for where, _ in branches
+    ) + ' ORDER BY id ASC LIMIT ?'
+    params = tuple(p for _, branch_params in branches for p in (*branch_params, after_id))
+    attach = (partition['name'], partition['path']) if partition else None
+    return execute_read(query, params + (limit,), name='export_user_messages',
+                        attach=attach)
+
 
+def iter_user_messages(user_id, after_id=None, batch_size=None):
+    """
+    Kullanıcının tüm mesaj geçmişini eskiden yeniye üretir
+
+    Gönderdiği her mesaj, aldığı özel mesajlar ve üyesi olduğu grupların
+    mesajları (arşiv partition'ları dahil) keyset sayfalarla okunur.
+    Bellekte aynı anda tek sayfa tutulur ve okuyucu bağlantısı sayfalar
+    arasında havuza döner; yavaş bir indirme bağlantı tutmaz.
+
+    Args:
+        user_id (int): Kullanıcı ID'si
+        after_id (int, optional): Bu ID'den sonrasını üret (devam etmek için
+                                  en son dışa aktarılan ID)
+        batch_size (int, optional): Sayfa boyutu (varsayılan Config.EXPORT_BATCH_SIZE)
+
+    Yields:
+        dict: Mesaj (sender_name dahil)
+
+    Not:
+    - Grup üyeliği dışa aktarma başladığı andaki haliyle değerlendirilir
+    """
+    batch_size = batch_size or Config.EXPORT_BATCH_SIZE
+    branches = _user_message_branches(user_id)
+    cursor = after_id or 0
+
+    while True:
+        page = _fetch_export_batch(branches, cursor, batch_size)
+        for partition in get_partitions(newest_first=False):
+            if partition['max_id'] <= cursor:
+                continue
+            # Partition'ın hiçbir satırı dolu sayfaya giremez
+            if len(page) >= batch_size and partition['min_id'] > page[-1]['id']:
+                continue
+            older = _fetch_export_batch(branches, cursor, batch_size, partition)
+            page = _merge_pages(page, older, batch_size, descending=False)
+
+        yield from page
+        if len(page) < batch_size:
+            return
+        cursor = page[-1]['id']
 
-def get_group_messages(group_id, limit=50):
+
+def get_group_messages(group_id, limit=50, before_id=None, after_id=None,
+                       lazy=False):
     """
     Grup mesajlarını getirir
     
     Args:
         group_id (int): Grup ID'si
         limit (int): Maksimum mesaj sayısı
+        before_id (int, optional): Sadece bu ID'den eski mesajlar
+        after_id (int, optional): Sadece bu ID'den yeni mesajlar
+        lazy (bool): Tamponu atlayıp batch'ler halinde üreten iterator döndür
     
     Returns:
-        list: Mesaj listesi
+        list/iterator: Mesaj listesi
     """
-    query = '''
-        SELECT m.*, u.username as sender_name
-        FROM messages m
-        JOIN users u ON m.sender_id = u.id
-        WHERE m.group_id = ? AND m.message_type = 'group'
-        ORDER BY m.created_at DESC
-        LIMIT ?
-    '''
-    messages = execute_query(query, (group_id, limit), fetchall=True)
-    return list(reversed(messages))  # Eski'den yeniye
+    # Unary '+' planlayıcıyı (group_id, id) indeksine yönlendirir
+    return _room_history(
+        room_key('group', int(group_id)),
+        'get_group_messages',
+        "m.group_id = ? AND +m.message_type = 'group'",
+        (group_id,), limit, before_id, after_id, lazy
+    )
 
 
-def get_private_messages(user1_id, user2_id, limit=50):
+def get_private_messages(user1_id, user2_id, limit=50,
+                         before_id=None, after_id=None, lazy=False):
     """
     İki kullanıcı arasındaki özel mesajları getirir
     
@@ -451,48 +1163,99 @@ def get_private_messages(user1_id, user2_id, limit=50):
         user1_id (int): Birinci kullanıcı ID'si
         user2_id (int): İkinci kullanıcı ID'si
         limit (int): Maksimum mesaj sayısı
+        before_id (int, optional): Sadece bu ID'den eski mesajlar
+        after_id (int, optional): Sadece bu ID'den yeni mesajlar
+        lazy (bool): Tamponu atlayıp batch'ler halinde üreten iterator döndür
     
     Returns:
-        list: Mesaj listesi
+        list/iterator: Mesaj listesi
     """
-    query = '''
-        SELECT m.*, u.username as sender_name
-        FROM messages m
-        JOIN users u ON m.sender_id = u.id
-        WHERE m.message_type = 'private'
-        AND ((m.sender_id = ? AND m.receiver_id = ?)
-             OR (m.sender_id = ? AND m.receiver_id = ?))
-        ORDER BY m.created_at DESC
-        LIMIT ?
-    '''
-    messages = execute_query(
-        query,
-        (user1_id, user2_id, user2_id, user1_id, limit),
-        fetchall=True
+    # (conversation_key, id) indeksi üzerinde tek aralık taraması
+    conversation_key = get_conversation_key(user1_id, user2_id)
+    return _room_history(
+        room_key('private', conversation_key),
+        'get_private_messages',
+        'm.conversation_key = ?',
+        (conversation_key,), limit, before_id, after_id, lazy
     )
-    return list(reversed(messages))
 
 
-def get_broadcast_messages(limit=50):
+def get_broadcast_messages(limit=50, before_id=None, after_id=None, lazy=False):
     """
     Broadcast mesajlarını getirir
     
     Args:
         limit (int): Maksimum mesaj sayısı
+        before_id (int, optional): Sadece bu ID'den eski mesajlar
+        after_id (int, optional): Sadece bu ID'den yeni mesajlar
+        lazy (bool): Tamponu atlayıp batch'ler halinde üreten iterator döndür
     
     Returns:
-        list: Mesaj listesi
+        list/iterator: Mesaj listesi
+    """
+    return _room_history(
+        room_key('broadcast'),
+        'get_broadcast_messages',
+        "m.message_type = 'broadcast'",
+        (), limit, before_id, after_id, lazy
+    )
+
+
+def _fts_query(text):
+    """
+    Kullanıcı girdisini güvenli bir FTS5 sorgusuna çevirir
+
+    Her kelime tırnak içine alınır (FTS operatörleri yorumlanmaz),
+    kelimeler AND ile birleşir, son kelimede önek eşleşmesi yapılır.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    if not terms:
+        return None
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_messages(user_id, text, limit=20, offset=0):
+    """
+    Kullanıcının erişebildiği mesajlarda tam metin arama yapar
+
+    Sonuçlar FTS5 bm25 sıralamasıyla döner ve sadece kullanıcının
+    görebileceği mesajlarla sınırlıdır: broadcast'ler, gönderdiği ya da
+    aldığı özel mesajlar ve üyesi olduğu grupların mesajları.
+
+    Args:
+        user_id (int): Arayan kullanıcının ID'si
+        text (str): Arama metni
+        limit (int): Sayfa boyutu
+        offset (int): Atlanacak sonuç sayısı
+
+    Returns:
+        list: Mesaj listesi (en alakalıdan başlayarak)
     """
+    match = _fts_query(text)
+    if match is None:
+        return []
+
     query = '''
-        SELECT m.*, u.username as sender_name
-        FROM messages m
-        JOIN users u ON m.sender_id = u.id
-        WHERE m.message_type = 'broadcast'
-        ORDER BY m.created_at DESC
-        LIMIT ?
+        SELECT f.rowid AS id, f.message_content, f.sender_id, f.receiver_id,
+               f.group_id, f.message_type, f.created_at,
+               u.username AS sender_name
+        FROM messages_fts f
+        JOIN users u ON u.id = f.sender_id
+        WHERE messages_fts MATCH ?
+          AND (f.message_type = 'broadcast'
+               OR (f.message_type = 'private'
+                   AND (f.sender_id = ? OR f.receiver_id = ?))
+               OR (f.message_type = 'group'
+                   AND f.group_id IN (SELECT group_id FROM group_members
+                                      WHERE user_id = ?)))
+        ORDER BY f.rank
+        LIMIT ? OFFSET ?
     '''
-    messages = execute_query(query, (limit,), fetchall=True)
-    return list(reversed(messages))
+    return execute_read(
+        query, (match, user_id, user_id, user_id, limit, offset),
+        name='search_messages'
+    )
 
 
 def get_offline_messages(user_id):
@@ -510,9 +1273,49 @@ def get_offline_messages(user_id):
         FROM messages m
         JOIN users u ON m.sender_id = u.id
         WHERE m.receiver_id = ? AND m.is_offline = 1
-        ORDER BY m.created_at
+        ORDER BY m.id
     '''
-    return execute_query(query, (user_id,), fetchall=True)
+    return execute_read(query, (user_id,), name='get_offline_messages')
+
+
+def deliver_offline_messages(user_id):
+    """
+    Çevrimdışı mesajları getirir ve tek transaction'da teslim edildi yapar
+
+    Mesaj başına bir UPDATE/commit yerine okunan en büyük ID'ye kadar
+    olan aralık tek bir UPDATE ile işaretlenir. Okuma ile güncelleme
+    arasında gelen yeni mesajlar bir sonraki çağrıya kalır.
+
+    Args:
+        user_id (int): Kullanıcı ID'si
+
+    Returns:
+        list: Teslim edilen mesaj listesi
+    """
+    select_query = '''
+        SELECT m.*, u.username as sender_name
+        FROM messages m
+        JOIN users u ON m.sender_id = u.id
+        WHERE m.receiver_id = ? AND m.is_offline = 1
+        ORDER BY m.id
+    '''
+    update_query = '''
+        UPDATE messages
+        SET status = 'delivered',
+            delivered_at = CURRENT_TIMESTAMP,
+            is_offline = 0
+        WHERE receiver_id = ? AND is_offline = 1 AND id <= ?
+    '''
+
+    with write_transaction('deliver_offline_messages') as conn:
+        messages = [dict(row) for row in conn.execute(select_query, (user_id,))]
+        if messages:
+            conn.execute(update_query, (user_id, messages[-1]['id']))
+
+    if messages:
+        _update_status([m['id'] for m in messages], status='delivered',
+                       is_offline=0, delivered_at=_utc_now())
+    return messages
 
 
 def mark_message_delivered(message_id):
@@ -521,6 +1324,9 @@ def mark_message_delivered(message_id):
     
     Args:
         message_id (int): Mesaj ID'si
+    
+    Returns:
+        bool: Mesaj güncellendi mi? (False: bulunamadı veya arşivde)
     """
     query = '''
         UPDATE messages
@@ -529,7 +1335,11 @@ def mark_message_delivered(message_id):
             is_offline = 0
         WHERE id = ?
     '''
-    execute_query(query, (message_id,))
+    if not _execute_update(query, message_id, 'mark_message_delivered'):
+        return False
+    _update_status([int(message_id)], status='delivered',
+                   is_offline=0, delivered_at=_utc_now())
+    return True
 
 
 def mark_message_read(message_id):
@@ -538,6 +1348,9 @@ def mark_message_read(message_id):
     
     Args:
         message_id (int): Mesaj ID'si
+    
+    Returns:
+        bool: Mesaj güncellendi mi? (False: bulunamadı veya arşivde)
     """
     query = '''
         UPDATE messages
@@ -545,5 +1358,75 @@ def mark_message_read(message_id):
             read_at = CURRENT_TIMESTAMP
         WHERE id = ?
     '''
-    execute_query(query, (message_id,))
+    if not _execute_update(query, message_id, 'mark_message_read'):
+        return False
+    _update_status([int(message_id)], status='read', read_at=_utc_now())
+    return True
+
+
+def _execute_update(query, message_id, name):
+    """
+    Tek mesajlık durum güncellemesi; değişen satır sayısını döndürür
+
+    Durumu değişebilecek mesajlar partition'lara taşınmaz (bkz.
+    rotate_partitions); 0 satır, mesajın olmadığı veya zaten son
+    durumunda arşivlendiği anlamına gelir.
+    """
+    with write_transaction(name) as conn:
+        return conn.execute(query, (message_id,)).rowcount
+
+
+def _utc_now():
+    """CURRENT_TIMESTAMP ile aynı biçimde UTC zaman"""
+    return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _update_status(message_ids, **fields):
+    _on_status(message_ids, **fields)
+    cluster.publish('status', message_ids=message_ids, fields=fields)
+
+
+# =====================================================
+# KÜME OLAYLARI
+# =====================================================
+
+def apply_cluster_event(event):
+    """
+    Başka bir worker'dan gelen olayı bu sürecin önbelleklerine uygular
+
+    Args:
+        event (dict): database.cluster.publish ile yayınlanmış olay
+    """
+    if cluster.is_local(event):
+        return
+
+    kind = event.get('kind')
+    if kind == 'membership':
+        _on_membership(event['op'], event['group_id'], event['user_id'])
+    elif kind == 'user':
+        _on_user_changed(event['user_id'], event.get('username'))
+    elif kind == 'presence':
+        _on_presence(event['user_id'], event['is_online'], event['last_seen'])
+    elif kind == 'message':
+        params = tuple(event['params'])
+        _message_saved(event['message_id'], params, _message_room(params), local=False)
+    elif kind == 'status':
+        _on_status(event['message_ids'], **event['fields'])
+
+
+def invalidate_caches():
+    """
+    Bu sürecin küme olaylarıyla güncel tutulan önbelleklerini sıfırlar
+
+    Broker bağlantısı koptuğunda kaçırılan olaylar tekrar gönderilmez;
+    yeniden bağlanınca her şey veritabanından yeniden okunur.
+    """
+    user_cache.clear()
+    group_directory_cache.clear()
+    if recent_messages is not None:
+        recent_messages.clear()
+    invalidate_partition_cache()
+    load_membership_index()
+    resource_versions.reset()
+    print("🔄 Önbellekler sıfırlandı (küme olayları kaçırılmış olabilir)")
     
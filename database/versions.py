@@ -0,0 +1,83 @@
+"""
+Kaynak Sürüm Sayaçları
+Listeler ve mesaj geçmişleri için süreç içi değişiklik sayaçları;
+API katmanı bu sayaçlardan ETag üretir
+"""
+
+import os
+import threading
+import time
+
+from config import Config
+
+
+# Sürüm anahtarları
+GROUPS = 'groups'                  # Grup listesi ve üye sayıları
+USERS = 'users'                    # Kullanıcı listesi ve çevrimiçi durumları
+MESSAGE_STATUS = 'message_status'  # Teslim / okundu güncellemeleri
+
+
+def room_key(message_type, target_id=None):
+    """
+    Mesaj odasının sürüm anahtarı
+
+    Args:
+        message_type (str): 'broadcast', 'group' veya 'private'
+        target_id (int, optional): Grup ID'si veya özel sohbet conversation_key'i
+    """
+    return ('room', message_type, target_id)
+
+
+def members_key(group_id):
+    """Grup üyeliğinin sürüm anahtarı"""
+    return ('members', group_id)
+
+
+class ResourceVersions:
+    """
+    Kaynak başına artan sürüm sayaçları
+
+    Özellikler:
+    - Her yazma ilgili anahtarı commit'ten sonra bir artırır
+    - epoch süreç başına rastgeledir; yeniden başlatma eski ETag'leri geçersiz kılar
+    - ttl > 0 ise sürümler ttl saniyede bir kendiliğinden ilerler; başka
+      süreçlerin (örn. TCP sunucusu) yazdıkları en geç bu süre sonra görünür
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self.epoch = os.urandom(4).hex()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *keys):
+        """Anahtarların sürümlerini artırır"""
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def reset(self):
+        """Yeni epoch: daha önce üretilmiş tüm ETag'ler geçersiz olur"""
+        with self._lock:
+            self.epoch = os.urandom(4).hex()
+
+    def get(self, key):
+        """Anahtarın güncel sürümünü döndürür (hiç değişmediyse 0)"""
+        return self._versions.get(key, 0)
+
+    def token(self, *keys):
+        """
+        Anahtarların birleşik sürüm dizgesini döndürür
+
+        Returns:
+            str: Herhangi bir anahtar değiştiğinde değişen dizge
+        """
+        parts = [self.epoch]
+        if self.ttl:
+            parts.append(str(int(time.time() // self.ttl)))
+        parts.extend(str(self.get(key)) for key in keys)
+        return '.'.join(parts)
+
+
+# Uygulama geneli sayaçlar
+resource_versions = ResourceVersions(ttl=Config.ETAG_VERSION_TTL)
@@ -3,5 +3,6 @@
 from .broadcast import BroadcastChat
 from .groups import GroupChat
 from .private import PrivateChat
+from .presence import PresenceRegistry, presence, user_room
 
-__all__ = ['BroadcastChat', 'GroupChat', 'PrivateChat']
+__all__ = ['BroadcastChat', 'GroupChat', 'PrivateChat', 'PresenceRegistry', 'presence', 'user_room']
@@ -4,41 +4,14 @@ from database.queries import (
 )
 from flask_socketio import emit, join_room, leave_room
 from datetime import datetime
-"""
 class GroupChat:
     @staticmethod
     def send_message(data, sender):
-        
         group_id = data['group_id']
-        
-        # Kullanıcı grupta mı kontrol et
+
+        # Kullanıcı grupta mı kontrol et (bellek içi üyelik indeksi)
         if not is_user_in_group(sender['id'], group_id):
             return {'success': False, 'error': 'Bu grubun üyesi değilsiniz'}
-        
-        message_id = save_message(
-            sender_id=sender['id'],
-           # sender_username=sender['username'],
-            message=data['message'],
-            message_type='group',
-            target_id=group_id
-        )
-        
-        emit('new_message', {
-            'id': message_id,
-            'sender': sender['username'],
-            'sender_id': sender['id'],
-            'message': data['message'],
-            'type': 'group',
-            'group_id': group_id,
-            'timestamp': datetime.now().isoformat()
-        }, room=f'group_{group_id}')
-        
-        return {'success': True, 'message_id': message_id}
-    """
-class GroupChat:
-    @staticmethod
-    def send_message(data, sender):
-        group_id = data['group_id']
 
         # 🔹 Burada sadece save_message'ın desteklediği parametreleri gönder
         message_id = save_message(
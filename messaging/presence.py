@@ -0,0 +1,231 @@
+# messaging/presence.py
+import threading
+import time
+
+
+def user_room(user_id):
+    """Kullanıcının tüm oturumlarının katıldığı Socket.IO odası"""
+    return f'user_{user_id}'
+
+
+class PresenceRegistry:
+    """
+    Socket oturumlarının bellek içi kaydı
+
+    Özellikler:
+    - sid -> user_id ve user_id -> {sid} eşlemeleri; bağlanma/kopma O(1)
+    - Bir kullanıcının birden fazla sekmesi / cihazı aynı anda bağlı olabilir
+    - Kullanıcı ilk oturumu açılınca çevrimiçi, son oturumu kapanınca
+      çevrimdışı sayılır
+    - Küme modunda (attach) diğer worker'ların oturumları olaylar ve
+      periyodik anlık görüntülerle izlenir; ilk/son oturum kararı
+      tüm worker'lara göre verilir
+    """
+
+    def __init__(self):
+        self._users = {}  # sid -> user_id
+        self._sids = {}   # user_id -> {sid}
+        self._lock = threading.Lock()
+
+        # Küme modu
+        self._publish = None
+        self._worker_id = None
+        self._interval = 0
+        self._remote = {}        # worker_id -> {'seen': zaman, 'sessions': {sid: user_id}}
+        self._remote_users = {}  # user_id -> diğer worker'lardaki oturum sayısı
+        self.on_remote_offline = None  # callable(user_id)
+
+    def connect(self, user_id, sid):
+        """
+        Oturumu kaydeder
+
+        Returns:
+            bool: Kullanıcının ilk oturumu mu? (çevrimiçi oldu)
+        """
+        user_id = int(user_id)
+        with self._lock:
+            previous = self._users.get(sid)
+            if previous == user_id:
+                return False
+            if previous is not None:
+                self._remove(sid, previous)
+            self._users[sid] = user_id
+            sids = self._sids.setdefault(user_id, set())
+            sids.add(sid)
+            first = len(sids) == 1 and not self._remote_users.get(user_id)
+
+        self._send({'op': 'connect', 'sid': sid, 'user_id': user_id})
+        return first
+
+    def disconnect(self, sid):
+        """
+        Oturumu siler
+
+        Returns:
+            tuple: (user_id, son oturum muydu?); sid kayıtlı değilse (None, False)
+        """
+        with self._lock:
+            user_id = self._users.pop(sid, None)
+            if user_id is None:
+                return None, False
+            last = self._remove(sid, user_id) and not self._remote_users.get(user_id)
+
+        self._send({'op': 'disconnect', 'sid': sid, 'user_id': user_id, 'last': last})
+        return user_id, last
+
+    def _remove(self, sid, user_id):
+        sids = self._sids.get(user_id)
+        if sids is None:
+            return False
+        sids.discard(sid)
+        if not sids:
+            del self._sids[user_id]
+            return True
+        return False
+
+    def user_for(self, sid):
+        """Oturumun kullanıcı ID'sini döndürür"""
+        return self._users.get(sid)
+
+    def sids(self, user_id):
+        """Kullanıcının bu worker'daki açık oturumlarını döndürür"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return ()
+        with self._lock:
+            return tuple(self._sids.get(user_id, ()))
+
+    def is_online(self, user_id):
+        """Kullanıcının herhangi bir worker'da açık oturumu var mı?"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            return user_id in self._sids or bool(self._remote_users.get(user_id))
+
+    def online_user_ids(self):
+        with self._lock:
+            return list(set(self._sids) | set(self._remote_users))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(set(self._sids) | set(self._remote_users)),
+                'sessions': len(self._users),
+                'remote_sessions': sum(self._remote_users.values()),
+                'workers': len(self._remote) + 1
+            }
+
+    # -------------------------------------------------
+    # Küme modu
+    # -------------------------------------------------
+
+    def attach(self, publish, worker_id, snapshot_interval=5.0):
+        """
+        Kaydı küme moduna alır
+
+        Args:
+            publish (callable): Olay dict'ini diğer worker'lara yayınlar
+            worker_id (str): Bu worker'ın kimliği
+            snapshot_interval (float): Anlık görüntü yayın aralığı (sn);
+                3 aralık boyunca sesi çıkmayan worker'ın oturumları silinir
+        """
+        self._publish = publish
+        self._worker_id = worker_id
+        self._interval = snapshot_interval
+        threading.Thread(target=self._snapshot_loop, name='presence-snapshot',
+                         daemon=True).start()
+        # Diğer worker'lar anlık görüntülerini hemen göndersin
+        self._send({'op': 'hello'})
+
+    def _send(self, event):
+        if self._publish is None:
+            return
+        try:
+            self._publish({**event, 'worker': self._worker_id})
+        except Exception as e:
+            print(f"⚠️ Çevrimiçi durum olayı gönderilemedi: {e}")
+
+    def _snapshot(self):
+        with self._lock:
+            sessions = dict(self._users)
+        self._send({'op': 'snapshot', 'sessions': sessions})
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self._interval)
+            self._snapshot()
+            self._expire_workers()
+
+    def apply(self, event):
+        """Başka bir worker'dan gelen olayı uygular"""
+        worker = event.get('worker')
+        if worker is None or worker == self._worker_id:
+            return
+
+        op = event.get('op')
+        if op == 'hello':
+            self._snapshot()
+            return
+
+        gone = []
+        with self._lock:
+            state = self._remote.setdefault(worker, {'seen': 0.0, 'sessions': {}})
+            state['seen'] = time.monotonic()
+            sessions = state['sessions']
+
+            if op == 'connect':
+                if event['sid'] not in sessions:
+                    sessions[event['sid']] = event['user_id']
+                    self._count(event['user_id'], 1)
+            elif op == 'disconnect':
+                user_id = sessions.pop(event['sid'], None)
+                if user_id is not None:
+                    self._count(user_id, -1)
+                    # Sahibi başka oturum olduğunu sanıp çevrimdışı yazmadıysa
+                    if not event.get('last') and self._gone(user_id):
+                        gone.append(user_id)
+            elif op == 'snapshot':
+                for user_id in sessions.values():
+                    self._count(user_id, -1)
+                state['sessions'] = {sid: int(uid) for sid, uid in event['sessions'].items()}
+                for user_id in state['sessions'].values():
+                    self._count(user_id, 1)
+
+        self._notify_offline(gone)
+
+    def _count(self, user_id, delta):
+        count = self._remote_users.get(user_id, 0) + delta
+        if count > 0:
+            self._remote_users[user_id] = count
+        else:
+            self._remote_users.pop(user_id, None)
+
+    def _gone(self, user_id):
+        return user_id not in self._sids and not self._remote_users.get(user_id)
+
+    def _expire_workers(self):
+        """Sesi kesilen (çökmüş) worker'ların oturumlarını siler"""
+        deadline = time.monotonic() - 3 * self._interval
+        gone = []
+        with self._lock:
+            for worker, state in list(self._remote.items()):
+                if state['seen'] < deadline:
+                    del self._remote[worker]
+                    for user_id in state['sessions'].values():
+                        self._count(user_id, -1)
+                        if self._gone(user_id):
+                            gone.append(user_id)
+        self._notify_offline(set(gone))
+
+    def _notify_offline(self, user_ids):
+        if self.on_remote_offline is None:
+            return
+        for user_id in user_ids:
+            self.on_remote_offline(user_id)
+
+
+# Uygulama geneli kayıt
+presence = PresenceRegistry()
@@ -1,12 +1,19 @@
 # messaging/private.py
 from database.queries import save_message, get_private_messages
+from flask import request
 from flask_socketio import emit
 from datetime import datetime
+from messaging.presence import user_room
 
 class PrivateChat:
     @staticmethod
-    def send_message(data, sender, online_users):
-        """Özel mesaj gönder"""
+    def send_message(data, sender):
+        """
+        Özel mesaj gönder
+
+        Mesaj alıcının ve gönderenin tüm açık oturumlarına (user_<id>
+        odaları üzerinden, küme modunda tüm worker'larda) iletilir
+        """
         target_id = data['target_id']
         """
         message_id = save_message(
@@ -33,12 +40,12 @@ class PrivateChat:
             'timestamp': datetime.now().isoformat()
         }
         
-        # Gönderene de göster
+        # Gönderene de göster (bu oturum ve diğer sekmeleri)
         emit('new_message', {**message_data, 'is_own': True})
+        emit('new_message', {**message_data, 'is_own': True},
+             room=user_room(sender['id']), skip_sid=request.sid)
         
-        # Alıcıya gönder (online ise)
-        target_socket = online_users.get(target_id)
-        if target_socket:
-            emit('new_message', {**message_data, 'is_own': False}, room=target_socket)
+        # Alıcının tüm oturumlarına gönder (online ise)
+        emit('new_message', {**message_data, 'is_own': False}, room=user_room(target_id))
         
         return {'success': True, 'message_id': message_id}
\ No newline at end of file
@@ -86,9 +86,12 @@ from flask import request
 from flask_socketio import join_room, leave_room, emit
 from extensions import socketio
 from messaging import BroadcastChat, GroupChat, PrivateChat
+from messaging.presence import presence, user_room
 from auth.decorators import get_current_user
+from database.queries import set_user_online
 
-online_users = {}  # user_id -> socket_id mapping
+# Başka bir worker'daki son oturum kapanışında çevrimdışı kararı verilemediyse
+presence.on_remote_offline = lambda user_id: set_user_online(user_id, False)
 
 
 @socketio.on('connect')
@@ -98,13 +101,10 @@ def handle_connect():
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    user_id = None
-    for uid, sid in list(online_users.items()):
-        if sid == request.sid:
-            user_id = uid
-            del online_users[uid]
-            print(f"Kullanıcı {uid} offline oldu.")
-            break
+    user_id, last_session = presence.disconnect(request.sid)
+    if last_session:
+        set_user_online(user_id, False)
+        print(f"Kullanıcı {user_id} offline oldu.")
 
 
 @socketio.on('send_broadcast')
@@ -133,7 +133,8 @@ def handle_group_message(data):
     if 'content' in data and 'message' not in data:
         data['message'] = data['content']
     
-    GroupChat.send_message(data, user)
+    # Üye olmayanın gönderimi reddedilir; sonuç istemciye ack olarak döner
+    return GroupChat.send_message(data, user)
 
 
 @socketio.on('join_group')
@@ -162,7 +163,7 @@ def handle_private_message(data):
     if 'content' in data and 'message' not in data:
         data['message'] = data['content']
     
-    PrivateChat.send_message(data, user, online_users)
+    PrivateChat.send_message(data, user)
 
 
 @socketio.on('join')
@@ -170,7 +171,10 @@ def handle_join(username):
     """Kullanıcı online olduğunda"""
     user = get_current_user()
     if user:
-        online_users[user['id']] = request.sid
+        # Kullanıcıya özel oda: mesajlar tüm oturumlarına (tüm worker'larda) gider
+        join_room(user_room(user['id']))
+        if presence.connect(user['id'], request.sid):
+            set_user_online(user['id'], True)
         print(f"✅ {username} online oldu (SID: {request.sid})")
 
 
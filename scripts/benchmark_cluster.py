@@ -0,0 +1,117 @@
+"""
+Küme ölçekleme benchmark'ı
+
+Her worker sayısı için yerel kümeyi (broker + N worker) başlatır, istemcileri
+worker'lara sırayla dağıtır ve broadcast mesajlarının uçtan uca verimini
+(gönderilen ve teslim edilen mesaj/sn) ölçer. İstemci tarafı için
+python-socketio[client] gerekir.
+
+Kullanım (proje kökünden):
+    python -m scripts.benchmark_cluster --workers 1 2 4 --clients 16 --messages 200
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import urllib.request
+from http.cookiejar import CookieJar
+from pathlib import Path
+
+import socketio
+
+from scripts.run_cluster import start_cluster, stop_cluster
+
+
+def _post(opener, url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}
+    )
+    with opener.open(request) as response:
+        return json.loads(response.read())
+
+
+def login_client(port, username, password='benchmark'):
+    """Kullanıcıyı kaydeder, giriş yapar ve oturum çerezini döndürür"""
+    jar = CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    base = f'http://127.0.0.1:{port}'
+    try:
+        _post(opener, f'{base}/auth/register', {'username': username, 'password': password})
+    except urllib.error.HTTPError:
+        pass  # Zaten kayıtlı
+    _post(opener, f'{base}/auth/login', {'username': username, 'password': password})
+    return '; '.join(f'{cookie.name}={cookie.value}' for cookie in jar)
+
+
+def run(workers, clients, messages, base_port, broker_port):
+    with tempfile.TemporaryDirectory() as tmp:
+        processes = start_cluster(workers, base_port, broker_port, extra_env={
+            'DB_FILE': str(Path(tmp) / 'benchmark.db'),
+            'MESSAGE_WRITE_BEHIND': '1'
+        })
+        sockets = []
+        try:
+            received = [0]
+            lock = threading.Lock()
+            done = threading.Event()
+            expected = clients * messages * clients
+
+            def on_message(data):
+                with lock:
+                    received[0] += 1
+                    if received[0] >= expected:
+                        done.set()
+
+            for index in range(clients):
+                port = base_port + index % workers
+                cookie = login_client(port, f'bench{index}')
+                client = socketio.Client()
+                client.on('receive_message', on_message)
+                client.connect(f'http://127.0.0.1:{port}', headers={'Cookie': cookie})
+                client.emit('join', f'bench{index}')
+                sockets.append(client)
+            time.sleep(1.0)  # join'ler ve presence olayları otursun
+
+            def sender(client):
+                for number in range(messages):
+                    client.emit('send_broadcast', {'message': f'mesaj {number}'})
+
+            start = time.perf_counter()
+            threads = [threading.Thread(target=sender, args=(client,)) for client in sockets]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            done.wait(timeout=120)
+            elapsed = time.perf_counter() - start
+
+            sent = clients * messages
+            return sent / elapsed, received[0] / elapsed, received[0] / expected
+        finally:
+            for client in sockets:
+                client.disconnect()
+            stop_cluster(processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Küme ölçekleme benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--base-port', type=int, default=5100)
+    parser.add_argument('--broker-port', type=int, default=6391)
+    args = parser.parse_args()
+
+    print(f"{'worker':>6} | {'gönderilen/sn':>13} | {'teslim/sn':>10} | {'teslim oranı':>12}")
+    for workers in args.workers:
+        sent_rate, delivered_rate, ratio = run(
+            workers, args.clients, args.messages, args.base_port, args.broker_port
+        )
+        print(f"{workers:>6} | {sent_rate:>13.0f} | {delivered_rate:>10.0f} | {ratio:>12.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+TCP mesaj kodlaması benchmark'ı
+
+Tipik TCP mesajlarını (ping/pong, login yanıtı, sohbet mesajı, 50
+mesajlık geçmiş) her kodlamayla kodlar/çözer ve:
+- mesaj başına bayt (çerçeve başlığı dahil, kablodaki boyut),
+- saniyede kodlama ve çözme sayısını
+ölçer. 'json' orjson kuruluysa onu kullanır; 'json-std' her zaman
+standart json modülüdür.
+
+Kullanım (proje kökünden):
+    python -m scripts.benchmark_codec --seconds 1
+"""
+
+import argparse
+import json
+import time
+
+from core import codec
+from core.protocol import HEADER_SIZE
+
+
+class StdJSONCodec:
+    """Karşılaştırma için standart json (önceki davranış)"""
+
+    name = 'json-std'
+
+    def encode(self, message):
+        return json.dumps(message).encode('utf-8')
+
+    def decode(self, payload):
+        return json.loads(payload)
+
+
+def sample_messages():
+    """Ölçülecek mesajlar"""
+    chat = {
+        'type': 'message', 'message_id': 184467, 'sender_id': 42, 'sender': 'ayse',
+        'receiver_id': 7, 'message': 'Merhaba, akşam toplantıya geliyor musun?',
+        'timestamp': '2024-05-14 18:32:05', 'is_own': False
+    }
+    history = {
+        'type': 'history', 'success': True,
+        'messages': [dict(chat, message_id=184467 - n, seen=n % 2 == 0) for n in range(50)]
+    }
+    return {
+        'ping': {'type': 'ping', 'id': 1234},
+        'login_response': {'type': 'login_response', 'success': True,
+                           'user': {'id': 42, 'username': 'ayse'}, 'encoding': 'binary'},
+        'message': chat,
+        'history (50)': history,
+    }
+
+
+def rate(func, arg, seconds):
+    """func(arg) saniyede kaç kez çalışıyor?"""
+    count, batch = 0, 100
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for _ in range(batch):
+            func(arg)
+        count += batch
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TCP kodlama benchmark')
+    parser.add_argument('--seconds', type=float, default=1.0,
+                        help='Her ölçüm için süre (sn)')
+    args = parser.parse_args()
+
+    codecs = [StdJSONCodec(), codec.CODECS['json'], codec.CODECS['binary']]
+    if codec.orjson is None:
+        print("ℹ️ orjson kurulu değil: 'json' standart json modülünü kullanıyor")
+
+    print(f"{'mesaj':>15} | {'kodlama':>8} | {'bayt':>6} | {'kodlama/sn':>11} | {'çözme/sn':>11}")
+    for label, message in sample_messages().items():
+        for current in codecs:
+            payload = current.encode(message)
+            assert current.decode(payload) == message
+            print(f"{label:>15} | {current.name:>8} | {len(payload) + HEADER_SIZE:>6} | "
+                  f"{rate(current.encode, message, args.seconds):>11,.0f} | "
+                  f"{rate(current.decode, payload, args.seconds):>11,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Write-behind mesaj yazıcı benchmark'ı
+
+Farklı batch boyutlarında (1, 16, 128) saniyedeki INSERT sayısını ölçer.
+
+Kullanım (proje kökünden):
+    python -m scripts.benchmark_message_writer --messages 5000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from database import db_manager
+from database.message_writer import MessageWriter
+from database.queries import _SAVE_MESSAGE_QUERY, _message_params
+
+
+def run(batch_size, message_count, sender_id):
+    writer = MessageWriter(batch_size=batch_size, flush_interval_ms=5).start()
+    start = time.perf_counter()
+
+    futures = [
+        writer.submit(
+            _SAVE_MESSAGE_QUERY,
+            _message_params(sender_id, f'benchmark mesajı {i}', 'broadcast',
+                            None, None, False)
+        )
+        for i in range(message_count)
+    ]
+    for future in futures:
+        future.result()
+
+    elapsed = time.perf_counter() - start
+    writer.stop()
+    return message_count / elapsed, writer.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mesaj yazıcı benchmark')
+    parser.add_argument('--messages', type=int, default=5000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 128])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.DB_FILE = Path(tmp) / 'benchmark.db'
+        db_manager.init_db()
+        sender_id = db_manager.execute_query(
+            'INSERT INTO users (username, password_hash) VALUES (?, ?)',
+            ('benchmark', 'x')
+        )
+
+        print(f"{'batch':>6} | {'insert/sn':>10} | {'batch sayısı':>12}")
+        for batch_size in args.batch_sizes:
+            rate, stats = run(batch_size, args.messages, sender_id)
+            print(f"{batch_size:>6} | {rate:>10.0f} | {stats['batches_written']:>12}")
+
+        db_manager.close_db()
+
+
+if __name__ == '__main__':
+    main()
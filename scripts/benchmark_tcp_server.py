@@ -0,0 +1,125 @@
+"""
+TCP sunucu benchmark'ı
+
+TCP sunucusunu her modda ('threaded', 'asyncio') ayrı bir süreçte
+başlatır, N boşta bağlantı açar ve:
+- bağlantıların kurulma süresini,
+- sunucu sürecinin bellek (RSS) ve thread sayısını,
+- boşta bağlantılar açıkken ping/pong gidiş-dönüş gecikmesini
+ölçer. Bellek ve thread sayısı /proc'tan okunur (Linux).
+
+Kullanım (proje kökünden):
+    python -m scripts.benchmark_tcp_server --connections 10000 --pings 2000
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core.protocol import encode_frame, recv_frames
+from scripts.run_cluster import wait_for_port
+
+
+def process_status(pid):
+    """Sürecin RSS (MB) ve thread sayısını döndürür"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+    except OSError:
+        return None, None
+    rss_mb = int(fields['VmRSS'].split()[0]) / 1024.0
+    return rss_mb, int(fields['Threads'])
+
+
+def open_idle_connections(port, count):
+    """count adet bağlantı açar (hepsi tek thread'de, boşta bekler)"""
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port), timeout=10)
+        sockets.append(sock)
+    return sockets
+
+
+def measure_pings(port, pings):
+    """Tek bağlantı üzerinden sıralı ping/pong gecikmelerini (ms) ölçer"""
+    latencies = []
+    with socket.create_connection(('127.0.0.1', port), timeout=10) as sock:
+        frames = recv_frames(sock)
+        for number in range(pings):
+            start = time.perf_counter()
+            sock.sendall(encode_frame(json.dumps({'type': 'ping', 'id': number}).encode('utf-8')))
+            reply = json.loads(next(frames))
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            assert reply['type'] == 'pong'
+    latencies.sort()
+    return latencies
+
+
+def run(mode, connections, pings, port):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DB_FILE=str(Path(tmp) / 'benchmark.db'))
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'core.tcp_server', '--mode', mode,
+             '--port', str(port), '--host', '127.0.0.1'],
+            env=env, stdout=subprocess.DEVNULL
+        )
+        sockets = []
+        try:
+            if not wait_for_port('127.0.0.1', port):
+                raise RuntimeError(f'Sunucu başlatılamadı ({mode})')
+            base_rss, _ = process_status(server.pid)
+
+            start = time.perf_counter()
+            try:
+                sockets = open_idle_connections(port, connections)
+            except OSError as e:
+                print(f"⚠️ {mode}: {len(sockets)} bağlantıdan sonra hata: {e}")
+            connect_s = time.perf_counter() - start
+            time.sleep(1.0)  # Sunucu tüm bağlantıları kabul etsin
+
+            rss, threads = process_status(server.pid)
+            latencies = measure_pings(port, pings)
+            return {
+                'mode': mode,
+                'connections': len(sockets),
+                'connect_s': connect_s,
+                'rss_mb': rss,
+                'rss_per_conn_kb': ((rss - base_rss) * 1024.0 / len(sockets)
+                                    if rss and sockets else None),
+                'threads': threads,
+                'p50_ms': latencies[len(latencies) // 2],
+                'p99_ms': latencies[int(len(latencies) * 0.99) - 1]
+            }
+        finally:
+            for sock in sockets:
+                sock.close()
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TCP sunucu benchmark')
+    parser.add_argument('--modes', nargs='+', default=['threaded', 'asyncio'])
+    parser.add_argument('--connections', type=int, default=10000)
+    parser.add_argument('--pings', type=int, default=2000)
+    parser.add_argument('--port', type=int, default=9950)
+    args = parser.parse_args()
+
+    print(f"{'mod':>8} | {'bağlantı':>8} | {'kurulum sn':>10} | {'RSS MB':>7} | "
+          f"{'KB/bağl.':>8} | {'thread':>6} | {'ping p50 ms':>11} | {'ping p99 ms':>11}")
+    for mode in args.modes:
+        r = run(mode, args.connections, args.pings, args.port)
+        per_conn = f"{r['rss_per_conn_kb']:.1f}" if r['rss_per_conn_kb'] is not None else 'n/a'
+        rss = f"{r['rss_mb']:.1f}" if r['rss_mb'] is not None else 'n/a'
+        print(f"{r['mode']:>8} | {r['connections']:>8} | {r['connect_s']:>10.2f} | {rss:>7} | "
+              f"{per_conn:>8} | {str(r['threads']):>6} | {r['p50_ms']:>11.3f} | {r['p99_ms']:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
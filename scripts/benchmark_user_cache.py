@@ -0,0 +1,62 @@
+"""
+Kullanıcı önbelleği benchmark'ı
+
+Profil sorgusu (get_user_by_id) verimini önbellek açık ve kapalıyken ölçer.
+
+Kullanım (proje kökünden):
+    python -m scripts.benchmark_user_cache --users 1000 --lookups 50000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from config import Config
+from database import db_manager
+from database.cache import user_cache
+from database.queries import get_user_by_id
+
+
+def run(user_ids, lookups, enabled):
+    Config.USER_CACHE_ENABLED = enabled
+    user_cache.clear()
+    rng = random.Random(42)
+    targets = [rng.choice(user_ids) for _ in range(lookups)]
+
+    start = time.perf_counter()
+    for user_id in targets:
+        get_user_by_id(user_id)
+    elapsed = time.perf_counter() - start
+    return lookups / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kullanıcı önbelleği benchmark')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager.DB_FILE = Path(tmp) / 'benchmark.db'
+        db_manager.init_db()
+        with db_manager.get_pool().writer() as conn:
+            conn.executemany(
+                'INSERT INTO users (username, password_hash) VALUES (?, ?)',
+                [(f'user{i}', 'x') for i in range(args.users)]
+            )
+            conn.commit()
+        user_ids = list(range(1, args.users + 1))
+
+        print(f"{'önbellek':>9} | {'sorgu/sn':>10}")
+        for enabled in (False, True):
+            rate = run(user_ids, args.lookups, enabled)
+            print(f"{'açık' if enabled else 'kapalı':>9} | {rate:>10.0f}")
+        print(f"İstatistik: {user_cache.stats()}")
+
+        db_manager.close_db()
+
+
+if __name__ == '__main__':
+    main()
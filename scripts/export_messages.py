@@ -0,0 +1,62 @@
+"""
+Mesaj geçmişi dışa aktarma aracı
+
+Bir kullanıcının tüm mesaj geçmişini (arşiv partition'ları dahil) NDJSON
+olarak dosyaya veya stdout'a yazar. Bellek kullanımı geçmişin
+uzunluğundan bağımsızdır. Yarıda kalan aktarma, bildirilen son ID ile
+--after-id verilip aynı dosyaya --append ile eklenerek sürdürülebilir.
+
+Kullanım (proje kökünden):
+    python -m scripts.export_messages --user ahmet --output ahmet.ndjson
+    python -m scripts.export_messages --user ahmet --gzip --output ahmet.ndjson.gz
+    python -m scripts.export_messages --user ahmet --gzip --append --after-id 1200 --output ahmet.ndjson.gz
+"""
+
+import argparse
+import sys
+
+from database import get_user_by_username
+from database.export import export_user_messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mesaj geçmişi dışa aktarma (NDJSON)')
+    parser.add_argument('--user', required=True, help='Kullanıcı adı')
+    parser.add_argument('--output', help='Çıktı dosyası (varsayılan: stdout)')
+    parser.add_argument('--after-id', type=int, help='Bu ID\'den sonrasını aktar')
+    parser.add_argument('--gzip', action='store_true', help='Çıktıyı gzip ile sıkıştır')
+    parser.add_argument('--append', action='store_true', help='Dosyanın sonuna ekle')
+    args = parser.parse_args()
+
+    user = get_user_by_username(args.user)
+    if not user:
+        print(f"❌ Kullanıcı bulunamadı: {args.user}", file=sys.stderr)
+        return 1
+
+    # Sadece dosyaya tamamen yazılmış parçalar devam noktası sayılır
+    state = {'count': 0, 'last_id': args.after_id}
+    pending = {}
+
+    def progress(count, last_id):
+        pending.update(count=count, last_id=last_id)
+
+    output = (open(args.output, 'ab' if args.append else 'wb')
+              if args.output else sys.stdout.buffer)
+    try:
+        for chunk in export_user_messages(user['id'], args.after_id, args.gzip, progress):
+            output.write(chunk)
+            state.update(pending)
+    except KeyboardInterrupt:
+        print(f"\n🛑 Durduruldu: {state['count']} mesaj yazıldı. Devam etmek için: "
+              f"--append --after-id {state['last_id']}", file=sys.stderr)
+        return 130
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    print(f"✅ {state['count']} mesaj aktarıldı (son ID: {state['last_id']})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Yerel küme başlatıcı
+
+Broker'ı ve N web worker'ını aynı makinede başlatır. Worker'lar
+base_port, base_port + 1, ... portlarında dinler ve emit'leri, çevrimiçi
+durumu ve önbellek olaylarını broker üzerinden paylaşır. Önlerine yapışkan
+oturumlu (örn. nginx ip_hash) bir ters vekil konmalıdır; long-polling
+istekleri aynı worker'a gitmelidir.
+
+Kullanım (proje kökünden):
+    python -m scripts.run_cluster --workers 4 --base-port 5000
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from config import Config
+
+
+def wait_for_port(host, port, timeout=15.0):
+    """Port dinlemeye başlayana kadar bekler"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def start_cluster(workers, base_port=5000, broker_port=None, extra_env=None):
+    """
+    Broker'ı ve worker'ları başlatır
+
+    Returns:
+        list: Başlatılan süreçler (ilki broker)
+    """
+    broker_port = broker_port or Config.BROKER_PORT
+    env = dict(os.environ, **(extra_env or {}))
+    env['BROKER_PORT'] = str(broker_port)
+    env['SOCKETIO_MESSAGE_QUEUE'] = f'broker://127.0.0.1:{broker_port}'
+    # Aynı makinedeki diğer süreçler broker'a pickle yük gönderemesin
+    env.setdefault('BROKER_SECRET', os.urandom(16).hex())
+
+    # Şema / migration'lar worker'lar yarışmadan bir kez çalışsın
+    subprocess.run([sys.executable, '-c', 'from database import init_db; init_db()'],
+                   env=env, check=True)
+
+    processes = [subprocess.Popen([sys.executable, '-m', 'core.broker'], env=env)]
+    if not wait_for_port('127.0.0.1', broker_port):
+        stop_cluster(processes)
+        raise RuntimeError('Broker başlatılamadı')
+
+    for index in range(workers):
+        worker_env = dict(env, WEB_PORT=str(base_port + index))
+        processes.append(subprocess.Popen([sys.executable, 'app.py'], env=worker_env))
+
+    for index in range(workers):
+        if not wait_for_port('127.0.0.1', base_port + index):
+            stop_cluster(processes)
+            raise RuntimeError(f'Worker başlatılamadı: {base_port + index}')
+
+    return processes
+
+
+def stop_cluster(processes):
+    """Tüm süreçleri durdurur (önce worker'lar, en son broker)"""
+    for process in reversed(processes):
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Yerel küme başlatıcı')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--base-port', type=int, default=Config.WEB_PORT)
+    parser.add_argument('--broker-port', type=int, default=Config.BROKER_PORT)
+    args = parser.parse_args()
+
+    processes = start_cluster(args.workers, args.base_port, args.broker_port)
+    ports = ', '.join(str(args.base_port + i) for i in range(args.workers))
+    print(f"✅ Küme hazır: {args.workers} worker ({ports}), broker {args.broker_port}")
+
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+        print("❌ Bir süreç beklenmedik şekilde kapandı")
+    except KeyboardInterrupt:
+        print("\n🛑 Küme durduruluyor...")
+    finally:
+        stop_cluster(processes)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@ echo ========================================
 echo.
 
 echo 1. TCP Sunucusu baslatiliyor...
-start "TCP Sunucu" cmd /k "cd .. && python core/tcp_server.py"
+start "TCP Sunucu" cmd /k "cd .. && python -m core.tcp_server"
 echo.
 echo 2 saniye bekleniyor...
 timeout /t 2 /nobreak > nul
@@ -15,6 +15,6 @@ echo.
 cd ..
 
 :: TCP sunucuyu çalıştır
-python core/tcp_server.py
+python -m core.tcp_server
 
 pause
@@ -0,0 +1,172 @@
+# test_api.py
+"""
+REST API testleri (api/)
+
+Mesaj geçmişi uç noktalarının cursor sayfalamasını (son sayfada
+next_cursor null, after_id ile yeni mesaj sorgulama) ve limit
+doğrulamasını, arama sonuçlarının offset ile sayfalanmasını, ETag /
+If-None-Match ile 304 yanıtlarını ve akıtılan büyük listelerin gövdesinin
+jsonify yanıtıyla bayt bayt aynı olduğunu sınar. Flask kurulu değilse
+atlanır.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_api.py
+"""
+
+import pytest
+
+flask = pytest.importorskip('flask')
+
+from config import Config
+from api import groups_api, messages, messages_api, serialization, stats_api, users, users_api
+from api.serialization import FastJSONProvider
+from database import queries
+from database.queries import register_user, save_message
+
+
+@pytest.fixture
+def client(db):
+    """alice olarak giriş yapmış test istemcisi"""
+    app = flask.Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.json = FastJSONProvider(app)
+    app.register_blueprint(users_api, url_prefix='/api/users')
+    app.register_blueprint(groups_api, url_prefix='/api/groups')
+    app.register_blueprint(messages_api, url_prefix='/api/messages')
+    app.register_blueprint(stats_api, url_prefix='/api/stats')
+
+    _, user_id = register_user('alice', 'secret123')
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['username'] = 'alice'
+    client.user_id = user_id
+    return client
+
+
+def _broadcasts(user_id, count):
+    return [save_message(user_id, f'mesaj {n}', 'broadcast') for n in range(count)]
+
+
+@pytest.mark.parametrize('count', [4, 5])
+def test_cursor_pages_end_with_null_cursor(client, count):
+    ids = _broadcasts(client.user_id, count)
+
+    seen, url = [], '/api/messages/broadcast?limit=2'
+    while True:
+        body = client.get(url).get_json()
+        seen = [m['id'] for m in body['messages']] + seen
+        if body['next_cursor'] is None:
+            break
+        url = f"/api/messages/broadcast?limit=2&before_id={body['next_cursor']}"
+    assert seen == ids
+
+
+def test_after_id_polls_new_messages(client):
+    ids = _broadcasts(client.user_id, 3)
+    body = client.get(f'/api/messages/broadcast?after_id={ids[-1]}').get_json()
+    assert body['messages'] == []
+    assert body['next_cursor'] == ids[-1]
+
+    new = _broadcasts(client.user_id, 2)
+    body = client.get(f"/api/messages/broadcast?after_id={body['next_cursor']}").get_json()
+    assert [m['id'] for m in body['messages']] == new
+    assert body['next_cursor'] == new[-1]
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_is_rejected(client, limit):
+    response = client.get(f'/api/messages/broadcast?limit={limit}')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_limit_is_clamped_to_max_page(client, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_PAGE', 2)
+    _broadcasts(client.user_id, 3)
+    body = client.get('/api/messages/broadcast?limit=100').get_json()
+    assert body['count'] == 2
+
+
+@pytest.mark.parametrize('limit', [0, -5])
+def test_search_rejects_non_positive_limit(client, limit):
+    response = client.get(f'/api/messages/search?q=mesaj&limit={limit}')
+    assert response.status_code == 400
+
+
+def test_search_pages_end_with_null_offset(client):
+    _broadcasts(client.user_id, 3)
+
+    seen, offset = 0, 0
+    while offset is not None:
+        body = client.get(f'/api/messages/search?q=mesaj&limit=2&offset={offset}').get_json()
+        seen += body['count']
+        offset = body['next_offset']
+    assert seen == 3
+
+
+def test_matching_etag_returns_304(client):
+    _broadcasts(client.user_id, 2)
+    first = client.get('/api/messages/broadcast')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    cached = client.get('/api/messages/broadcast', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['ETag'] == etag
+    assert cached.data == b''
+
+
+def test_save_message_changes_etag(client):
+    _broadcasts(client.user_id, 1)
+    etag = client.get('/api/messages/broadcast').headers['ETag']
+
+    _broadcasts(client.user_id, 1)
+    response = client.get('/api/messages/broadcast', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['count'] == 2
+
+
+def _plain_and_streamed(client, monkeypatch, module, url):
+    """Aynı isteğin jsonify ve akış yanıtlarının gövdeleri"""
+    streams = []
+    stream_list = module.stream_list
+
+    def counting_stream_list(*args, **kwargs):
+        streams.append(args[0])
+        return stream_list(*args, **kwargs)
+
+    monkeypatch.setattr(module, 'stream_list', counting_stream_list)
+    monkeypatch.setattr(Config, 'STREAM_MIN_ROWS', 10 ** 6)
+    plain = client.get(url)
+
+    # Her satır akıtılsın; küçük batch ve parçalarla
+    monkeypatch.setattr(Config, 'STREAM_MIN_ROWS', 1)
+    monkeypatch.setattr(Config, 'STREAM_BATCH_SIZE', 2)
+    monkeypatch.setattr(serialization, 'STREAM_CHUNK_SIZE', 64)
+    streamed = client.get(url)
+
+    assert (plain.status_code, streamed.status_code) == (200, 200)
+    assert len(streams) == 1
+    return plain.data, streamed.data
+
+
+@pytest.mark.parametrize('query', [
+    'limit=3', 'limit=3&before_id={4}', 'limit=50', 'after_id={1}', 'limit=2&after_id={1}',
+])
+def test_streamed_history_matches_json(client, monkeypatch, query):
+    ids = _broadcasts(client.user_id, 7)
+    # Tampon satırlarının created_at'i yazılandan bir saniye sapabilir
+    monkeypatch.setattr(queries, 'recent_messages', None)
+    url = '/api/messages/broadcast?' + query.format(*ids)
+    plain, streamed = _plain_and_streamed(client, monkeypatch, messages, url)
+    assert streamed == plain
+
+
+def test_streamed_users_match_json(client, monkeypatch):
+    for name in ('bob', 'carol', 'dave'):
+        register_user(name, 'secret123')
+    plain, streamed = _plain_and_streamed(client, monkeypatch, users, '/api/users/all')
+    assert streamed == plain
+    assert 'password_hash' not in flask.json.loads(streamed)['users'][0]
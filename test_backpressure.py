@@ -0,0 +1,164 @@
+# test_backpressure.py
+"""
+Giden kuyruk ve yavaş tüketici testleri (core/connection.py)
+
+OutboundQueue'nun high / low watermark geçişlerini ve limitini, kısmi
+gönderimlerde çerçevenin kalanını koruduğunu, yavaş tüketici
+politikalarının ('disconnect' / 'drop') doğru uygulandığını ve gerçek
+bir sokette okumayan istemcinin kapatılırken okuyan istemcinin tüm
+çerçeveleri sırasıyla aldığını doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_backpressure.py
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from config import Config
+from core.connection import Connection, OutboundQueue, ThreadedConnection
+from core.protocol import encode_frame, recv_frames
+
+
+def test_watermarks_toggle_congestion():
+    queue = OutboundQueue(high=100, low=40, limit=200)
+    assert queue.push(b'x' * 60)
+    assert not queue.congested
+    assert queue.push(b'y' * 60)
+    assert queue.congested
+
+    assert not queue.consume(60)   # 60 bayt kaldı: low'un üstünde
+    assert queue.congested
+    assert queue.consume(30)       # 30 bayt: tıkanıklık bitti
+    assert not queue.congested
+    assert not queue.consume(30)   # Zaten tıkalı değil
+
+    stats = queue.stats()
+    assert (stats['peak_bytes'], stats['sent_bytes'], stats['queued_bytes']) == (120, 120, 0)
+
+
+def test_limit_rejects_frames():
+    queue = OutboundQueue(high=100, low=10, limit=150)
+    assert queue.push(b'a' * 100)
+    assert not queue.push(b'b' * 51)
+    assert queue.push(b'c' * 50)
+    assert queue.nbytes == 150
+
+
+def test_partial_send_keeps_the_rest_of_the_frame():
+    queue = OutboundQueue(high=100, low=10, limit=100)
+    queue.push(b'abcdef')
+    queue.push(b'ghi')
+    queue.consume(4)
+    assert [bytes(buffer) for buffer in queue.buffers()] == [b'ef', b'ghi']
+    queue.consume(3)
+    assert [bytes(buffer) for buffer in queue.buffers()] == [b'hi']
+
+
+class QueueingConnection(Connection):
+    """Çerçeveleri sadece kuyruğa alan (hiç göndermeyen) bağlantı"""
+
+    def send_bytes(self, data):
+        self._admit(data)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def small_queues(monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SEND_HIGH_WATERMARK', 100)
+    monkeypatch.setattr(Config, 'TCP_SEND_LOW_WATERMARK', 40)
+    monkeypatch.setattr(Config, 'TCP_SEND_QUEUE_LIMIT', 200)
+
+
+def test_disconnect_policy_evicts_over_limit(small_queues, monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_POLICY', 'disconnect')
+    connection = QueueingConnection(('127.0.0.1', 1))
+    for _ in range(4):
+        connection.send_bytes(b'x' * 50)
+    assert not connection.closed
+
+    connection.send_bytes(b'x' * 50)
+    assert connection.closed
+    assert '200' in connection.evicted
+
+
+def test_disconnect_policy_evicts_long_congestion(small_queues, monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_POLICY', 'disconnect')
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_TIMEOUT', 5)
+    connection = QueueingConnection(('127.0.0.1', 1))
+    connection.send_bytes(b'x' * 150)
+    assert connection.outbound.congested
+
+    congested_since = connection.outbound.congested_since
+    monkeypatch.setattr('core.connection.time.monotonic', lambda: congested_since + 6)
+    connection.send_bytes(b'x')
+    assert connection.closed
+    assert connection.evicted
+
+
+def test_drop_policy_keeps_connection(small_queues, monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_POLICY', 'drop')
+    connection = QueueingConnection(('127.0.0.1', 1))
+    for _ in range(6):
+        connection.send_bytes(b'x' * 50)
+
+    assert not connection.closed
+    assert connection.outbound.dropped == 2
+    assert connection.outbound.nbytes == 200
+
+
+def _socketpair():
+    server, client = socket.socketpair()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    return server, client
+
+
+def test_threaded_connection_evicts_stalled_reader(monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SEND_HIGH_WATERMARK', 64 * 1024)
+    monkeypatch.setattr(Config, 'TCP_SEND_LOW_WATERMARK', 16 * 1024)
+    monkeypatch.setattr(Config, 'TCP_SEND_QUEUE_LIMIT', 256 * 1024)
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_POLICY', 'disconnect')
+    server, client = _socketpair()
+    connection = ThreadedConnection(server, ('127.0.0.1', 1))
+    try:
+        frame = encode_frame(b'x' * 16 * 1024)
+        deadline = time.monotonic() + 5
+        while not connection.closed and time.monotonic() < deadline:
+            connection.send_bytes(frame)
+        assert connection.closed
+        assert connection.evicted
+    finally:
+        connection.close()
+        client.close()
+
+
+def test_threaded_connection_delivers_in_order(monkeypatch):
+    monkeypatch.setattr(Config, 'TCP_SLOW_CONSUMER_POLICY', 'disconnect')
+    server, client = _socketpair()
+    connection = ThreadedConnection(server, ('127.0.0.1', 1))
+    payloads = [str(n).encode() * (n % 50 + 1) for n in range(500)]
+    received = []
+
+    def read():
+        for payload in recv_frames(client):
+            received.append(payload)
+            if len(received) == len(payloads):
+                return
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for payload in payloads:
+            connection.send_bytes(encode_frame(payload))
+        reader.join(timeout=10)
+        assert received == payloads
+        assert not connection.evicted
+    finally:
+        connection.close()
+        client.close()
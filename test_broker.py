@@ -0,0 +1,177 @@
+# test_broker.py
+"""
+Yerel pub/sub broker testleri (core/broker.py)
+
+Yayınların abonelere iletildiğini, okumayan (yavaş) bir abonenin giden
+kuyruğu dolunca diğerlerini bekletmeden düşürüldüğünü, gizli anahtar
+ayarlıyken doğrulanmamış bağlantıların reddedildiğini ve abone
+yeniden bağlanınca on_reconnect'in çağrıldığını doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_broker.py
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from config import Config
+from core.broker import (
+    OP_MESSAGE, OP_SUBSCRIBE, Broker, BrokerClient, encode_frame, read_frames
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def broker_factory():
+    brokers = []
+
+    def start(**kwargs):
+        broker = Broker('127.0.0.1', _free_port(), **kwargs)
+        broker.start_in_background()
+        brokers.append(broker)
+        return broker
+
+    yield start
+    for broker in brokers:
+        broker.stop()
+
+
+def _raw_subscriber(broker, channel, rcvbuf=None):
+    sock = socket.socket()
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    subscribers = broker.stats()['channels'].get(channel, 0)
+    sock.connect((broker.host, broker.port))
+    sock.sendall(encode_frame(OP_SUBSCRIBE, channel))
+    assert _wait(lambda: broker.stats()['channels'].get(channel, 0) > subscribers)
+    return sock
+
+
+def test_publish_reaches_subscribers(broker_factory):
+    broker = broker_factory(secret='')
+    client = BrokerClient(broker.host, broker.port, secret='')
+    received = []
+
+    def listen():
+        for channel, data in client.subscribe('olaylar'):
+            received.append((channel, data))
+            if len(received) == 3:
+                return
+
+    thread = threading.Thread(target=listen, daemon=True)
+    thread.start()
+    assert _wait(lambda: broker.stats()['channels'].get('olaylar'))
+
+    for number in range(3):
+        client.publish('olaylar', b'mesaj %d' % number)
+    thread.join(5)
+    client.close()
+    assert received == [('olaylar', b'mesaj %d' % n) for n in range(3)]
+
+
+def test_slow_subscriber_is_dropped(broker_factory, monkeypatch):
+    monkeypatch.setattr(Config, 'BROKER_MAX_FRAME_SIZE', 64 * 1024)
+    broker = broker_factory(secret='', send_queue_limit=1024 * 1024)
+    slow = _raw_subscriber(broker, 'kanal', rcvbuf=4096)  # hiç okumaz
+    fast = _raw_subscriber(broker, 'kanal')
+
+    count, payload = 4000, b'x' * 4096
+    received = []
+
+    def read_fast():
+        for op, _, data in read_frames(fast):
+            assert op == OP_MESSAGE
+            received.append(data)
+            if len(received) == count:
+                return
+
+    reader = threading.Thread(target=read_fast, daemon=True)
+    reader.start()
+    start = time.monotonic()
+    for number in range(count):
+        broker.publish('kanal', payload)
+        if number % 50 == 0:
+            time.sleep(0.001)  # hızlı abonenin yazıcı thread'i yetişsin
+    # Yayın, okumayan abone yüzünden bloklanmaz
+    assert time.monotonic() - start < 5
+
+    reader.join(10)
+    assert len(received) == count
+    assert broker.stats()['dropped'] == 1
+    assert broker.stats()['channels'] == {'kanal': 1}
+    slow.close()
+    fast.close()
+
+
+def test_unauthenticated_clients_are_rejected(broker_factory):
+    broker = broker_factory(secret='gizli')
+
+    intruder = BrokerClient(broker.host, broker.port, secret='yanlis')
+    sock = intruder._connect()
+    sock.sendall(encode_frame(OP_SUBSCRIBE, 'kanal'))
+    sock.settimeout(5)
+    assert sock.recv(1) == b''  # broker bağlantıyı kapattı
+    sock.close()
+    assert broker.stats()['rejected'] == 1
+    assert broker.stats()['channels'] == {}
+
+    client = BrokerClient(broker.host, broker.port, secret='gizli')
+    listener = client.subscribe('kanal')
+    thread = threading.Thread(target=lambda: next(listener), daemon=True)
+    thread.start()
+    assert _wait(lambda: broker.stats()['channels'].get('kanal'))
+    client.publish('kanal', b'merhaba')
+    thread.join(5)
+    client.close()
+
+
+def test_non_loopback_requires_secret():
+    with pytest.raises(ValueError):
+        Broker('0.0.0.0', _free_port(), secret='').start()
+
+
+def test_on_reconnect_called_after_resubscribe(broker_factory):
+    broker = broker_factory(secret='')
+    client = BrokerClient(broker.host, broker.port, reconnect_delay=0.05, secret='')
+    reconnects = []
+    received = []
+
+    def listen():
+        for _, data in client.subscribe('kanal', on_reconnect=lambda: reconnects.append(1)):
+            received.append(data)
+            if len(received) == 2:
+                return
+
+    thread = threading.Thread(target=listen, daemon=True)
+    thread.start()
+    assert _wait(lambda: broker.stats()['channels'].get('kanal'))
+    client.publish('kanal', b'once')
+    assert _wait(lambda: received == [b'once'])
+    assert reconnects == []
+
+    # Broker aboneyi düşürür (ör. yavaş abone); istemci yeniden bağlanır
+    [subscriber] = broker._channels['kanal']
+    broker._drop(subscriber)
+    assert _wait(lambda: reconnects == [1])
+    assert _wait(lambda: broker.stats()['channels'].get('kanal'))
+    client.publish('kanal', b'sonra')
+    thread.join(5)
+    client.close()
+    assert received == [b'once', b'sonra']
@@ -0,0 +1,118 @@
+# test_db_manager.py
+"""
+Bağlantı havuzu testleri (database/db_manager.py)
+
+Okuyucu bağlantılarının ve ATTACH edilen partition'ların salt-okunur
+URI ile, yolunda URI'de özel anlamı olan karakterler bulunsa da doğru
+dosyayı açtığını ve havuz tükendiğinde anlamlı bir hata verildiğini
+doğrular. execute_read'in yazma yapamadığı, açık transaction
+bırakmadığı ve lazy iterator'ın okuyucuyu tükenene kadar tuttuğu da
+test edilir.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_db_manager.py
+"""
+
+import sqlite3
+
+import pytest
+
+from config import Config
+from database import db_manager
+from database.db_manager import (
+    ConnectionPool, ReaderPoolBusy, ensure_attached, execute_query, execute_read
+)
+
+
+@pytest.mark.parametrize('dirname', ['düz', 'soru?işareti', 'diyez#', 'yüzde%20', 'boşluk var'])
+def test_readers_open_paths_with_uri_characters(tmp_path, dirname):
+    directory = tmp_path / dirname
+    directory.mkdir()
+    pool = ConnectionPool(directory / 'test.db', reader_count=1)
+    try:
+        with pool.writer() as conn:
+            conn.execute('CREATE TABLE t (x INTEGER)')
+            conn.execute('INSERT INTO t VALUES (42)')
+            conn.commit()
+
+        partition = directory / 'part#1.db'
+        with sqlite3.connect(partition) as conn:
+            conn.execute('CREATE TABLE p (y INTEGER)')
+            conn.execute('INSERT INTO p VALUES (7)')
+        conn.close()
+
+        with pool.reader() as conn:
+            assert conn.execute('SELECT x FROM t').fetchone()[0] == 42
+            ensure_attached(conn, 'p_1', partition)
+            assert conn.execute('SELECT y FROM p_1.p').fetchone()[0] == 7
+            # Salt-okunur
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute('INSERT INTO p_1.p VALUES (8)')
+    finally:
+        pool.close()
+
+
+def test_exhausted_reader_pool_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_BUSY_TIMEOUT_MS', 50)
+    pool = ConnectionPool(tmp_path / 'test.db', reader_count=1)
+    try:
+        with pool.reader():
+            with pytest.raises(ReaderPoolBusy, match='havuzu dolu'):
+                with pool.reader():
+                    pass
+        # Bağlantı geri verilince havuz tekrar kullanılabilir
+        with pool.reader() as conn:
+            assert conn.execute('SELECT 1').fetchone()[0] == 1
+    finally:
+        pool.close()
+
+
+def test_execute_read_never_writes(db):
+    execute_query("INSERT INTO users (username, password_hash) VALUES ('alice', 'x')")
+
+    row = execute_read('SELECT username FROM users WHERE username = ?', ('alice',), fetch=True)
+    assert row == {'username': 'alice'}
+    assert execute_read('SELECT id FROM users WHERE username = ?', ('yok',), fetch=True) is None
+    assert execute_query('SELECT username FROM users', fetchall=True) == [{'username': 'alice'}]
+
+    # Okuyucular query_only: yazma reddedilir, transaction açık kalmaz
+    with pytest.raises(sqlite3.OperationalError):
+        execute_read("UPDATE users SET username = 'bob'")
+    with db_manager.get_pool().reader() as conn:
+        assert not conn.in_transaction
+
+
+def test_lazy_rows_hold_the_reader(db, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_READER_COUNT', 1)
+    monkeypatch.setattr(Config, 'DB_BUSY_TIMEOUT_MS', 50)
+    db_manager.close_db()
+    for n in range(3):
+        execute_query('INSERT INTO users (username, password_hash) VALUES (?, ?)',
+                      (f'user{n}', 'x'))
+
+    rows = execute_read('SELECT username FROM users ORDER BY id', lazy=True)
+    assert next(rows) == {'username': 'user0'}
+    with pytest.raises(ReaderPoolBusy):
+        execute_read('SELECT 1')
+
+    assert [row['username'] for row in rows] == ['user1', 'user2']
+    assert execute_read('SELECT COUNT(*) AS n FROM users', fetch=True) == {'n': 3}
+
+
+def test_connections_use_statement_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_CACHED_STATEMENTS', 17)
+    sizes = []
+    connect = sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        sizes.append(kwargs.get('cached_statements'))
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, 'connect', recording_connect)
+    pool = ConnectionPool(tmp_path / 'test.db', reader_count=1)
+    try:
+        with pool.reader():
+            pass
+        assert sizes == [17, 17]  # Yazıcı ve okuyucu
+    finally:
+        pool.close()
@@ -0,0 +1,93 @@
+# test_export.py
+"""
+Mesaj geçmişi dışa aktarma testleri (database/export.py)
+
+Dışa aktarmanın kullanıcının gönderdiği, aldığı ve üyesi olduğu
+grupların mesajlarını (başkalarının özel mesajları olmadan) eskiden
+yeniye tam satırlık NDJSON parçaları halinde ürettiğini, after_id ile
+devam edilebildiğini ve gzip parçalarının birleşince geçerli tek bir
+dosya oluşturduğunu doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_export.py
+"""
+
+import gzip
+import json
+
+import pytest
+
+from database import export, queries
+from database.export import export_user_messages
+from database.queries import add_user_to_group, create_group, register_user, save_message
+
+
+@pytest.fixture
+def history(db):
+    """alice'in görebildiği mesajların ID'leri ve görmemesi gerekenler"""
+    ids = {}
+    for name in ('alice', 'bob', 'carol'):
+        _, ids[name] = register_user(name, 'secret123')
+    alice, bob, carol = ids['alice'], ids['bob'], ids['carol']
+
+    _, shared = create_group('ortak', bob)
+    add_user_to_group(shared, alice)
+    _, other = create_group('diğer', carol)
+
+    visible, hidden = [], []
+    for n in range(3):
+        visible.append(save_message(alice, f'giden {n}', 'private', receiver_id=bob))
+        visible.append(save_message(bob, f'gelen {n}', 'private', receiver_id=alice))
+        visible.append(save_message(bob, f'grup {n}', 'group', group_id=shared))
+        visible.append(save_message(alice, f'duyuru {n}', 'broadcast'))
+        hidden.append(save_message(bob, f'başkası {n}', 'private', receiver_id=carol))
+        hidden.append(save_message(carol, f'diğer grup {n}', 'group', group_id=other))
+    return alice, visible, hidden
+
+
+def _lines(chunks):
+    data = b''.join(chunks)
+    return [json.loads(line) for line in data.splitlines()]
+
+
+def test_export_contains_only_visible_messages(history):
+    alice, visible, _ = history
+    messages = _lines(export_user_messages(alice))
+    assert [m['id'] for m in messages] == visible
+    assert all('sender_name' in m for m in messages)
+
+
+def test_many_groups_use_single_branch(history, monkeypatch):
+    alice, visible, _ = history
+    monkeypatch.setattr(queries, '_EXPORT_MAX_GROUP_BRANCHES', 0)
+    assert [m['id'] for m in _lines(export_user_messages(alice))] == visible
+
+
+def test_export_resumes_after_id(history):
+    alice, visible, _ = history
+    rest = _lines(export_user_messages(alice, after_id=visible[4]))
+    assert [m['id'] for m in rest] == visible[5:]
+
+
+def test_chunks_hold_whole_lines(history, monkeypatch):
+    alice, visible, _ = history
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 200)
+    progress = []
+
+    chunks = list(export_user_messages(alice, progress=lambda *p: progress.append(p)))
+    assert len(chunks) > 1
+    assert all(chunk.endswith(b'\n') for chunk in chunks)
+    assert len(progress) == len(chunks)
+    assert progress[-1] == (len(visible), visible[-1])
+
+
+def test_gzip_members_form_one_file(history, monkeypatch):
+    alice, _, _ = history
+    monkeypatch.setattr(export, 'EXPORT_CHUNK_SIZE', 200)
+    plain = b''.join(export_user_messages(alice))
+    chunks = list(export_user_messages(alice, compress=True))
+
+    assert len(chunks) > 1
+    assert gzip.decompress(b''.join(chunks)) == plain
+    # Yarıda kesilen indirmenin tam parçaları da okunabilir
+    assert plain.startswith(gzip.decompress(b''.join(chunks[:1])))
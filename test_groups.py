@@ -0,0 +1,73 @@
+# test_groups.py
+"""
+Grup listesi testleri (database.queries.get_all_groups)
+
+groups.member_count kolonunun trigger'larla üyelik değişikliklerini
+izlediğini, grup listesinin önbellekten döndüğünü ve bu süreçteki
+değişikliklerde önbelleğin temizlendiğini doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_groups.py
+"""
+
+import pytest
+
+from database import db_manager
+from database.cache import group_directory_cache
+from database.queries import (
+    add_user_to_group, create_group, get_all_groups, register_user,
+    remove_user_from_group
+)
+
+
+@pytest.fixture
+def users(db):
+    ids = []
+    for name in ('owner', 'ayse', 'mehmet'):
+        _, user_id = register_user(name, 'secret123')
+        ids.append(user_id)
+    return ids
+
+
+def _counts():
+    return {group['group_name']: group['member_count'] for group in get_all_groups()}
+
+
+def test_member_count_follows_membership(users):
+    owner, ayse, mehmet = users
+    _, group_id = create_group('grup', owner)
+    create_group('boş', ayse)
+    assert _counts() == {'grup': 1, 'boş': 1}
+
+    add_user_to_group(group_id, ayse)
+    add_user_to_group(group_id, mehmet)
+    assert _counts() == {'grup': 3, 'boş': 1}
+
+    remove_user_from_group(group_id, ayse)
+    assert _counts() == {'grup': 2, 'boş': 1}
+
+    # Aynı üyeyi tekrar eklemek sayıyı değiştirmez (UNIQUE)
+    assert not add_user_to_group(group_id, mehmet)
+    assert _counts() == {'grup': 2, 'boş': 1}
+
+
+def test_directory_is_served_from_cache(users):
+    owner, ayse, _ = users
+    _, group_id = create_group('grup', owner)
+    assert _counts() == {'grup': 1}
+
+    # Başka süreç üyeliği doğrudan veritabanına yazar: önbellek eski kalır
+    db_manager.execute_query(
+        'INSERT INTO group_members (group_id, user_id) VALUES (?, ?)', (group_id, ayse)
+    )
+    assert _counts() == {'grup': 1}
+
+    group_directory_cache.clear()  # GROUP_DIRECTORY_TTL dolmuş gibi
+    assert _counts() == {'grup': 2}
+
+
+def test_returned_groups_do_not_share_cache(users):
+    owner = users[0]
+    create_group('grup', owner)
+    get_all_groups()[0]['group_name'] = 'değişti'
+    assert get_all_groups()[0]['group_name'] == 'grup'
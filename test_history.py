@@ -0,0 +1,137 @@
+# test_history.py
+"""
+Mesaj geçmişi sayfalama testleri (database.queries)
+
+before_id ile geriye doğru sayfalamanın her mesajı bir kez ve sadece
+istenen odadan döndürdüğünü, after_id ile yeni mesajların eskiden
+yeniye geldiğini ve geçmiş sorgularının sıralama yapmadan bileşik
+(filtre, id) indeksleri üzerinde çalıştığını doğrular. Özel sohbetlerde
+conversation_key'in kullanıcı sırasından bağımsız olduğu ve migration'ın
+eski satırları doldurduğu da test edilir. HTTP tarafı (next_cursor)
+test_api.py'dedir.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_history.py
+"""
+
+import pytest
+
+from database import db_manager
+from database.models import migrate_tables
+from database.queries import (
+    create_group, get_broadcast_messages, get_conversation_key, get_group_messages,
+    get_private_messages, register_user, save_message
+)
+
+
+@pytest.fixture
+def rooms(db):
+    """İki grupta karışık sırayla kaydedilmiş mesajlar"""
+    _, alice = register_user('alice', 'secret123')
+    _, first = create_group('birinci', alice)
+    _, second = create_group('ikinci', alice)
+
+    ids = {first: [], second: []}
+    for n in range(7):
+        for group_id in (first, second):
+            ids[group_id].append(
+                save_message(alice, f'mesaj {n}', 'group', group_id=group_id)
+            )
+    save_message(alice, 'duyuru', 'broadcast')
+    return first, ids[first]
+
+
+def _ids(messages):
+    return [message['id'] for message in messages]
+
+
+def test_before_id_walks_back_without_gaps(rooms):
+    group_id, expected = rooms
+    seen, before_id = [], None
+    while True:
+        page = get_group_messages(group_id, limit=3, before_id=before_id)
+        if not page:
+            break
+        assert _ids(page) == sorted(_ids(page))
+        seen = _ids(page) + seen
+        before_id = page[0]['id']
+    assert seen == expected
+
+
+def test_after_id_returns_newer_messages(rooms):
+    group_id, expected = rooms
+    assert _ids(get_group_messages(group_id, limit=2, after_id=expected[2])) == expected[3:5]
+    assert get_group_messages(group_id, limit=2, after_id=expected[-1]) == []
+    assert _ids(get_group_messages(group_id, limit=3)) == expected[-3:]
+
+
+def _plan(query, params):
+    rows = db_manager.execute_read(f'EXPLAIN QUERY PLAN {query}', params)
+    return ' '.join(row['detail'] for row in rows)
+
+
+@pytest.mark.parametrize('where, params, index', [
+    ("m.group_id = ? AND +m.message_type = 'group'", (1,), 'idx_messages_group_id'),
+    ("m.message_type = 'broadcast'", (), 'idx_messages_type_id'),
+    ('m.conversation_key = ?', (1 << 32 | 2,), 'idx_messages_conversation'),
+])
+def test_pages_are_index_range_scans(db, where, params, index):
+    for cursor in ('m.id < ? ORDER BY m.id DESC', 'm.id > ? ORDER BY m.id ASC'):
+        plan = _plan(f'SELECT m.id FROM messages m WHERE {where} AND {cursor} LIMIT 50',
+                     params + (100,))
+        assert index in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+def test_broadcast_pages(rooms):
+    messages = get_broadcast_messages(limit=10)
+    assert [message['message_content'] for message in messages] == ['duyuru']
+    assert get_broadcast_messages(limit=10, before_id=messages[0]['id']) == []
+
+
+def test_conversation_key_ignores_user_order():
+    assert get_conversation_key(3, 7) == get_conversation_key(7, 3) == (3 << 32) | 7
+    assert get_conversation_key(1, 2) != get_conversation_key(2, 3)
+    assert get_conversation_key('3', 7) == get_conversation_key(3, 7)
+
+
+@pytest.fixture
+def conversation(db):
+    """alice ile bob arasında iki yönlü sohbet ve başka bir sohbet"""
+    ids = {}
+    for name in ('alice', 'bob', 'carol'):
+        _, ids[name] = register_user(name, 'secret123')
+    alice, bob, carol = ids['alice'], ids['bob'], ids['carol']
+
+    expected = []
+    for n in range(3):
+        expected.append(save_message(alice, f'giden {n}', 'private', receiver_id=bob))
+        save_message(alice, f'başkası {n}', 'private', receiver_id=carol)
+        expected.append(save_message(bob, f'gelen {n}', 'private', receiver_id=alice))
+    return alice, bob, expected
+
+
+def test_private_history_has_both_directions(conversation):
+    alice, bob, expected = conversation
+    assert _ids(get_private_messages(alice, bob, limit=10)) == expected
+    assert _ids(get_private_messages(bob, alice, limit=10)) == expected
+    assert _ids(get_private_messages(bob, alice, limit=2, before_id=expected[3])) == expected[1:3]
+
+
+def test_migration_backfills_conversation_key(conversation):
+    alice, bob, expected = conversation
+    with db_manager.get_pool().writer() as conn:
+        conn.execute('UPDATE messages SET conversation_key = NULL')
+        migrate_tables(conn)
+        conn.commit()
+
+    rows = db_manager.execute_read(
+        'SELECT id FROM messages WHERE conversation_key = ? ORDER BY id',
+        (get_conversation_key(alice, bob),)
+    )
+    assert _ids(rows) == expected
+    missing = db_manager.execute_read(
+        "SELECT COUNT(*) AS n FROM messages WHERE message_type = 'private' "
+        "AND conversation_key IS NULL", fetch=True
+    )
+    assert missing['n'] == 0
@@ -0,0 +1,175 @@
+# test_membership.py
+"""
+Grup üyelik indeksi testleri (database.cache.MembershipIndex)
+
+Üyelik kontrollerinin bellekten cevaplandığını, ekleme / çıkarmaların
+indekse hemen yansıdığını ve başka bir sürecin doğrudan veritabanına
+yazdığı değişikliklerin MEMBERSHIP_INDEX_TTL dolunca görüldüğünü doğrular.
+Yeniden yüklemenin aynı anda tek thread'de yapıldığı ve saved_queries'in
+sadece veritabanına gitmeyen kontrolleri saydığı da sınanır.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_membership.py
+"""
+
+import threading
+import time
+
+from database import db_manager, queries
+from database.cache import MembershipIndex, membership_index
+from database.queries import (
+    add_user_to_group, create_group, is_user_in_group, register_user,
+    remove_user_from_group
+)
+
+
+def _user(name):
+    success, user_id = register_user(name, 'secret123')
+    assert success, user_id
+    return user_id
+
+
+def test_index_add_remove_and_listeners():
+    index = MembershipIndex()
+    events = []
+    index.add_listener(lambda *event: events.append(event))
+
+    assert index.needs_load()
+    index.load([(1, 10), (1, 11), (2, 10)])
+    assert not index.needs_load()
+    assert index.members(1) == {10, 11}
+    assert index.groups_of(10) == {1, 2}
+
+    index.add(2, 11)
+    index.remove(1, 10)
+    assert index.is_member(11, 2)
+    assert not index.is_member(10, 1)
+    assert events == [('load', None, None), ('add', 2, 11), ('remove', 1, 10)]
+
+
+def test_removed_listener_is_not_called():
+    index = MembershipIndex()
+    events = []
+    listener = events.append
+    index.add_listener(listener)
+    index.remove_listener(listener)
+    index.remove_listener(listener)  # ikinci kez sessizce yok sayılır
+
+    index.add(1, 10)
+    assert events == []
+
+
+def test_first_load_is_awaited():
+    index = MembershipIndex()
+    assert index.begin_load()
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(index.begin_load()))
+    waiter.start()
+    time.sleep(0.05)
+    assert waiter.is_alive()  # Eski indeks yok: yükleme beklenir
+
+    index.load([(1, 10)])
+    waiter.join(timeout=5)
+    assert results == [False]
+    assert index.is_member(10, 1)
+
+
+def test_reload_uses_stale_index_meanwhile():
+    index = MembershipIndex()
+    index.load([(1, 10)])
+    index.load([(1, 10)], since=-1)  # Süresi dolmuş gibi
+    assert index.needs_load()
+
+    assert index.begin_load()
+    assert not index.begin_load()  # Başka thread yüklüyor: eski indeks
+    index.abort_load()
+    assert index.begin_load()  # Başarısız yükleme yeniden denenir
+
+
+def test_load_during_write_is_retried():
+    index = MembershipIndex()
+    since = index.version
+    index.add(1, 10)  # okuma sırasında araya giren yazma
+    index.load([], since=since)
+    assert index.needs_load()
+
+
+def test_ttl_expires_index(monkeypatch):
+    index = MembershipIndex(ttl=30)
+    index.load([])
+    assert not index.needs_load()
+
+    loaded_at = index._loaded_at
+    monkeypatch.setattr('database.cache.time.monotonic', lambda: loaded_at + 31)
+    assert index.needs_load()
+
+
+def test_is_user_in_group_follows_writes(db):
+    owner, member = _user('owner'), _user('member')
+    success, group_id = create_group('grup', owner)
+    assert success
+
+    assert is_user_in_group(owner, group_id)
+    assert not is_user_in_group(member, group_id)
+
+    assert add_user_to_group(group_id, member)
+    assert is_user_in_group(member, group_id)
+    assert is_user_in_group(str(member), str(group_id))
+
+    remove_user_from_group(group_id, member)
+    assert not is_user_in_group(member, group_id)
+    assert not is_user_in_group('x', group_id)
+
+
+def test_other_process_changes_seen_after_reload(db, monkeypatch):
+    owner, member = _user('owner'), _user('member')
+    _, group_id = create_group('grup', owner)
+
+    # Başka süreç (ör. web worker) üyeliği doğrudan veritabanına yazar
+    db_manager.execute_query(
+        'INSERT INTO group_members (group_id, user_id) VALUES (?, ?)', (group_id, member)
+    )
+    assert not is_user_in_group(member, group_id)
+
+    monkeypatch.setattr(membership_index, 'needs_load', lambda: True)
+    assert is_user_in_group(member, group_id)
+
+
+def test_concurrent_reload_is_single_flight(db, monkeypatch):
+    owner = _user('owner')
+    _, group_id = create_group('grup', owner)
+    membership_index.load([], since=-1)  # Süresi dolmuş gibi
+    loads = membership_index.loads
+
+    execute_read = queries.execute_read
+
+    def slow_read(*args, **kwargs):
+        time.sleep(0.05)
+        return execute_read(*args, **kwargs)
+
+    monkeypatch.setattr(queries, 'execute_read', slow_read)
+    threads = [threading.Thread(target=is_user_in_group, args=(owner, group_id))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert membership_index.loads == loads + 1
+    assert is_user_in_group(owner, group_id)
+
+
+def test_saved_queries_count_only_index_hits(db):
+    owner = _user('owner')
+    _, group_id = create_group('grup', owner)
+    is_user_in_group(owner, group_id)
+    before = membership_index.stats()
+
+    assert is_user_in_group(owner, group_id)
+    membership_index.load([], since=-1)  # Bir sonraki kontrol yükler
+    assert is_user_in_group(owner, group_id)
+
+    after = membership_index.stats()
+    assert after['lookups'] - before['lookups'] == 2
+    assert after['saved_queries'] - before['saved_queries'] == 1
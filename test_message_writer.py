@@ -0,0 +1,154 @@
+# test_message_writer.py
+"""
+Toplu mesaj yazıcı testleri (database/message_writer.py)
+
+Mesajların batch'ler halinde tek transaction'la yazıldığını, hatalı bir
+mesajın batch'in geri kalanını düşürmediğini, Future / callback'lerin
+yazıcı kilidi bırakıldıktan sonra tamamlandığını ve write-behind açıkken
+save_message'ın atanan ID'yi döndürdüğünü doğrular. Yazıcı bağlantısı
+açılamadığında thread'in ölmediği, durdurulmuş yazıcının iş kabul
+etmediği ve save_message'ın süresiz beklemediği de sınanır.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_message_writer.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from config import Config
+from database import db_manager
+from database import message_writer
+from database.message_writer import MessageWriter, shutdown_message_writer
+from database.queries import get_messages_by_user, register_user, save_message
+
+
+_INSERT = '''
+    INSERT INTO messages (sender_id, message_content, message_hash, message_type)
+    VALUES (?, ?, 'h', 'broadcast')
+'''
+
+
+@pytest.fixture
+def sender(db):
+    _, user_id = register_user('sender', 'secret123')
+    return user_id
+
+
+@pytest.fixture
+def writer():
+    writer = MessageWriter(batch_size=4, flush_interval_ms=1000).start()
+    yield writer
+    writer.stop()
+
+
+def _count():
+    return db_manager.execute_read('SELECT count(*) AS n FROM messages', fetch=True)['n']
+
+
+def test_messages_are_written_in_batches(sender, writer):
+    futures = [writer.submit(_INSERT, (sender, f'mesaj {n}')) for n in range(10)]
+    assert writer.flush(timeout=5)
+
+    ids = [future.result(timeout=5) for future in futures]
+    assert ids == list(range(ids[0], ids[0] + 10))
+    assert _count() == 10
+    # 4 + 4 + flush ile yazılan 2
+    assert writer.stats()['batches_written'] == 3
+    assert writer.stats()['messages_written'] == 10
+
+
+def test_failing_message_does_not_drop_batch(sender, writer):
+    good = writer.submit(_INSERT, (sender, 'iyi'))
+    bad = writer.submit(_INSERT, (sender, None))  # message_content NOT NULL
+    other = writer.submit(_INSERT, (sender, 'diğer'))
+    assert writer.flush(timeout=5)
+
+    assert good.result(timeout=5) and other.result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=5)
+    assert _count() == 2
+    assert writer.stats()['failed'] == 1
+
+
+def test_callbacks_run_after_writer_lock_is_released(sender, writer):
+    pool = db_manager.get_pool()
+    lock_free = []
+
+    def try_lock():
+        if pool._writer_lock.acquire(timeout=1):
+            lock_free.append(True)
+            pool._writer_lock.release()
+        else:
+            lock_free.append(False)
+
+    def callback(message_id):
+        # Başka bir thread kilidi alabilmeli (yazıcı kilidi tutmuyor)
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+
+    future = writer.submit(_INSERT, (sender, 'mesaj'), callback=callback)
+    assert writer.flush(timeout=5)
+    assert future.result(timeout=5)
+    assert lock_free == [True]
+
+
+def test_save_message_with_write_behind(sender, monkeypatch):
+    monkeypatch.setattr(Config, 'MESSAGE_WRITE_BEHIND', True)
+    try:
+        ids = [save_message(sender, f'mesaj {n}', 'broadcast') for n in range(3)]
+    finally:
+        shutdown_message_writer()
+
+    assert all(ids) and ids == sorted(ids)
+    assert [m['id'] for m in get_messages_by_user(sender)] == ids[::-1]
+
+
+def test_writer_survives_connection_errors(sender, monkeypatch):
+    def broken_pool():
+        raise sqlite3.OperationalError('unable to open database file')
+
+    writer = MessageWriter(batch_size=4, flush_interval_ms=0).start()
+    try:
+        monkeypatch.setattr(message_writer, 'get_pool', broken_pool)
+        failed = writer.submit(_INSERT, (sender, 'kayıp'))
+        with pytest.raises(sqlite3.OperationalError):
+            failed.result(timeout=5)
+        assert writer.running
+        assert writer.stats()['failed'] == 1
+
+        monkeypatch.undo()
+        assert writer.submit(_INSERT, (sender, 'mesaj')).result(timeout=5)
+    finally:
+        writer.stop()
+    assert _count() == 1
+
+
+def test_submit_starts_writer_and_rejects_after_stop(sender):
+    writer = MessageWriter(batch_size=4, flush_interval_ms=0)
+    assert not writer.running
+    assert writer.submit(_INSERT, (sender, 'mesaj')).result(timeout=5)
+    assert writer.running
+
+    writer.stop()
+    with pytest.raises(RuntimeError):
+        writer.submit(_INSERT, (sender, 'geç'))
+    assert _count() == 1
+
+
+def test_save_message_times_out(sender, monkeypatch):
+    monkeypatch.setattr(Config, 'MESSAGE_WRITE_BEHIND', True)
+    monkeypatch.setattr(Config, 'MESSAGE_FLUSH_INTERVAL_MS', 10)
+    monkeypatch.setattr(Config, 'DB_BUSY_TIMEOUT_MS', 100)
+    pool = db_manager.get_pool()
+    try:
+        # Yazıcı kilidi tutulurken batch yazılamaz
+        with pool.writer():
+            assert save_message(sender, 'mesaj', 'broadcast') is None
+        assert message_writer.get_message_writer().flush(timeout=5)
+    finally:
+        shutdown_message_writer()
+    assert _count() == 1
@@ -0,0 +1,111 @@
+# test_metrics.py
+"""
+Sorgu metrikleri testleri (database/metrics.py)
+
+Histogram yüzdeliklerinin kova çözünürlüğü içinde kaldığını, her sorgu
+adı için çağrı / satır / hata sayılarının tutulduğunu ve SLOW_QUERY_MS
+eşiğini aşan sorguların SQL, parametre tipleri ve sorgu planıyla
+kaydedildiğini doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_metrics.py
+"""
+
+import sqlite3
+
+import pytest
+
+from database.db_manager import execute_query, execute_read, write_transaction
+from database.metrics import Histogram, QueryMetrics, query_metrics
+
+
+def test_histogram_percentiles_within_a_bucket():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.add(float(value))
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 100
+    assert snapshot['avg_ms'] == 50.5
+    assert snapshot['max_ms'] == 100.0
+    assert 50 <= snapshot['p50_ms'] <= 50 * 1.25
+    assert 95 <= snapshot['p95_ms'] <= 100
+    assert Histogram().percentile(99) == 0.0
+
+
+def test_stats_per_query_name():
+    metrics = QueryMetrics()
+    metrics.record('a', 1.0, rows=3)
+    metrics.record('a', 2.0, rows=2, lock_wait_ms=5.0, error=True)
+    metrics.record('b', 10.0)
+
+    b, a = metrics.snapshot()  # Toplam süreye göre sıralı
+    assert (b['name'], a['name']) == ('b', 'a')
+    assert (a['calls'], a['rows'], a['errors'], a['total_ms']) == (2, 5, 1, 3.0)
+    assert a['lock_wait']['max_ms'] == 5.0
+
+    metrics.reset()
+    assert metrics.snapshot() == []
+
+
+@pytest.mark.parametrize('threshold, elapsed, slow', [
+    (100, 99.9, False), (100, 100, True), (0, 1000, False), (None, 1000, False),
+])
+def test_slow_threshold(threshold, elapsed, slow):
+    assert QueryMetrics(slow_query_ms=threshold).is_slow(elapsed) is slow
+
+
+def test_slow_entry_has_sql_params_and_plan():
+    metrics = QueryMetrics(slow_query_ms=1)
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+
+    metrics.record_slow('t_by_id', 12.0, 'SELECT name\n  FROM t WHERE id = ?', (5,), conn)
+    metrics.record_slow('broken', 12.0, 'SELECT * FROM yok', (), conn)
+    entry, broken = metrics.slow_queries()
+    conn.close()
+
+    assert entry['sql'] == 'SELECT name FROM t WHERE id = ?'
+    assert entry['params_shape'] == ['int']
+    assert any('t' in step for step in entry['plan'])
+    assert broken['plan'][0].startswith('plan alınamadı')
+
+
+@pytest.fixture
+def metrics(db):
+    query_metrics.reset()
+    yield query_metrics
+    query_metrics.reset()
+
+
+def _stats(name):
+    return next(s for s in query_metrics.snapshot() if s['name'] == name)
+
+
+def test_database_calls_are_recorded(metrics):
+    execute_query("INSERT INTO users (username, password_hash) VALUES ('alice', 'x')",
+                  name='insert_user')
+    execute_read('SELECT * FROM users', name='all_users')
+    list(execute_read('SELECT * FROM users', lazy=True, name='all_users'))
+    with pytest.raises(sqlite3.OperationalError):
+        execute_read('SELECT * FROM yok', name='missing_table')
+    execute_query('CREATE TABLE t (x INTEGER)')
+    with write_transaction('fill_t') as conn:
+        conn.executemany('INSERT INTO t VALUES (?)', [(1,), (2,)])
+
+    assert _stats('insert_user')['rows'] == 1
+    assert (_stats('all_users')['calls'], _stats('all_users')['rows']) == (2, 2)
+    assert _stats('missing_table')['errors'] == 1
+    assert _stats('fill_t')['rows'] == 2
+    # İsimsiz sorgular SQL'den türetilen sabit bir isimle kaydedilir
+    execute_read('SELECT   1')
+    assert _stats('sql:SELECT 1')['calls'] == 1
+
+
+def test_slow_reads_are_logged_with_plan(metrics, monkeypatch):
+    monkeypatch.setattr(metrics, 'slow_query_ms', 1e-9)
+    execute_read('SELECT * FROM users WHERE id = ?', (1,), name='user_by_id')
+
+    entry = next(e for e in metrics.slow_queries() if e['name'] == 'user_by_id')
+    assert entry['params_shape'] == ['int']
+    assert entry['plan']
@@ -0,0 +1,103 @@
+# test_offline.py
+"""
+Çevrimdışı mesaj teslimi testleri (database.queries.deliver_offline_messages)
+
+Çevrimdışı mesajların tek transaction'da getirilip teslim edildi olarak
+işaretlendiğini ve okuma ile güncelleme arasında gelen bir mesajın
+işaretlenmeyip bir sonraki çağrıya kaldığını doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_offline.py
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from database import db_manager, queries
+from database.queries import (
+    deliver_offline_messages, get_conversation_key, get_offline_messages,
+    register_user, save_message
+)
+
+
+@pytest.fixture
+def users(db):
+    _, alice = register_user('alice', 'secret123')
+    _, bob = register_user('bob', 'secret123')
+    return alice, bob
+
+
+def _offline(sender, receiver, count):
+    return [save_message(sender, f'mesaj {n}', 'private', receiver_id=receiver,
+                         is_offline=True) for n in range(count)]
+
+
+def _status(message_ids):
+    placeholders = ', '.join('?' * len(message_ids))
+    rows = db_manager.execute_read(
+        f'SELECT id, status, is_offline FROM messages WHERE id IN ({placeholders}) ORDER BY id',
+        tuple(message_ids)
+    )
+    return [(row['status'], row['is_offline']) for row in rows]
+
+
+def test_offline_messages_are_delivered_once(users):
+    alice, bob = users
+    ids = _offline(alice, bob, 3)
+    save_message(alice, 'çevrimiçi', 'private', receiver_id=bob)
+
+    delivered = deliver_offline_messages(bob)
+    assert [m['id'] for m in delivered] == ids
+    assert {m['sender_name'] for m in delivered} == {'alice'}
+    assert _status(ids) == [('delivered', 0)] * 3
+
+    assert get_offline_messages(bob) == []
+    assert deliver_offline_messages(bob) == []
+    assert deliver_offline_messages(alice) == []
+
+
+class _LateInsert:
+    """SELECT'ten hemen sonra araya yeni bir çevrimdışı mesaj yazan bağlantı"""
+
+    def __init__(self, conn, sender, receiver):
+        self._conn = conn
+        self._params = (sender, receiver, get_conversation_key(sender, receiver))
+        self.late_id = None
+
+    def execute(self, query, params=()):
+        result = self._conn.execute(query, params)
+        if query.lstrip().upper().startswith('SELECT') and self.late_id is None:
+            rows = result.fetchall()
+            self.late_id = self._conn.execute(
+                '''INSERT INTO messages (sender_id, receiver_id, conversation_key,
+                                         message_content, message_hash, message_type,
+                                         is_offline)
+                   VALUES (?, ?, ?, 'geç', 'h', 'private', 1)''',
+                self._params
+            ).lastrowid
+            return rows
+        return result
+
+
+def test_only_returned_messages_are_marked(users, monkeypatch):
+    alice, bob = users
+    ids = _offline(alice, bob, 2)
+
+    write_transaction = queries.write_transaction
+    connections = []
+
+    @contextmanager
+    def racing_transaction(name):
+        with write_transaction(name) as conn:
+            connections.append(_LateInsert(conn, alice, bob))
+            yield connections[-1]
+
+    monkeypatch.setattr(queries, 'write_transaction', racing_transaction)
+    delivered = deliver_offline_messages(bob)
+    monkeypatch.undo()
+
+    late_id = connections[0].late_id
+    assert [m['id'] for m in delivered] == ids
+    assert _status(ids + [late_id]) == [('delivered', 0), ('delivered', 0), ('sent', 1)]
+    assert [m['id'] for m in deliver_offline_messages(bob)] == [late_id]
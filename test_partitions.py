@@ -0,0 +1,131 @@
+# test_partitions.py
+"""
+Mesaj partition'ları testleri (database/partitions.py)
+
+Rotasyonun sadece durumu son halini almış mesajları taşıdığını, durum
+güncellemelerinin arşivdeki mesajlar için başarısız döndüğünü ve geçmiş
+sayfalarının main ile partition'lar arasında (ID aralıkları örtüşse de)
+satır atlamadan birleştiğini doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_partitions.py
+"""
+
+import pytest
+
+from config import Config
+from database import db_manager
+from database.partitions import get_partitions, rotate_partitions
+from database.queries import (
+    _fetch_history_page, get_messages_by_user, iter_history_page, iter_user_messages,
+    mark_message_delivered, mark_message_read, register_user, save_message
+)
+
+
+@pytest.fixture
+def archived(db):
+    """
+    Ocak 2024'te 6 özel mesaj (1, 2, 4, 5 okunmuş; 3 teslim edilmiş;
+    6 gönderilmiş), bu ay 2 mesaj ve rotasyon sonrası veritabanı
+    """
+    _, alice = register_user('alice', 'secret123')
+    _, bob = register_user('bob', 'secret123')
+    ids = [save_message(alice, f'mesaj {n}', 'private', receiver_id=bob) for n in range(8)]
+
+    for message_id in ids[:6]:
+        db_manager.execute_query(
+            "UPDATE messages SET created_at = '2024-01-15 10:00:00' WHERE id = ?",
+            (message_id,)
+        )
+    for message_id in (ids[0], ids[1], ids[3], ids[4]):
+        assert mark_message_read(message_id)
+    assert mark_message_delivered(ids[2])
+
+    assert rotate_partitions() == 4
+    return alice, bob, ids
+
+
+def _main_ids():
+    rows = db_manager.execute_read('SELECT id FROM messages ORDER BY id')
+    return [row['id'] for row in rows]
+
+
+def test_rotation_keeps_unread_messages_in_main(archived):
+    _, _, ids = archived
+    assert _main_ids() == [ids[2], ids[5], ids[6], ids[7]]
+
+    [partition] = get_partitions()
+    assert (partition['min_id'], partition['max_id'], partition['row_count']) == \
+        (ids[0], ids[4], 4)
+
+
+def test_status_updates_report_missing_rows(archived):
+    _, _, ids = archived
+    # main'de kalan mesajlar güncellenebilir
+    assert mark_message_read(ids[2])
+    assert mark_message_delivered(ids[5])
+    # Arşivdeki (salt okunur) veya olmayan mesajlar
+    assert not mark_message_read(ids[0])
+    assert not mark_message_delivered(ids[4])
+    assert not mark_message_read(10 ** 6)
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 5, 8, 20])
+def test_history_pages_merge_main_and_partitions(archived, limit):
+    alice, _, ids = archived
+
+    seen, before_id = [], None
+    while True:
+        page = get_messages_by_user(alice, limit=limit, before_id=before_id)
+        seen += [m['id'] for m in page]
+        if len(page) < limit:
+            break
+        before_id = page[-1]['id']
+    assert seen == sorted(ids, reverse=True)
+
+    seen, after_id = [], 0
+    while True:
+        page = _fetch_history_page('test', 'm.sender_id = ?', (alice,), limit,
+                                   after_id=after_id)
+        seen += [m['id'] for m in page]
+        if len(page) < limit:
+            break
+        after_id = page[-1]['id']
+    assert seen == ids
+
+
+def test_streaming_and_export_match_pages(archived):
+    alice, bob, ids = archived
+    streamed = list(iter_history_page('test', 'm.sender_id = ?', (alice,), 5,
+                                      before_id=ids[6]))
+    assert [m['id'] for m in streamed] == ids[1:6]
+
+    exported = list(iter_user_messages(bob, batch_size=3))
+    assert [m['id'] for m in exported] == ids
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 100])
+def test_streamed_pages_match_fetched_pages(archived, batch_size):
+    alice, _, ids = archived
+    where, params = 'm.sender_id = ?', (alice,)
+    cursors = [(None, None), (ids[6], None), (ids[0], None), (None, 0), (None, ids[2])]
+
+    for limit in (1, 3, 5, 8, 20):
+        for before_id, after_id in cursors:
+            expected = _fetch_history_page('test', where, params, limit, before_id, after_id)
+            streamed = iter_history_page('test', where, params, limit, before_id,
+                                         after_id, batch_size=batch_size)
+            assert list(streamed) == expected, (limit, before_id, after_id)
+
+
+def test_streaming_returns_reader_between_batches(archived, monkeypatch):
+    alice, _, ids = archived
+    monkeypatch.setattr(Config, 'DB_READER_COUNT', 1)
+    monkeypatch.setattr(Config, 'DB_BUSY_TIMEOUT_MS', 50)
+    db_manager.close_db()
+
+    stream = iter_history_page('test', 'm.sender_id = ?', (alice,), 8, batch_size=2)
+    assert next(stream)['id'] == ids[0]
+    # Akış yarıdayken tek okuyucu bağlantı başka sorgular için boşta
+    assert db_manager.execute_read('SELECT COUNT(*) AS n FROM messages', fetch=True)['n'] == 4
+    assert [m['id'] for m in stream] == ids[1:]
@@ -0,0 +1,61 @@
+# test_passwords.py
+"""
+Şifre havuzu ve giriş doğrulama testleri (database/passwords.py)
+
+Hash / doğrulama / yeniden hash'leme akışını ve olmayan kullanıcılar için
+sahte hash'in istek thread'inde değil şifre havuzunda, bir kez
+hesaplandığını doğrular. Bozuk hash kayıtları hata fırlatmadan
+eşleşmeyen şifre sayılır.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_passwords.py
+"""
+
+import pytest
+
+from database import queries
+from database.passwords import PasswordHasher, check_hash, needs_rehash
+from database.queries import authenticate_user, register_user
+
+
+def test_hash_verify_and_rehash():
+    hasher = PasswordHasher(iterations=1000, workers=1)
+    try:
+        stored = hasher.hash('secret123')
+        assert check_hash('secret123', stored)
+        assert hasher.verify('secret123', stored) == (True, None)
+        assert hasher.verify('yanlis', stored) == (False, None)
+
+        stronger = PasswordHasher(iterations=2000, workers=1)
+        ok, new_hash = stronger.verify('secret123', stored)
+        stronger.shutdown()
+        assert ok and new_hash and not needs_rehash(new_hash, 2000)
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.parametrize('stored', [
+    'pbkdf2_sha256$1000$c2FsdA==$bozuk!base64',
+    'pbkdf2_sha256$1000$c2FsdA==$YWJj=',
+    'pbkdf2_sha256$1000$bozuk!$YWJj',
+    'pbkdf2_sha256$çok$c2FsdA==$YWJj',
+    'pbkdf2_sha256$1000$c2FsdA==',
+])
+def test_malformed_hash_does_not_match(stored):
+    assert check_hash('secret123', stored) is False
+
+
+def test_missing_user_hash_computed_in_pool(db, monkeypatch):
+    register_user('alice', 'secret123')
+    monkeypatch.setattr(queries, '_dummy_hash', None)
+    hasher = queries.get_password_hasher()
+    hashed = hasher.stats()['hashed']
+
+    assert authenticate_user('olmayan', 'secret123') == (False, None)
+    assert authenticate_user('baska', 'secret123') == (False, None)
+    # Sahte hash havuzda ve bir kez hesaplanır
+    assert hasher.stats()['hashed'] == hashed + 1
+    assert not needs_rehash(queries._dummy_hash, hasher.iterations)
+
+    ok, user = authenticate_user('alice', 'secret123')
+    assert ok and user['username'] == 'alice'
@@ -0,0 +1,121 @@
+# test_presence.py
+"""
+Çevrimiçi durum testleri (messaging/presence.py, database/presence_writer.py)
+
+Çoklu oturumda kullanıcının sadece ilk oturumda çevrimiçi, son oturum
+kapanınca çevrimdışı sayıldığını, diğer worker'ların oturumlarının hesaba
+katıldığını ve last_seen yazımlarının kullanıcı başına tek satıra
+indirilip toplu yazıldığını doğrular. PresenceRegistry testleri
+flask_socketio kurulu değilse atlanır (messaging paketi onu import eder).
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_presence.py
+"""
+
+import sqlite3
+
+import pytest
+
+from config import Config
+from database import db_manager, presence_writer
+from database.presence_writer import PresenceWriter
+from database.queries import get_all_users, register_user, set_user_online
+
+
+@pytest.fixture
+def registry():
+    pytest.importorskip('flask_socketio')
+    from messaging.presence import PresenceRegistry
+    return PresenceRegistry()
+
+
+def test_only_first_session_goes_online(registry):
+    assert registry.connect(1, 'a')
+    assert not registry.connect(1, 'b')   # İkinci sekme
+    assert not registry.connect(1, 'a')   # Aynı oturum tekrar
+    assert set(registry.sids(1)) == {'a', 'b'}
+
+    assert registry.disconnect('a') == (1, False)
+    assert registry.is_online(1)
+    assert registry.disconnect('b') == (1, True)
+    assert not registry.is_online(1)
+    assert registry.disconnect('b') == (None, False)
+
+
+def test_reused_sid_moves_to_new_user(registry):
+    registry.connect(1, 'a')
+    assert registry.connect(2, 'a')
+    assert not registry.is_online(1)
+    assert registry.user_for('a') == 2
+
+
+def test_remote_sessions_count(registry):
+    offline = []
+    registry.on_remote_offline = offline.append
+    registry.apply({'worker': 'w2', 'op': 'connect', 'sid': 'x', 'user_id': 1})
+
+    assert registry.is_online(1)
+    assert not registry.connect(1, 'a')  # Başka worker'da zaten çevrimiçi
+    assert registry.disconnect('a') == (1, False)
+
+    # Sahibi son oturum olmadığını sanmıştı: çevrimdışı yazmak bize düşer
+    registry.apply({'worker': 'w2', 'op': 'disconnect', 'sid': 'x', 'user_id': 1,
+                    'last': False})
+    assert offline == [1]
+    assert not registry.is_online(1)
+
+
+@pytest.fixture
+def users(db):
+    ids = []
+    for name in ('alice', 'bob'):
+        _, user_id = register_user(name, 'secret123')
+        ids.append(user_id)
+    return ids
+
+
+def _online(user_id):
+    row = db_manager.execute_read('SELECT is_online FROM users WHERE id = ?',
+                                  (user_id,), fetch=True)
+    return row['is_online']
+
+
+def test_writer_keeps_last_state_per_user(users):
+    alice, bob = users
+    writer = PresenceWriter()
+    writer.mark(alice, True)
+    writer.mark(alice, False)
+    writer.mark(bob, True)
+    assert writer.pending_state(alice)[0] == 0
+
+    assert writer.flush() == 2
+    assert (_online(alice), _online(bob)) == (0, 1)
+    stats = writer.stats()
+    assert (stats['updates'], stats['rows_written'], stats['batches_written']) == (3, 2, 1)
+    assert writer.flush() == 0
+
+
+def test_failed_flush_keeps_newer_states(users, monkeypatch):
+    alice, _ = users
+    writer = PresenceWriter()
+    writer.mark(alice, True)
+
+    def broken(name):
+        writer.mark(alice, False)  # Yazma sırasında gelen yeni durum
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(presence_writer, 'write_transaction', broken)
+    assert writer.flush() == 0
+    assert writer.stats()['failed'] == 1
+    assert writer.pending_state(alice)[0] == 0
+
+    monkeypatch.undo()
+    assert writer.flush() == 1
+    assert _online(alice) == 0
+
+
+def test_lists_include_pending_presence(users, monkeypatch):
+    alice, _ = users
+    monkeypatch.setattr(Config, 'PRESENCE_WRITE_BEHIND', True)
+    set_user_online(alice, True)
+    assert {u['id']: u['is_online'] for u in get_all_users()}[alice] == 1
@@ -0,0 +1,194 @@
+# test_protocol.py
+"""
+core/protocol.py çerçeveleme ve core/codec.py kodlama testleri
+
+Rastgele bölünmüş ve birleştirilmiş çerçevelerle FrameDecoder'ın her
+durumda aynı yükleri aynı sırayla çıkardığını, ikili kodlamanın da
+rastgele mesajları JSON ile aynı sonuca çözdüğünü doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_protocol.py
+    python test_protocol.py
+"""
+
+import json
+import random
+import socket
+import threading
+
+import pytest
+
+from core import codec
+from core.protocol import FrameDecoder, ProtocolError, encode_frame, recv_frames
+
+
+def _random_payloads(rng, count, max_size=3000):
+    sizes = [rng.choice([0, 1, 3, 4, 5, rng.randint(0, max_size)]) for _ in range(count)]
+    return [rng.randbytes(size) for size in sizes]
+
+
+def _random_chunks(rng, data):
+    """Akışı rastgele boyutlu parçalara böler (1 bayttan birkaç çerçeveye)"""
+    chunks, pos = [], 0
+    while pos < len(data):
+        size = rng.choice([1, 2, 3, 4, 7, rng.randint(1, 64), rng.randint(1, 9000)])
+        chunks.append(data[pos:pos + size])
+        pos += size
+    return chunks
+
+
+def test_single_frame():
+    decoder = FrameDecoder()
+    decoder.feed(encode_frame(b'{"type": "ping"}'))
+    assert list(decoder.read_frames()) == [b'{"type": "ping"}']
+    assert decoder.pending == 0
+
+
+def test_fuzz_split_and_coalesced_feed():
+    rng = random.Random(1234)
+    for _ in range(300):
+        payloads = _random_payloads(rng, rng.randint(1, 40))
+        stream = b''.join(encode_frame(p) for p in payloads)
+
+        decoder = FrameDecoder(buffer_size=rng.choice([1, 16, 4096]))
+        received = []
+        for chunk in _random_chunks(rng, stream):
+            decoder.feed(chunk)
+            received.extend(decoder.read_frames())
+
+        assert received == payloads
+        assert decoder.pending == 0
+
+
+def test_fuzz_recv_into():
+    """get_buffer / buffer_updated yolunu kısmi yazmalarla dener"""
+    rng = random.Random(99)
+    for _ in range(200):
+        payloads = _random_payloads(rng, rng.randint(1, 30), max_size=20000)
+        stream = memoryview(b''.join(encode_frame(p) for p in payloads))
+
+        decoder = FrameDecoder(buffer_size=rng.choice([8, 512, 4096]))
+        received, pos = [], 0
+        while pos < len(stream):
+            target = decoder.get_buffer()
+            count = min(len(target), len(stream) - pos, rng.randint(1, 12000))
+            target[:count] = stream[pos:pos + count]
+            decoder.buffer_updated(count)
+            pos += count
+            received.extend(decoder.read_frames())
+
+        assert received == payloads
+
+
+def test_partial_frame_is_kept_when_iteration_stops_early():
+    decoder = FrameDecoder()
+    decoder.feed(encode_frame(b'a') + encode_frame(b'b') + encode_frame(b'c')[:3])
+    frames = decoder.read_frames()
+    assert next(frames) == b'a'
+    frames.close()
+    assert list(decoder.read_frames()) == [b'b']
+    decoder.feed(encode_frame(b'c')[3:])
+    assert list(decoder.read_frames()) == [b'c']
+
+
+def test_oversized_frame_is_rejected_before_buffering():
+    decoder = FrameDecoder(max_frame_size=100)
+    decoder.feed(encode_frame(b'x' * 101, max_frame_size=1000)[:10])
+    with pytest.raises(ProtocolError):
+        list(decoder.read_frames())
+
+    with pytest.raises(ProtocolError):
+        encode_frame(b'x' * 101, max_frame_size=100)
+
+
+def test_buffer_shrinks_after_large_frame():
+    decoder = FrameDecoder(buffer_size=64)
+    decoder.feed(encode_frame(b'x' * 100000))
+    assert list(decoder.read_frames()) == [b'x' * 100000]
+    decoder.feed(encode_frame(b'y'))
+    assert list(decoder.read_frames()) == [b'y']
+    assert len(decoder.get_buffer(1)) <= 64 * FrameDecoder._SHRINK_FACTOR
+
+
+def test_recv_frames_over_socketpair():
+    rng = random.Random(7)
+    payloads = _random_payloads(rng, 200, max_size=50000)
+    stream = b''.join(encode_frame(p) for p in payloads)
+
+    left, right = socket.socketpair()
+    with left, right:
+        # Küçük parçalar halinde yaz: okuyucu bölünmüş ve birleşmiş çerçeveler görür
+        def writer():
+            for chunk in _random_chunks(rng, stream):
+                right.sendall(chunk)
+            right.shutdown(socket.SHUT_WR)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        received = list(recv_frames(left))
+        thread.join()
+
+    assert received == payloads
+
+
+def test_recv_frames_truncated_stream():
+    left, right = socket.socketpair()
+    with left, right:
+        right.sendall(encode_frame(b'tamam') + encode_frame(b'yarim')[:6])
+        right.shutdown(socket.SHUT_WR)
+        frames = recv_frames(left)
+        assert next(frames) == b'tamam'
+        with pytest.raises(ProtocolError):
+            next(frames)
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randint(0, 8 if depth < 3 else 4)
+    if kind == 0:
+        return rng.choice([None, True, False, 0.5, -1e300])
+    if kind == 1:
+        return rng.choice([0, 127, 128, -32, -33, -129, 65536, -2**31 - 1, 2**63 - 1, 2**64 - 1,
+                           rng.randint(-2**63, 2**63)])
+    if kind == 2:
+        return ''.join(chr(rng.randint(32, 0x2FFF)) for _ in range(rng.choice([0, 31, 32, 300])))
+    if kind in (3, 4):
+        return rng.choice(codec.FIELDS)
+    if kind in (5, 6):
+        return [_random_value(rng, depth + 1) for _ in range(rng.choice([0, 3, 16]))]
+    keys = list(codec.FIELDS) + ['bilinmeyen', 'ş' * 40]
+    return {rng.choice(keys): _random_value(rng, depth + 1) for _ in range(rng.choice([0, 3, 17]))}
+
+
+def test_fuzz_binary_codec_matches_json():
+    rng = random.Random(2024)
+    binary = codec.CODECS['binary']
+    for _ in range(500):
+        message = {'type': 'message', 'data': _random_value(rng)}
+        payload = binary.encode(message)
+        assert payload[0] == codec.BINARY_MAGIC
+        assert codec.decode(payload) == message
+        assert codec.decode(codec.CODECS['json'].encode(message)) == json.loads(json.dumps(message))
+
+
+def test_corrupt_payloads_raise_protocol_error():
+    payload = codec.CODECS['binary'].encode({'type': 'ping', 'message': 'merhaba' * 10})
+    for bad in [b'', b'{"type"', b'\xc1', b'\xc1\xc1', b'\xc1\x81\x7f\x01', payload + b'\x00']:
+        with pytest.raises(ProtocolError):
+            codec.decode(bad)
+    for cut in range(1, len(payload)):
+        with pytest.raises(ProtocolError):
+            codec.decode(payload[:cut])
+
+
+def test_negotiate():
+    assert codec.negotiate(None).name == 'json'
+    assert codec.negotiate(['binary', 'json']).name == 'binary'
+    assert codec.negotiate(['json', 'binary']).name == 'json'
+    assert codec.negotiate(['xml']).name == 'json'
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
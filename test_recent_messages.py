@@ -0,0 +1,154 @@
+# test_recent_messages.py
+"""
+Son mesaj tamponu testleri (database.cache.RecentMessages)
+
+Tamponun sadece kapsadığı sayfaları cevapladığını (kapsamadığı
+before_id / after_id aralıklarında None döndürüp veritabanına
+düşürdüğünü), ısıtma sırasında kaydedilen mesajların kaybolmadığını,
+oda derinliği ve bellek bütçesinin korunduğunu ve geçmiş sorgularının
+tampondan veritabanıyla aynı sonucu verdiğini doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_recent_messages.py
+"""
+
+import pytest
+
+from database.cache import RecentMessages, recent_messages
+from database.queries import (
+    _fetch_history_page, get_broadcast_messages, register_user, save_message
+)
+from database.versions import room_key
+
+
+ROOM = room_key('broadcast')
+
+
+def _rows(ids):
+    return [{'id': message_id, 'message_content': f'mesaj {message_id}'} for message_id in ids]
+
+
+def _ids(page):
+    return None if page is None else [row['id'] for row in page]
+
+
+def _warm(buffer, ids, exhaustive=False, key=ROOM):
+    assert buffer.begin_warm(key)
+    buffer.finish_warm(key, _rows(ids), exhaustive)
+
+
+def test_cold_room_is_a_miss():
+    buffer = RecentMessages(depth=5)
+    assert buffer.read(ROOM, 10) is None
+    assert buffer.stats()['misses'] == 1
+
+
+def test_pages_inside_the_buffer_are_hits():
+    buffer = RecentMessages(depth=5)
+    _warm(buffer, range(10, 15))
+
+    assert _ids(buffer.read(ROOM, 2)) == [13, 14]
+    assert _ids(buffer.read(ROOM, 2, before_id=12)) == [10, 11]
+    assert _ids(buffer.read(ROOM, 10, after_id=9)) == [10, 11, 12, 13, 14]
+    assert _ids(buffer.read(ROOM, 2, after_id=11)) == [12, 13]
+    assert _ids(buffer.read(ROOM, 2, after_id=14)) == []
+    assert buffer.stats()['hits'] == 5
+
+
+def test_pages_outside_the_buffer_are_misses():
+    buffer = RecentMessages(depth=5)
+    _warm(buffer, range(10, 15))
+
+    # Daha eski mesajlar tamponda değil
+    assert buffer.read(ROOM, 2, before_id=11) is None
+    assert buffer.read(ROOM, 10) is None
+    # after_id < ids[0] - 1: arada tampona girmemiş mesaj olabilir
+    assert buffer.read(ROOM, 10, after_id=8) is None
+    assert buffer.stats()['misses'] == 3
+
+
+def test_exhaustive_room_answers_everything():
+    buffer = RecentMessages(depth=5)
+    _warm(buffer, [10, 11, 12], exhaustive=True)
+
+    assert _ids(buffer.read(ROOM, 10)) == [10, 11, 12]
+    assert _ids(buffer.read(ROOM, 2, before_id=11)) == [10]
+    assert _ids(buffer.read(ROOM, 10, after_id=0)) == [10, 11, 12]
+
+
+def test_messages_saved_during_warm_are_merged():
+    buffer = RecentMessages(depth=5)
+    assert buffer.begin_warm(ROOM)
+    assert not buffer.begin_warm(ROOM)  # Başka istek ısıtıyor
+    assert buffer.read(ROOM, 2) is None
+
+    # Isıtma sorgusu sürerken kaydedilen mesajlar
+    buffer.append(ROOM, lambda: _rows([14])[0])
+    buffer.append(ROOM, lambda: _rows([15])[0])
+    buffer.finish_warm(ROOM, _rows(range(11, 15)), exhaustive=False)
+
+    assert _ids(buffer.read(ROOM, 10, after_id=10)) == [11, 12, 13, 14, 15]
+    assert buffer.stats()['messages'] == 5
+
+
+def test_ring_buffer_keeps_depth():
+    buffer = RecentMessages(depth=3)
+    _warm(buffer, [1, 2], exhaustive=True)
+    for message_id in (3, 4, 5):
+        buffer.append(ROOM, lambda message_id=message_id: _rows([message_id])[0])
+
+    assert _ids(buffer.read(ROOM, 3)) == [3, 4, 5]
+    # En eskiler atıldı: tampon artık tüm geçmişi kapsamıyor
+    assert buffer.read(ROOM, 3, before_id=4) is None
+
+
+def test_aborted_warm_can_be_retried():
+    buffer = RecentMessages(depth=3)
+    assert buffer.begin_warm(ROOM)
+    buffer.abort_warm(ROOM)
+    assert buffer.begin_warm(ROOM)
+
+
+def test_budget_evicts_least_recently_used_rooms():
+    other = room_key('group', 1)
+    buffer = RecentMessages(depth=10, budget_bytes=RecentMessages.ROW_OVERHEAD * 15)
+    _warm(buffer, range(1, 9))
+    _warm(buffer, range(11, 19), key=other)
+
+    assert buffer.read(ROOM, 1) is None
+    assert _ids(buffer.read(other, 1)) == [18]
+    assert buffer.stats()['evictions'] == 1
+
+
+def test_status_updates_reach_buffered_rows():
+    buffer = RecentMessages(depth=3)
+    _warm(buffer, [1, 2])
+    buffer.update(2, status='read')
+    assert buffer.read(ROOM, 1)[0]['status'] == 'read'
+
+
+def test_ttl_expires_rooms(monkeypatch):
+    buffer = RecentMessages(depth=3, ttl=10)
+    _warm(buffer, [1, 2])
+    warmed_at = buffer._rooms[ROOM].warmed_at
+    monkeypatch.setattr('database.cache.time.monotonic', lambda: warmed_at + 11)
+    assert buffer.read(ROOM, 1) is None
+    assert buffer.begin_warm(ROOM)
+
+
+@pytest.mark.skipif(recent_messages is None, reason='RECENT_MESSAGES_ENABLED kapalı')
+def test_history_from_buffer_matches_database(db):
+    _, alice = register_user('alice', 'secret123')
+    ids = [save_message(alice, f'mesaj {n}', 'broadcast') for n in range(6)]
+    where = "m.message_type = 'broadcast'"
+
+    warms = recent_messages.stats()['warms']
+    for limit, before_id, after_id in [(3, None, None), (2, ids[3], None),
+                                       (10, None, ids[1]), (10, None, None)]:
+        expected = _fetch_history_page('test', where, (), limit, before_id, after_id)
+        assert get_broadcast_messages(limit, before_id, after_id) == expected
+
+    # Oda bir kez ısıtıldı; sonraki mesaj ısıtmadan tampona eklenir
+    assert recent_messages.stats()['warms'] == warms + 1
+    new_id = save_message(alice, 'yeni', 'broadcast')
+    assert [m['id'] for m in get_broadcast_messages(2)] == [ids[-1], new_id]
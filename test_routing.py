@@ -0,0 +1,128 @@
+# test_routing.py
+"""
+TCP yönlendirme tablosu ve fan-out testleri (core/routing.py)
+
+Bağlantıların kullanıcı / grup indekslerine doğru girip çıktığını,
+üyelik değişikliklerinin tabloya yansıdığını ve fan_out'un mesajı her
+kodlama için bir kez kodlayıp kapalı bağlantıları ve göndereni atladığını
+doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_routing.py
+"""
+
+import pytest
+
+from core import codec
+from core.connection import Connection
+from core.routing import RoutingTable, fan_out
+from database.cache import MembershipIndex
+
+
+class FakeConnection(Connection):
+    """Gönderilen çerçeveleri biriktiren bağlantı"""
+
+    def __init__(self, name, encoding='json'):
+        super().__init__(name)
+        self.codec = codec.CODECS[encoding]
+        self.sent = []
+        self.encoded = 0
+
+    def encode(self, message):
+        self.encoded += 1
+        return super().encode(message)
+
+    def send_bytes(self, data):
+        self.sent.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_connection_requires_transport_methods():
+    with pytest.raises(TypeError):
+        Connection('a')
+
+
+def _table(pairs=()):
+    index = MembershipIndex()
+    index.load(pairs)
+    return RoutingTable(index), index
+
+
+def test_bind_indexes_user_and_groups():
+    routes, _ = _table([(1, 10), (2, 10), (1, 11)])
+    a, b, c = FakeConnection('a'), FakeConnection('b'), FakeConnection('c')
+    routes.bind(a, 10)
+    routes.bind(b, 10)
+    routes.bind(c, 11)
+
+    assert set(routes.user_connections(10)) == {a, b}
+    assert set(routes.group_connections(1)) == {a, b, c}
+    assert set(routes.group_connections(2)) == {a, b}
+    assert routes.group_connections(3) == []
+    assert routes.stats() == {'connections': 3, 'users': 2, 'groups': 2}
+
+    routes.unbind(a)
+    routes.unbind(b)
+    assert routes.user_connections(10) == []
+    assert routes.group_connections(2) == []
+    assert routes.stats() == {'connections': 1, 'users': 1, 'groups': 1}
+
+
+def test_rebind_moves_connection_to_new_user():
+    routes, _ = _table([(1, 10), (2, 11)])
+    conn = FakeConnection('a')
+    routes.bind(conn, 10)
+    routes.bind(conn, 11)
+
+    assert routes.user_connections(10) == []
+    assert routes.group_connections(1) == []
+    assert routes.group_connections(2) == [conn]
+
+
+def test_membership_changes_update_groups():
+    routes, index = _table([(1, 10)])
+    conn = FakeConnection('a')
+    routes.bind(conn, 10)
+
+    index.add(2, 10)
+    assert routes.group_connections(2) == [conn]
+    index.remove(1, 10)
+    assert routes.group_connections(1) == []
+
+    # Başka süreçlerin değişiklikleri indeks yeniden yüklenince yansır
+    index.load([(3, 10)])
+    assert routes.group_connections(2) == []
+    assert routes.group_connections(3) == [conn]
+
+
+def test_closed_table_stops_listening():
+    routes, index = _table([(1, 10)])
+    conn = FakeConnection('a')
+    routes.bind(conn, 10)
+
+    routes.close()
+    assert index._listeners == []
+    index.add(2, 10)
+    assert routes.group_connections(2) == []
+
+
+def test_fan_out_encodes_once_per_codec():
+    sender = FakeConnection('sender')
+    json_conns = [FakeConnection(f'j{n}') for n in range(3)]
+    binary_conns = [FakeConnection(f'b{n}', 'binary') for n in range(2)]
+    closed = FakeConnection('closed')
+    closed.close()
+
+    message = {'type': 'new_message', 'message': 'merhaba', 'id': 5}
+    delivered = fan_out([sender, closed, *json_conns, *binary_conns], message,
+                        exclude=sender)
+
+    assert delivered == 5
+    assert sender.sent == [] and closed.sent == []
+    assert sum(conn.encoded for conn in json_conns) == 1
+    assert sum(conn.encoded for conn in binary_conns) == 1
+    assert all(conn.sent == json_conns[0].sent for conn in json_conns)
+    assert all(conn.sent == binary_conns[0].sent for conn in binary_conns)
+    assert json_conns[0].sent != binary_conns[0].sent
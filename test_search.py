@@ -0,0 +1,78 @@
+# test_search.py
+"""
+Kullanıcı adı arama testleri (database.queries.search_usernames)
+
+Önek ve alt metin aramalarının doğru kullanıcıları (lower(username), id)
+sırasıyla döndürdüğünü, cursor ile sayfalamanın satır atlamadığını ve
+sonuçlardaki çevrimiçi durumun toplu yazıcıda bekleyen değişiklikleri
+de yansıttığını doğrular. Tüm kullanıcı listesinin batch'ler halinde
+üretilen (akış) sürümü de burada sınanır.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_search.py
+"""
+
+import pytest
+
+from config import Config
+from database.presence_writer import get_presence_writer
+from database.queries import get_all_users, register_user, search_usernames, set_user_online
+
+
+NAMES = ['ahmet', 'Ahmet_2', 'ahmad', 'mehmet', 'zahmet', 'ayse', 'AHM']
+
+
+@pytest.fixture
+def users(db):
+    ids = {}
+    for name in NAMES:
+        success, user_id = register_user(name, 'secret123')
+        assert success, user_id
+        ids[name] = user_id
+    return ids
+
+
+def _names(rows):
+    return [row['username'] for row in rows]
+
+
+def test_prefix_search_is_case_insensitive(users):
+    assert _names(search_usernames('ahm')) == ['AHM', 'ahmad', 'ahmet', 'Ahmet_2']
+    assert _names(search_usernames('AHME')) == ['ahmet', 'Ahmet_2']
+    assert search_usernames('x') == []
+    assert search_usernames('') == []
+
+
+def test_substring_search(users):
+    assert _names(search_usernames('hmet', substring=True)) == \
+        ['ahmet', 'Ahmet_2', 'mehmet', 'zahmet']
+    # 3 karakterden kısa alt metin önek aramasına düşer
+    assert _names(search_usernames('ay', substring=True)) == ['ayse']
+
+
+@pytest.mark.parametrize('substring', [False, True])
+def test_cursor_pages_do_not_skip_rows(users, substring):
+    expected = _names(search_usernames('ahm', limit=100, substring=substring))
+    seen, after = [], None
+    while True:
+        page = search_usernames('ahm', limit=1, after=after, substring=substring)
+        if not page:
+            break
+        seen += _names(page)
+        after = (page[-1]['username'], page[-1]['id'])
+    assert seen == expected
+
+
+def test_results_include_pending_presence(users):
+    assert get_presence_writer() is not None
+    set_user_online(users['ayse'], True)
+
+    [row] = search_usernames('ayse')
+    assert row['is_online'] == 1
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 100])
+def test_lazy_user_list_matches_list(users, monkeypatch, batch_size):
+    monkeypatch.setattr(Config, 'STREAM_BATCH_SIZE', batch_size)
+    assert list(get_all_users(lazy=True)) == get_all_users()
+    assert len(get_all_users()) == len(NAMES)
@@ -0,0 +1,118 @@
+# test_tcp_server.py
+"""
+TCP sunucu testleri (core/tcp_server.py)
+
+İki çalışma modunda (asyncio / threaded) sunucunun çerçeveli mesajlara
+cevap verdiğini ve mesajları giriş yapmış diğer istemcilere ilettiğini,
+Windows'ta asyncio modunun add_reader destekleyen olay döngüsünü
+seçtiğini doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_tcp_server.py
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from core import codec, tcp_server
+from core.protocol import FrameDecoder, encode_frame, recv_frames
+from core.tcp_server import TCPServer, use_selector_event_loop
+from database.queries import register_user
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    """Test istemcisi (JSON kodlama)"""
+
+    def __init__(self, port):
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                self.sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.02)
+        self.frames = recv_frames(self.sock, FrameDecoder())
+
+    def send(self, message):
+        self.sock.sendall(encode_frame(codec.CODECS['json'].encode(message)))
+
+    def receive(self):
+        return codec.decode(next(self.frames))
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(params=['asyncio', 'threaded'])
+def server(db, request):
+    server = TCPServer('127.0.0.1', _free_port(), mode=request.param)
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join(5)
+
+
+def _login(server, name):
+    client = Client(server.port)
+    client.send({'type': 'login', 'username': name, 'password': 'secret123'})
+    response = client.receive()
+    assert response['type'] == 'login_response' and response['success']
+    return client
+
+
+def test_ping(server):
+    client = Client(server.port)
+    client.send({'type': 'ping', 'id': 7})
+    assert client.receive() == {'type': 'pong', 'id': 7}
+    client.close()
+
+
+def test_broadcast_reaches_other_clients(server):
+    register_user('alice', 'secret123')
+    register_user('bob', 'secret123')
+    alice, bob = _login(server, 'alice'), _login(server, 'bob')
+
+    alice.send({'type': 'message', 'message_type': 'broadcast', 'message': 'merhaba'})
+    response = alice.receive()
+    assert response['type'] == 'message_response' and response['delivered'] == 1
+
+    received = bob.receive()
+    assert received['type'] == 'new_message'
+    assert (received['sender'], received['message']) == ('alice', 'merhaba')
+    alice.close()
+    bob.close()
+
+
+def test_windows_uses_selector_event_loop(monkeypatch):
+    policies = []
+
+    class SelectorPolicy:
+        pass
+
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    monkeypatch.setattr(asyncio, 'WindowsSelectorEventLoopPolicy', SelectorPolicy, raising=False)
+    monkeypatch.setattr(asyncio, 'set_event_loop_policy', policies.append)
+    use_selector_event_loop()
+    assert len(policies) == 1 and isinstance(policies[0], SelectorPolicy)
+
+
+def test_other_platforms_keep_default_loop(monkeypatch):
+    policies = []
+    monkeypatch.setattr(tcp_server.sys, 'platform', 'linux')
+    monkeypatch.setattr(asyncio, 'set_event_loop_policy', policies.append)
+    use_selector_event_loop()
+    assert policies == []
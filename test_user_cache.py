@@ -0,0 +1,115 @@
+# test_user_cache.py
+"""
+Kullanıcı önbelleği testleri (database.cache.LRUCache, user_cache)
+
+LRU önbelleğin boyut sınırında en uzun süredir kullanılmayan kaydı,
+TTL dolunca da süresi geçen kaydı attığını; kullanıcı aramalarının
+önbellekten kopya döndürdüğünü ve kullanıcı satırı değişince (yerel
+yazma veya başka worker'dan gelen olay) önbelleğin temizlendiğini
+doğrular.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_user_cache.py
+"""
+
+import pytest
+
+from config import Config
+from database import db_manager
+from database.cache import LRUCache, user_cache
+from database.queries import (
+    apply_cluster_event, get_user_by_id, get_user_by_username, register_user,
+    set_user_online
+)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'a' artık en yeni
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 3, 1)
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('database.cache.time.monotonic', lambda: now[0])
+    cache = LRUCache(max_size=10, ttl=5)
+    cache.set('a', 1)
+
+    now[0] += 5
+    assert cache.get('a') == 1
+    now[0] += 0.1
+    assert cache.get('a', 'yok') == 'yok'
+    assert cache.stats()['expirations'] == 1
+
+
+def test_invalidate_returns_value():
+    cache = LRUCache()
+    cache.set('a', {'x': 1})
+    assert cache.invalidate('a') == {'x': 1}
+    assert cache.invalidate('a') is None
+
+
+@pytest.fixture
+def alice(db, monkeypatch):
+    monkeypatch.setattr(Config, 'USER_CACHE_ENABLED', True)
+    _, user_id = register_user('alice', 'secret123')
+    return user_id
+
+
+def _lookups():
+    stats = user_cache.stats()
+    return stats['hits'], stats['misses']
+
+
+def test_lookups_are_cached_copies(alice):
+    user = get_user_by_id(alice)
+    hits, misses = _lookups()
+
+    assert get_user_by_id(alice) == user
+    assert get_user_by_username('alice') == user  # Aynı satır, ikinci anahtar
+    assert _lookups() == (hits + 2, misses)
+
+    user['username'] = 'değişti'
+    assert get_user_by_id(alice)['username'] == 'alice'
+
+
+def test_write_invalidates_both_keys(alice, monkeypatch):
+    monkeypatch.setattr(Config, 'PRESENCE_WRITE_BEHIND', False)
+    get_user_by_username('alice')
+
+    set_user_online(alice, True)
+    assert user_cache.get(('id', alice)) is None
+    assert user_cache.get(('username', 'alice')) is None
+    assert get_user_by_id(alice)['is_online'] == 1
+
+
+def test_pending_presence_updates_cached_row(alice, monkeypatch):
+    monkeypatch.setattr(Config, 'PRESENCE_WRITE_BEHIND', True)
+    assert get_user_by_id(alice)['is_online'] == 0
+
+    set_user_online(alice, True)
+    assert get_user_by_id(alice)['is_online'] == 1
+    assert get_user_by_username('alice')['is_online'] == 1
+
+
+def test_remote_user_event_invalidates(alice):
+    get_user_by_id(alice)
+    db_manager.execute_query("UPDATE users SET email = 'a@b.c' WHERE id = ?", (alice,))
+    assert get_user_by_id(alice)['email'] is None  # Eski kopya
+
+    apply_cluster_event({'origin': 'başka-worker', 'kind': 'user', 'user_id': alice})
+    assert get_user_by_id(alice)['email'] == 'a@b.c'
+
+
+def test_disabled_cache_reads_database(alice, monkeypatch):
+    monkeypatch.setattr(Config, 'USER_CACHE_ENABLED', False)
+    user_cache.clear()
+    get_user_by_id(alice)
+    assert user_cache.stats()['size'] == 0
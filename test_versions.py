@@ -0,0 +1,70 @@
+# test_versions.py
+"""
+Kaynak sürüm sayacı testleri (database/versions.py)
+
+ETag'lerin dayandığı sürüm dizgesinin sadece ilgili kaynak değişince
+değiştiğini ve yazma fonksiyonlarının doğru anahtarları artırdığını
+doğrular. HTTP tarafı (304 yanıtları) test_api.py'dedir.
+
+Çalıştırma (proje kökünden):
+    python -m pytest test_versions.py
+"""
+
+from database.queries import (
+    add_user_to_group, create_group, get_conversation_key, mark_message_read,
+    register_user, save_message
+)
+from database.versions import (
+    GROUPS, MESSAGE_STATUS, USERS, ResourceVersions, members_key, resource_versions,
+    room_key
+)
+
+
+def test_token_changes_only_with_its_keys():
+    versions = ResourceVersions()
+    token = versions.token(GROUPS, members_key(1))
+
+    versions.bump(USERS, members_key(2))
+    assert versions.token(GROUPS, members_key(1)) == token
+
+    versions.bump(members_key(1))
+    assert versions.token(GROUPS, members_key(1)) != token
+    assert versions.get(members_key(1)) == 1
+
+
+def test_reset_invalidates_all_tokens():
+    versions = ResourceVersions()
+    token = versions.token(GROUPS)
+    versions.reset()
+    assert versions.token(GROUPS) != token
+
+
+def test_ttl_advances_tokens(monkeypatch):
+    versions = ResourceVersions(ttl=10)
+    monkeypatch.setattr('database.versions.time.time', lambda: 1000.0)
+    token = versions.token(GROUPS)
+    monkeypatch.setattr('database.versions.time.time', lambda: 1009.0)
+    assert versions.token(GROUPS) == token
+    monkeypatch.setattr('database.versions.time.time', lambda: 1010.0)
+    assert versions.token(GROUPS) != token
+
+
+def test_writes_bump_their_resources(db):
+    _, alice = register_user('alice', 'secret123')
+    _, bob = register_user('bob', 'secret123')
+    private = room_key('private', get_conversation_key(alice, bob))
+
+    room, broadcast = resource_versions.get(private), resource_versions.get(room_key('broadcast'))
+    message_id = save_message(alice, 'merhaba', 'private', receiver_id=bob)
+    assert resource_versions.get(private) == room + 1
+    assert resource_versions.get(room_key('broadcast')) == broadcast
+
+    status = resource_versions.get(MESSAGE_STATUS)
+    assert mark_message_read(message_id)
+    assert resource_versions.get(MESSAGE_STATUS) == status + 1
+
+    _, group_id = create_group('grup', alice)
+    groups, members = resource_versions.get(GROUPS), resource_versions.get(members_key(group_id))
+    assert add_user_to_group(group_id, bob)
+    assert resource_versions.get(GROUPS) == groups + 1
+    assert resource_versions.get(members_key(group_id)) == members + 1